@@ -0,0 +1,65 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Times inject_anomalies on a seeded synthetic AIS month with one worker and
+with --workers, and reports how many trajectories and points it injects.
+What it injects is tested in tests/test_anomaly_injection.py.
+
+    python benchmarks/bench_anomaly_injection.py --rows 2000000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from anomaly_generation.anomaly_injection import INJECTION_TYPES, inject_anomalies
+from generate_ais import Fleet, REPORTS_PER_VESSEL_MONTH, generate_month
+
+START_MONTH = "2017-01"
+
+
+def timed_injection(data, args, workers):
+    start = time.perf_counter()
+    injected, labels = inject_anomalies(
+        data, INJECTION_TYPES, args.fraction, args.seed, workers
+    )
+    return time.perf_counter() - start, injected, labels
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--fraction", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fleet = Fleet(max(args.rows // REPORTS_PER_VESSEL_MONTH, 10), args.seed)
+    data = pd.concat(
+        generate_month(fleet, args.rows, START_MONTH, args.seed), ignore_index=True
+    )
+
+    seconds, _, labels = timed_injection(data, args, 1)
+    print(f"{'workers: 1':<12} {seconds:8.3f} s {len(data) / seconds:14,.0f} rows/s")
+    seconds, _, _ = timed_injection(data, args, args.workers)
+    print(
+        f"{f'workers: {args.workers}':<12} {seconds:8.3f} s {len(data) / seconds:14,.0f} rows/s"
+    )
+    for kind, counts in labels.groupby("anomaly_type")["n_points"]:
+        print(f"{kind}: {len(counts)} trajectories, {counts.sum()} points")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Times batch_chull_areas_km2 against shapely's convex hull, on the same
+projection, for synthetic trajectories including degenerate ones (single
+points, repeated points, collinear tracks), and reports the largest area
+difference. The areas themselves are tested in tests/test_convex_hull.py.
+
+    python benchmarks/bench_convex_hull.py --trajectories 200000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+from shapely.geometry import MultiPoint
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from common.convex_hull import batch_chull_areas_km2
+from common.geodesy import project_to_km
+
+
+def synthetic_trajectories(n_trajectories, max_points, seed=0):
+    """Random-walk tracks around Hawaii, with degenerate tracks mixed in."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, max_points + 1, n_trajectories)
+    traj_ids = np.repeat(np.arange(n_trajectories), lengths)
+    lon = -158 + np.cumsum(rng.normal(0, 0.003, len(traj_ids)))
+    lat = 21 + np.cumsum(rng.normal(0, 0.003, len(traj_ids)))
+
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    for traj in range(0, n_trajectories, 50):
+        track = slice(starts[traj], starts[traj] + lengths[traj])
+        kind = (traj // 50) % 4
+        if kind == 0:  # vessel sitting still
+            lon[track], lat[track] = lon[track][0], lat[track][0]
+        elif kind == 1:  # straight diagonal
+            lat[track] = lat[track][0] + 0.5 * (lon[track] - lon[track][0])
+        elif kind == 2:  # due east
+            lat[track] = lat[track][0]
+        else:  # every point repeated
+            half = lengths[traj] // 2
+            lon[track][half:] = lon[track][: lengths[traj] - half]
+            lat[track][half:] = lat[track][: lengths[traj] - half]
+
+    return lon, lat, traj_ids, starts, lengths
+
+
+def reference_areas(lon, lat, starts, lengths):
+    areas = np.zeros(len(starts))
+    for traj, (start, length) in enumerate(zip(starts, lengths)):
+        track_lat = lat[start : start + length]
+        x, y = project_to_km(lon[start : start + length], track_lat, track_lat.mean())
+        areas[traj] = MultiPoint(np.column_stack([x, y])).convex_hull.area
+    return areas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trajectories", type=int, default=100_000)
+    parser.add_argument("--points", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    lon, lat, traj_ids, starts, lengths = synthetic_trajectories(
+        args.trajectories, args.points
+    )
+
+    start = time.perf_counter()
+    expected = reference_areas(lon, lat, starts, lengths)
+    reference_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    areas = batch_chull_areas_km2(lon, lat, traj_ids, workers=args.workers)
+    batch_s = time.perf_counter() - start
+
+    max_error = np.abs(areas - expected).max()
+
+    print(f"trajectories:   {args.trajectories} ({len(traj_ids)} points)")
+    print(f"shapely:        {reference_s:.3f} s")
+    print(f"batch:          {batch_s:.3f} s ({reference_s / batch_s:.1f}x)")
+    print(f"max area error: {max_error:.3g} km²")
+
+
+if __name__ == "__main__":
+    main()
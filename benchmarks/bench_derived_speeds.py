@@ -0,0 +1,74 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Times the derivation of distances_km and comput_speed_knots on a seeded
+synthetic AIS month in time order (as a feed writes it), for the whole
+month at once and chunk by chunk. tests/test_derived_speeds.py checks that
+both give the same columns.
+
+    python benchmarks/bench_derived_speeds.py --rows 2000000 --chunk_rows 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from common.ais_schema import apply_ais_schema
+from common.derived_speeds import DERIVED_COLUMNS, SpeedDeriver, derive_speeds
+from generate_ais import (
+    REPORTS_PER_VESSEL_MONTH,
+    Fleet,
+    generate_month,
+)
+
+START_MONTH = "2017-01"
+
+
+def derive_in_chunks(data, chunk_rows):
+    deriver = SpeedDeriver()
+    for start in range(0, len(data), chunk_rows):
+        deriver.derive(data.iloc[start : start + chunk_rows].copy())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk_rows", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fleet = Fleet(max(args.rows // REPORTS_PER_VESSEL_MONTH, 10), args.seed)
+    generated = pd.concat(
+        generate_month(fleet, args.rows, START_MONTH, args.seed), ignore_index=True
+    )
+    generated = generated.sort_values("datetime_utc", kind="stable", ignore_index=True)
+    apply_ais_schema(generated)
+    data = generated.drop(columns=DERIVED_COLUMNS)
+
+    start = time.perf_counter()
+    derive_speeds(data.copy())
+    seconds = time.perf_counter() - start
+    print(f"{'whole month':<24} {seconds:8.3f} s {len(data) / seconds:14,.0f} rows/s")
+
+    start = time.perf_counter()
+    derive_in_chunks(data, args.chunk_rows)
+    seconds = time.perf_counter() - start
+    print(
+        f"{f'chunks of {args.chunk_rows}':<24} {seconds:8.3f} s {len(data) / seconds:14,.0f} rows/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
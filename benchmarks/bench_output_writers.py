@@ -0,0 +1,116 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Compares writing a synthetic flagged overspeed frame with one to_csv call
+against the batched output writers (CSV, Parquet, Feather, partitioned and
+flags only), reporting the time and size of each. That every output reads
+back to the same rows is tested in tests/test_output_writers.py.
+
+    python benchmarks/bench_output_writers.py --rows 5000000
+"""
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from common.output_writers import write_output
+from common.timestamps import ensure_hst
+
+CASES = [
+    ("csv", None, None, False),
+    ("csv", None, "gzip", False),
+    ("parquet", None, None, False),
+    ("parquet", "month", "zstd", False),
+    ("feather", None, None, False),
+    ("csv", None, None, True),
+]
+
+
+def synthetic_results(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2017-01-01", tz="UTC").value
+    times = np.sort(rng.integers(start, start + 365 * 86_400 * 10**9, n_rows))
+    speeds = rng.gamma(4, 3, n_rows).astype(np.float32)
+    data = pd.DataFrame(
+        {
+            "datetime_utc": pd.to_datetime(times, utc=True),
+            "lat": rng.uniform(18, 23, n_rows),
+            "lon": rng.uniform(-161, -154, n_rows),
+            "vessel_class": pd.Categorical(
+                rng.choice(["cargo", "tanker", "fishing"], n_rows)
+            ),
+            "length_m": rng.uniform(10, 300, n_rows).astype(np.float32),
+            "status": rng.integers(0, 9, n_rows).astype(np.int8),
+            "computed_speed_knots": speeds,
+            "overspeed_flag": speeds > np.percentile(speeds, 99),
+        },
+        index=pd.Index(rng.integers(367_000_000, 367_100_000, n_rows), name="MMSI"),
+    )
+    return data
+
+
+def size_mb(path):
+    files = glob.glob(os.path.join(path, "*", "*")) if os.path.isdir(path) else [path]
+    return sum(os.path.getsize(f) for f in files) / 1024**2
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    data = synthetic_results(args.rows)
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        path = os.path.join(out_dir, "monolithic.csv")
+        ensure_hst(data.copy()).to_csv(path)
+        baseline_s = time.perf_counter() - start
+        print(f"rows: {args.rows}")
+        print(f"{'to_csv (one call)':<32} {baseline_s:7.2f} s {size_mb(path):9.1f} MB")
+
+        for output_format, partition, compression, flags_only in CASES:
+            params = {
+                "output_format": output_format,
+                "output_partition": partition,
+                "output_compression": compression,
+                "flags_only": flags_only,
+            }
+            name = "-".join(
+                str(value)
+                for value in (output_format, partition, compression)
+                if value is not None
+            ) + ("-flags_only" if flags_only else "")
+
+            start = time.perf_counter()
+            path = write_output(
+                data,
+                os.path.join(out_dir, name),
+                params,
+                flag_columns=["overspeed_flag"],
+                index=True,
+            )
+            elapsed = time.perf_counter() - start
+
+            print(
+                f"{name:<32} {elapsed:7.2f} s {size_mb(path):9.1f} MB "
+                f"({baseline_s / elapsed:.1f}x)"
+            )
+
+
+if __name__ == "__main__":
+    main()
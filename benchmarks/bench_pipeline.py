@@ -0,0 +1,220 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Times the main pipeline stages (load_and_filter_data, filter_ais_data,
+overspeeding, extract_traj_from_df and detect_speed_abnormality_batch) on
+seeded synthetic AIS months from src/generate_ais.py, reporting the best
+of --repeat (or more) runs of each. --save writes the results as JSON, to be compared
+against the committed baseline with compare_benchmarks.py:
+
+    python benchmarks/bench_pipeline.py --rows 1000000 --save results.json
+    python benchmarks/compare_benchmarks.py benchmarks/baselines/pipeline.json results.json
+"""
+
+import argparse
+import contextlib
+import copy
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import time as time_of_day
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import main as pipeline
+from anomaly_rules.anomaly_rule_overspeeding import overspeeding
+from anomaly_rules.anomaly_rule_speed_abnormality import (
+    detect_speed_abnormality_batch,
+)
+from common.ais_schema import apply_ais_schema, read_ais_csv
+from common.filter_trajectories import filter_ais_data
+from common.obtain_and_process_traj import extract_traj_from_df
+from common.timestamps import parse_timestamps
+from generate_ais import write_months
+from params_builder import ParamsBuilder
+
+START_MONTH = "2017-01"
+MIN_STAGE_SECONDS = 1.0
+MAX_STAGE_RUNS = 50
+
+
+def benchmark_params(months):
+    """The parameters of a typical overspeed run over the generated months."""
+    params = ParamsBuilder().params
+    start = pd.Timestamp(START_MONTH)
+    params.update(
+        {
+            "anomaly_type": "overspeed",
+            "Hawaii_GT": True,
+            "vessel_class": ["cargo", "tanker", "passenger", "fishing"],
+            "length_range": [1, 400],
+            "percentile": 0.99,
+            "timeframe": {
+                "start": start,
+                "end": start + pd.offsets.MonthEnd(months),
+            },
+            "hour_constraint": {
+                "start": time_of_day(0, 0),
+                "end": time_of_day(23, 59),
+            },
+        }
+    )
+    return params
+
+
+def time_stage(run, prepare, repeat):
+    """
+    Best wall time (s) of run(prepare()), and its last result. Stages are run
+    repeat times, and fast ones again until they have run for
+    MIN_STAGE_SECONDS, as the best of many runs is what varies least from
+    one benchmark run to the next.
+    """
+    times = []
+    while len(times) < repeat or (
+        sum(times) < MIN_STAGE_SECONDS and len(times) < MAX_STAGE_RUNS
+    ):
+        args = prepare()
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            result = run(*args)
+            times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def run_benchmarks(root, months, repeat):
+    params = benchmark_params(months)
+    data_dir = os.path.join(root, "data")
+    month_stems = [
+        f"Hawaii_{date.year}_{date.month:02d}"
+        for date in pd.date_range(START_MONTH, periods=months, freq="MS")
+    ]
+
+    # load_and_filter_data reads the Hawaii GT months from <root>/data
+    pipeline.one_dir_up_from_this_file = root
+    results = {}
+
+    seconds, filtered = time_stage(
+        pipeline.load_and_filter_data, lambda: (copy.deepcopy(params),), repeat
+    )
+    total_rows = sum(
+        len(pd.read_csv(os.path.join(data_dir, f"{stem}.csv"), usecols=["MMSI"]))
+        for stem in month_stems
+    )
+    results["load_and_filter_data"] = (seconds, total_rows)
+
+    raw = pd.concat(
+        [
+            apply_ais_schema(
+                parse_timestamps(
+                    read_ais_csv(
+                        os.path.join(data_dir, f"{stem}.csv"), params["anomaly_type"]
+                    )
+                )
+            )
+            for stem in month_stems
+        ],
+        ignore_index=True,
+    )
+    seconds, _ = time_stage(filter_ais_data, lambda: (params, raw), repeat)
+    results["filter_ais_data"] = (seconds, len(raw))
+
+    seconds, _ = time_stage(overspeeding, lambda: (params, filtered), repeat)
+    results["overspeeding"] = (seconds, len(filtered))
+
+    seconds, _ = time_stage(extract_traj_from_df, lambda: (filtered.copy(),), repeat)
+    results["extract_traj_from_df"] = (seconds, len(filtered))
+
+    points = apply_ais_schema(
+        parse_timestamps(
+            read_ais_csv(
+                os.path.join(data_dir, f"{month_stems[0]}.csv"), "speed abnormality"
+            )
+        )
+    )
+    points["traj_id"] = points["MMSI"]
+    seconds, _ = time_stage(detect_speed_abnormality_batch, lambda: (points,), repeat)
+    results["detect_speed_abnormality_batch"] = (seconds, len(points))
+
+    return results
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--months", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        write_months(
+            os.path.join(root, "data"),
+            args.rows,
+            START_MONTH,
+            args.months,
+            seed=args.seed,
+        )
+        print(
+            f"rows: {args.rows} in {args.months} months "
+            f"(generated in {time.perf_counter() - start:.1f} s)"
+        )
+
+        results = run_benchmarks(root, args.months, args.repeat)
+
+    stages = {}
+    for name, (seconds, rows) in results.items():
+        stages[name] = {
+            "seconds": seconds,
+            "rows": rows,
+            "rows_per_s": rows / max(seconds, 1e-9),
+        }
+        print(f"{name:<32} {seconds:8.3f} s {rows / max(seconds, 1e-9):14,.0f} rows/s")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "rows": args.rows,
+                    "months": args.months,
+                    "repeat": args.repeat,
+                    "seed": args.seed,
+                    "machine": machine_info(),
+                    "stages": stages,
+                },
+                f,
+                indent=1,
+            )
+        print(f"Saved the results to {args.save}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Times QuantileSketch against exact np.percentile on synthetic speed
+distributions, with the sketch built from separately sketched parts (as
+months or workers would) and merged, and reports the largest relative
+error. The error bound itself is tested in tests/test_quantile_sketch.py.
+
+    python benchmarks/bench_quantile_sketch.py --rows 5000000 --parts 12
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from common.quantile_sketch import QuantileSketch
+
+PERCENTILES = [0.5, 0.9, 0.95, 0.98, 0.99, 0.995, 0.999]
+
+
+def synthetic_speeds(rows, seed=0):
+    """Speed-like distributions in knots, clipped to the 0-65 knot overspeed range."""
+    rng = np.random.default_rng(seed)
+    return {
+        "gamma": np.clip(rng.gamma(2.0, 5.0, rows), 0, 65),
+        "bimodal": np.clip(
+            np.where(
+                rng.random(rows) < 0.3,
+                rng.normal(0.3, 0.2, rows),
+                rng.normal(12.0, 3.0, rows),
+            ),
+            0,
+            65,
+        ),
+        "heavy_tail": np.clip(rng.pareto(3.0, rows) * 5.0, 0, 65),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--parts", type=int, default=12)
+    parser.add_argument("--relative_accuracy", type=float, default=0.001)
+    args = parser.parse_args()
+
+    for name, speeds in synthetic_speeds(args.rows).items():
+        start = time.perf_counter()
+        exact = np.percentile(speeds, [100 * q for q in PERCENTILES])
+        exact_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        sketch = QuantileSketch(args.relative_accuracy)
+        for part in np.array_split(speeds, args.parts):
+            sketch.merge(QuantileSketch.from_values(part, args.relative_accuracy))
+        estimates = [sketch.quantile(q) for q in PERCENTILES]
+        sketch_s = time.perf_counter() - start
+
+        errors = np.abs(np.array(estimates) - exact) / np.maximum(exact, 1e-12)
+        print(
+            f"{name:<11} exact {exact_s:.3f} s, sketch {sketch_s:.3f} s, "
+            f"max relative error {errors.max():.5f} "
+            f"(bound {args.relative_accuracy})"
+        )
+
+
+if __name__ == "__main__":
+    main()
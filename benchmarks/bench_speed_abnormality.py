@@ -0,0 +1,84 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Times detect_speed_abnormality_batch against the original per-trajectory
+detect_speed_abnormality on synthetic trajectories. That both flag the
+same points is tested in tests/test_speed_abnormality.py.
+
+    python benchmarks/bench_speed_abnormality.py --trajectories 200 --points 500
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from anomaly_rules.anomaly_rule_speed_abnormality import (
+    detect_speed_abnormality,
+    detect_speed_abnormality_batch,
+)
+
+
+def synthetic_trajectories(n_trajectories, n_points, seed=0):
+    """Trajectories with occasional repeated timestamps and implausible jumps."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for traj_id in range(n_trajectories):
+        seconds = np.cumsum(rng.choice([0, 10, 30, 60, 120], n_points))
+        sog = np.abs(rng.normal(10, 3, n_points))
+        # distance consistent with the reported speed, with some large jumps
+        hours = np.diff(seconds, prepend=seconds[0]) / 3600
+        distances = sog * 1.852 * hours * rng.choice([1, 1, 1, 3], n_points)
+        distances[0] = np.nan
+        frames.append(
+            pd.DataFrame(
+                {
+                    "traj_id": traj_id,
+                    "datetime_hst": pd.Timestamp("2017-01-01", tz="UTC")
+                    + pd.to_timedelta(seconds, unit="s"),
+                    "distances_km": distances,
+                    "speed_over_ground_knots": sog,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trajectories", type=int, default=100)
+    parser.add_argument("--points", type=int, default=500)
+    args = parser.parse_args()
+
+    data = synthetic_trajectories(args.trajectories, args.points)
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _, traj_points in data.groupby("traj_id", sort=True):
+            detect_speed_abnormality(traj_points)
+    loop_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch_flags, _ = detect_speed_abnormality_batch(data, time_col="datetime_hst")
+    batch_s = time.perf_counter() - start
+
+    print(f"points:          {len(data)} ({int(batch_flags.sum())} abnormal)")
+    print(f"per-trajectory:  {loop_s:.3f} s")
+    print(f"batch:           {batch_s:.3f} s ({loop_s / batch_s:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Measures the startup cost of the CLI with python -X importtime: the time to
+import main on top of pandas (which every anomaly rule needs), best of
+--runs. Exits non-zero if it exceeds --budget_ms, if importing main loads
+a module that should only be loaded when its rule or mode is selected, or
+if importing the library configures logging or writes a log file.
+
+    python benchmarks/bench_startup.py --budget_ms 40
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+SRC_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"
+)
+
+# Modules only the runs that select them may import
+LAZY_MODULES = [
+    "anomaly_rules.anomaly_rule_overspeeding",
+    "anomaly_rules.anomaly_rule_speed_abnormality",
+    "anomaly_generation.anomaly_injection",
+    "sweep",
+    "incremental",
+    "streaming",
+    "asyncio",
+    "multiprocessing",
+    "cProfile",
+    "tracemalloc",
+    "common.obtain_and_process_traj",
+    "tracktable",
+    "geopandas",
+    "shapely",
+    "sklearn",
+    "plotly",
+    "matplotlib",
+]
+
+
+def import_times(statement):
+    """
+    {module: (self us, cumulative us)} of python -X importtime -c statement,
+    in the order the imports finished.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=SRC_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def import_has_side_effects():
+    """Whether importing the trajectory library configures logging or writes files."""
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import logging, common.obtain_and_process_traj; "
+                "print(len(logging.getLogger().handlers))",
+            ],
+            cwd=cwd,
+            env={**os.environ, "PYTHONPATH": SRC_DIR},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result.stdout.strip() != "0" or bool(os.listdir(cwd))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget_ms", type=float, default=40.0)
+    args = parser.parse_args()
+
+    runs = [import_times("import pandas, main") for _ in range(args.runs)]
+    main_ms = min(times["main"][1] for times in runs) / 1000
+    pandas_ms = min(times["pandas"][1] for times in runs) / 1000
+    print(f"import pandas: {pandas_ms:7.1f} ms")
+    print(
+        f"import main:   {main_ms:7.1f} ms on top of pandas (budget {args.budget_ms} ms)"
+    )
+
+    passed = main_ms <= args.budget_ms
+    if not passed:
+        # the modules main imports are listed after pandas
+        names = list(runs[0])
+        main_imports = names[names.index("pandas") + 1 :]
+        slowest = sorted(main_imports, key=lambda name: runs[0][name][0], reverse=True)
+        print("Largest self import times under main in the first run:")
+        for name in slowest[:10]:
+            print(f"  {name:<48} {runs[0][name][0] / 1000:7.1f} ms")
+
+    loaded = [name for name in LAZY_MODULES if name in runs[0]]
+    if loaded:
+        print(f"FAILED: import main loads {', '.join(loaded)}")
+        passed = False
+
+    if import_has_side_effects():
+        print(
+            "FAILED: importing common.obtain_and_process_traj configures logging or writes files"
+        )
+        passed = False
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
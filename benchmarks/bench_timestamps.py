@@ -0,0 +1,86 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Compares the original timestamp ingestion (format-inferring pd.to_datetime on
+both datetime_utc and datetime_hst) against common.timestamps.parse_timestamps
+on Hawaii GT formatted strings.
+
+    python benchmarks/bench_timestamps.py --rows 1000000
+"""
+
+import argparse
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+from common.timestamps import HST, parse_timestamps
+
+
+def make_timestamp_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    offsets = np.sort(rng.integers(0, 31 * 86400, rows))
+    utc = pd.Timestamp("2017-01-01", tz="UTC") + pd.to_timedelta(offsets, unit="s")
+    return pd.DataFrame(
+        {
+            "datetime_utc": utc.strftime("%Y-%m-%d %H:%M:%S+00:00"),
+            "datetime_hst": utc.tz_convert(HST).strftime("%Y-%m-%d %H:%M:%S-10:00"),
+        }
+    )
+
+
+def original_path(data):
+    data["datetime_utc"] = pd.to_datetime(data["datetime_utc"])
+    data["datetime_hst"] = pd.to_datetime(data["datetime_hst"])
+    return data
+
+
+def fixed_format_path(data):
+    return parse_timestamps(data)
+
+
+def best_of(func, data, repeat):
+    timings = []
+    for _ in range(repeat):
+        frame = data.copy()
+        start = time.perf_counter()
+        func(frame)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    data = make_timestamp_frame(args.rows)
+
+    original = original_path(data.copy())
+    fixed = fixed_format_path(data.copy())
+    assert original["datetime_utc"].equals(
+        fixed["datetime_utc"].astype(original["datetime_utc"].dtype)
+    )
+
+    original_s = best_of(original_path, data, args.repeat)
+    fixed_s = best_of(fixed_format_path, data, args.repeat)
+
+    print(f"rows:              {args.rows}")
+    print(f"original path:     {original_s:.3f} s")
+    print(f"fixed-format path: {fixed_s:.3f} s")
+    print(f"speedup:           {original_s / fixed_s:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Compares the results of bench_pipeline.py --save against a baseline, stage
+by stage, on throughput (rows/s) so runs of different sizes can be
+compared. Exits non-zero if any stage is more than --tolerance slower than
+its baseline or missing from the results.
+
+    python benchmarks/compare_benchmarks.py benchmarks/baselines/pipeline.json results.json --tolerance 0.25
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline", help="JSON results of the baseline run.")
+    parser.add_argument("results", help="JSON results of the run to check.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown as a fraction of the baseline throughput. Default is 0.25.",
+    )
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    results = load_results(args.results)
+
+    if baseline["machine"] != results["machine"]:
+        print(
+            "WARNING: The baseline was measured on a different machine or software "
+            "versions; differences may not be regressions."
+        )
+    if baseline["rows"] != results["rows"]:
+        print(
+            f"WARNING: The baseline has {baseline['rows']} rows and the results "
+            f"{results['rows']}; throughput is not constant in the number of rows."
+        )
+
+    passed = True
+    print(f"{'stage':<32} {'baseline rows/s':>16} {'rows/s':>14} {'change':>8}")
+    for name, base in baseline["stages"].items():
+        result = results["stages"].get(name)
+        if result is None:
+            print(f"{name:<32} {base['rows_per_s']:16,.0f} {'missing':>14}")
+            passed = False
+            continue
+
+        change = result["rows_per_s"] / base["rows_per_s"] - 1
+        regressed = change < -args.tolerance
+        passed &= not regressed
+        print(
+            f"{name:<32} {base['rows_per_s']:16,.0f} {result['rows_per_s']:14,.0f} "
+            f"{change:+8.1%}{'  REGRESSION' if regressed else ''}"
+        )
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
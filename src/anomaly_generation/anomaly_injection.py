@@ -0,0 +1,363 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Injects synthetic overspeed and speed abnormality anomalies into a chosen
+fraction of the trajectories of an AIS frame, with ground-truth labels, to
+measure how well the anomaly rules find them.
+
+A trajectory is a vessel's run of reports with no gap longer than
+SEP_TIME_NS. Each selected trajectory gets one anomaly over a segment of
+its reports:
+
+- overspeed: the segment is sailed speedup times faster. The reports from
+  the segment on move earlier in time, comput_speed_knots is recomputed
+  from the positions and the new times, and speed_over_ground_knots is
+  scaled with it.
+- speed abnormality: speed_over_ground_knots is lowered to a fraction of the
+  speed implied by the distance to the next report, as the rule of
+  Hu et al. flags.
+
+The frame is split into shards by MMSI, each with its own random stream
+derived from the seed, so the result only depends on the data and the seed,
+not on the number of worker processes the shards are spread over.
+"""
+
+import numpy as np
+import pandas as pd
+
+from common.geodesy import KM_PER_NAUTICAL_MILE, haversine_km
+from common.instrumentation import stage
+from common.timestamps import ensure_hst, epoch_ns
+
+INJECTION_TYPES = ["overspeed", "speed abnormality"]
+# Point columns marking the injected reports of each anomaly type
+FLAG_COLUMNS = {
+    "overspeed": "injected_overspeed",
+    "speed abnormality": "injected_speed_abnormality",
+}
+REQUIRED_COLUMNS = {
+    "overspeed": ["MMSI", "datetime_utc", "lat", "lon", "comput_speed_knots"],
+    "speed abnormality": [
+        "MMSI",
+        "datetime_utc",
+        "lat",
+        "lon",
+        "speed_over_ground_knots",
+        "distances_km",
+    ],
+}
+# Reports further apart than this (ns) are in different trajectories, as in
+# extract_traj_from_df
+SEP_TIME_NS = pd.Timedelta(30, "m").value
+# Shards the frame is split into by MMSI; fixed so that the result does not
+# depend on the number of workers
+N_SHARDS = 16
+# Reports labeled in each injected trajectory
+DEFAULT_SEGMENT_POINTS = 10
+# Trajectories shorter or slower than this on average are left alone, as
+# are overspeed segments slower than this on average
+MIN_TRAJECTORY_POINTS = 5
+MIN_MOVING_KNOTS = 2.0
+# Range the overspeed speedup is drawn from, the speed (knots) it is capped
+# at to stay under the outlier cut of the overspeed rule, and the smallest
+# speedup worth injecting after the cap
+SPEEDUP_RANGE = (2.0, 3.0)
+MAX_INJECTED_KNOTS = 60.0
+MIN_SPEEDUP = 1.5
+# Range of the ratio between the implied speed and the injected SOG (the
+# rule flags ratios above 2), and the implied speed (knots) below which a
+# report is too close to stationary to be perturbed
+SOG_DIVISOR_RANGE = (2.5, 4.0)
+MIN_IMPLIED_KNOTS = 1.0
+NS_PER_HOUR = 3600 * 10**9
+
+
+def inject_anomalies(
+    ais_data,
+    anomaly_types,
+    fraction,
+    seed=0,
+    workers=1,
+    segment_points=DEFAULT_SEGMENT_POINTS,
+):
+    """
+    Injects anomaly_types anomalies into fraction of the trajectories of
+    ais_data (MMSI as a column or as the index, in any row order).
+
+    Returns the injected frame, in the rows and order of ais_data, with a
+    FLAG_COLUMNS column per anomaly type marking the injected reports, and
+    a table with one row per injected trajectory: traj_id, MMSI,
+    anomaly_type, start_time and end_time of the labeled reports, n_points
+    and the factor the anomaly was injected with (speedup or SOG divisor).
+    """
+    unknown = [kind for kind in anomaly_types if kind not in INJECTION_TYPES]
+    if unknown:
+        raise ValueError(f"Cannot inject {unknown}; choose from {INJECTION_TYPES}.")
+
+    mmsi_is_index = "MMSI" not in ais_data.columns
+    data = ais_data.reset_index(drop=not mmsi_is_index)
+    for kind in anomaly_types:
+        missing = [col for col in REQUIRED_COLUMNS[kind] if col not in data.columns]
+        if missing:
+            raise ValueError(f"Injecting {kind} requires the columns {missing}.")
+
+    has_hst = "datetime_hst" in data.columns
+    if has_hst:
+        # re-derived from the injected times below
+        data = data.drop(columns="datetime_hst")
+
+    with stage("inject_anomalies", rows_in=len(data)) as timer:
+        shard_of = data["MMSI"].to_numpy() % N_SHARDS
+        positions = [np.flatnonzero(shard_of == shard) for shard in range(N_SHARDS)]
+        shards = [shard for shard in range(N_SHARDS) if len(positions[shard])]
+        args = (
+            [data.iloc[positions[shard]] for shard in shards],
+            [anomaly_types] * len(shards),
+            [fraction] * len(shards),
+            [[*np.atleast_1d(seed), shard] for shard in shards],
+            [segment_points] * len(shards),
+        )
+        if workers > 1 and len(shards) > 1:
+            # only the runs that use a pool load multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(inject_shard, *args))
+        else:
+            results = list(map(inject_shard, *args))
+
+        if results:
+            injected = pd.concat([frame for frame, _ in results], ignore_index=True)
+            # back to the row order of ais_data
+            rows = np.concatenate([positions[shard] for shard in shards])
+            injected = injected.iloc[np.argsort(rows, kind="stable")]
+        else:
+            injected = data.assign(
+                **{FLAG_COLUMNS[kind]: False for kind in anomaly_types}
+            )
+
+        labels = pd.concat(
+            [shard_labels for _, shard_labels in results] or [empty_labels()],
+            ignore_index=True,
+        )
+        labels = labels.sort_values(["MMSI", "start_time"], ignore_index=True)
+        labels.insert(0, "traj_id", np.arange(len(labels)))
+        timer.rows_out = int(labels["n_points"].sum())
+
+    if mmsi_is_index:
+        injected = injected.set_index("MMSI")
+    else:
+        injected.index = ais_data.index
+    if has_hst:
+        injected = ensure_hst(injected)
+    return injected, labels
+
+
+def inject_shard(data, anomaly_types, fraction, seed, segment_points):
+    """
+    inject_anomalies on one shard with the random stream of seed: the
+    injected frame (rows in the order of data, index reset) and its labels.
+    """
+    rng = np.random.default_rng(seed)
+    n = len(data)
+    mmsi = data["MMSI"].to_numpy()
+    times = epoch_ns(data["datetime_utc"])
+
+    # trajectories as runs of the reports sorted by vessel and time
+    order = np.lexsort((times, mmsi))
+    mmsi = mmsi[order]
+    times = times[order]
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = (mmsi[1:] != mmsi[:-1]) | (np.diff(times) > SEP_TIME_NS)
+    traj_start = np.flatnonzero(starts)
+    traj_len = np.diff(np.append(traj_start, n))
+    traj_of = np.cumsum(starts) - 1
+    pos_in_traj = np.arange(n) - traj_start[traj_of]
+    n_traj = len(traj_start)
+
+    lat = data["lat"].to_numpy(dtype=np.float64)[order]
+    lon = data["lon"].to_numpy(dtype=np.float64)[order]
+    speed_column = (
+        "comput_speed_knots"
+        if "comput_speed_knots" in data.columns
+        else "speed_over_ground_knots"
+    )
+    speeds = data[speed_column].to_numpy(dtype=np.float64)[order]
+    mean_speed = np.add.reduceat(np.nan_to_num(speeds), traj_start) / traj_len
+
+    # every trajectory draws the same numbers, selected or not
+    chosen = rng.random(n_traj) < fraction
+    kinds = rng.integers(len(anomaly_types), size=n_traj)
+    offset_draw = rng.random(n_traj)
+    factor_draw = rng.random(n_traj)
+
+    selected = (
+        chosen & (traj_len >= MIN_TRAJECTORY_POINTS) & (mean_speed >= MIN_MOVING_KNOTS)
+    )
+    # the labeled segment [offset, offset + seg_len) keeps a report before it
+    # (overspeed) or after it (speed abnormality) in the trajectory
+    seg_len = np.minimum(segment_points, traj_len - 1)
+    is_overspeed = np.array(anomaly_types)[kinds] == "overspeed"
+    offset = (
+        np.floor(offset_draw * (traj_len - seg_len)).astype(np.int64) + is_overspeed
+    )
+
+    def segment_points_of(trajectories):
+        """Sorted indices of the labeled segment of each of the trajectories."""
+        in_segment = (
+            trajectories[traj_of]
+            & (pos_in_traj >= offset[traj_of])
+            & (pos_in_traj < offset[traj_of] + seg_len[traj_of])
+        )
+        return np.flatnonzero(in_segment)
+
+    new_times = times.copy()
+    factors = np.full(n_traj, np.nan)
+    labeled = {kind: np.empty(0, dtype=np.int64) for kind in anomaly_types}
+    updates = {}
+
+    if "overspeed" in anomaly_types:
+        overspeed = selected & is_overspeed
+        points = segment_points_of(overspeed)
+        speedup = SPEEDUP_RANGE[0] + factor_draw * (SPEEDUP_RANGE[1] - SPEEDUP_RANGE[0])
+        segment_max = np.zeros(n_traj)
+        np.maximum.at(segment_max, traj_of[points], np.nan_to_num(speeds[points]))
+        segment_mean = np.bincount(
+            traj_of[points], np.nan_to_num(speeds[points]), minlength=n_traj
+        ) / np.maximum(np.bincount(traj_of[points], minlength=n_traj), 1)
+        with np.errstate(divide="ignore"):
+            speedup = np.minimum(speedup, MAX_INJECTED_KNOTS / segment_max)
+        # a moored segment sped up is still too slow to be an overspeed
+        overspeed &= (speedup >= MIN_SPEEDUP) & (segment_mean >= MIN_MOVING_KNOTS)
+        points = segment_points_of(overspeed)
+
+        # compress the time from the report before the segment to its end;
+        # the reports after the segment move earlier by the time saved
+        moved = np.flatnonzero(overspeed[traj_of])
+        trajectories = traj_of[moved]
+        t0 = times[traj_start[trajectories] + offset[trajectories] - 1]
+        t1 = times[
+            traj_start[trajectories] + offset[trajectories] + seg_len[trajectories] - 1
+        ]
+        saved = (np.clip(times[moved], t0, t1) - t0) * (1 - 1 / speedup[trajectories])
+        new_times[moved] = times[moved] - np.round(saved).astype(np.int64)
+
+        computed = data["comput_speed_knots"].to_numpy(dtype=np.float64)[order]
+        hours = (new_times[points] - new_times[points - 1]) / NS_PER_HOUR
+        distances = haversine_km(
+            lon[points - 1], lat[points - 1], lon[points], lat[points]
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            computed[points] = np.where(
+                hours > 0,
+                distances / hours / KM_PER_NAUTICAL_MILE,
+                computed[points] * speedup[traj_of[points]],
+            )
+        updates["comput_speed_knots"] = computed
+
+        if "speed_over_ground_knots" in data.columns:
+            # the report before the segment already sails at the new speed
+            sog = data["speed_over_ground_knots"].to_numpy(dtype=np.float64)[order]
+            faster = np.union1d(points - 1, points)
+            sog[faster] = np.round(sog[faster] * speedup[traj_of[faster]], 1)
+            updates["speed_over_ground_knots"] = sog
+
+        factors[overspeed] = speedup[overspeed]
+        labeled["overspeed"] = points
+
+    if "speed abnormality" in anomaly_types:
+        abnormal = selected & ~is_overspeed
+        points = segment_points_of(abnormal)
+        after = points + 1
+
+        distances = data["distances_km"].to_numpy(dtype=np.float64)[order][after]
+        unknown = ~np.isfinite(distances)
+        distances[unknown] = haversine_km(
+            lon[points[unknown]],
+            lat[points[unknown]],
+            lon[after[unknown]],
+            lat[after[unknown]],
+        )
+        hours = (new_times[after] - new_times[points]) / NS_PER_HOUR
+        with np.errstate(divide="ignore", invalid="ignore"):
+            implied = np.where(hours > 0, distances / hours / KM_PER_NAUTICAL_MILE, 0)
+        perturbed = implied >= MIN_IMPLIED_KNOTS
+        points = points[perturbed]
+
+        divisor = SOG_DIVISOR_RANGE[0] + factor_draw * (
+            SOG_DIVISOR_RANGE[1] - SOG_DIVISOR_RANGE[0]
+        )
+        sog = updates.get("speed_over_ground_knots")
+        if sog is None:
+            sog = data["speed_over_ground_knots"].to_numpy(dtype=np.float64)[order]
+        # rounded down so the implied speed stays above divisor times the SOG
+        sog[points] = np.floor(implied[perturbed] / divisor[traj_of[points]] * 10) / 10
+        updates["speed_over_ground_knots"] = sog
+
+        factors[abnormal] = divisor[abnormal]
+        labeled["speed abnormality"] = points
+
+    # back to the row order of data
+    injected = data.reset_index(drop=True)
+    for column, values in updates.items():
+        unsorted = np.empty(n)
+        unsorted[order] = values
+        injected[column] = unsorted.astype(data[column].dtype)
+    if (new_times != times).any():
+        unsorted = np.empty(n, dtype=np.int64)
+        unsorted[order] = new_times
+        utc = utc_times(unsorted)
+        if data["datetime_utc"].dt.tz is None:
+            utc = utc.tz_convert(None)
+        injected["datetime_utc"] = utc
+    for kind in anomaly_types:
+        flags = np.zeros(n, dtype=bool)
+        flags[order[labeled[kind]]] = True
+        injected[FLAG_COLUMNS[kind]] = flags
+
+    labels = []
+    for kind, points in labeled.items():
+        if len(points) == 0:
+            continue
+        trajectories, first, counts = np.unique(
+            traj_of[points], return_index=True, return_counts=True
+        )
+        last = first + counts - 1
+        labels.append(
+            pd.DataFrame(
+                {
+                    "MMSI": mmsi[points[first]],
+                    "anomaly_type": kind,
+                    "start_time": utc_times(new_times[points[first]]),
+                    "end_time": utc_times(new_times[points[last]]),
+                    "n_points": counts,
+                    "factor": factors[trajectories],
+                }
+            )
+        )
+    return injected, pd.concat(labels or [empty_labels()], ignore_index=True)
+
+
+def utc_times(times_ns):
+    """Epoch nanoseconds as UTC timestamps (pd.to_datetime is slow on integers)."""
+    return pd.DatetimeIndex(times_ns.view("datetime64[ns]")).tz_localize("UTC")
+
+
+def empty_labels():
+    return pd.DataFrame(
+        {
+            "MMSI": pd.Series(dtype=np.int64),
+            "anomaly_type": pd.Series(dtype=object),
+            "start_time": pd.Series(dtype="datetime64[ns, UTC]"),
+            "end_time": pd.Series(dtype="datetime64[ns, UTC]"),
+            "n_points": pd.Series(dtype=np.int64),
+            "factor": pd.Series(dtype=np.float64),
+        }
+    )
@@ -10,13 +10,139 @@
 import pandas as pd
 import numpy as np
 
+from common.instrumentation import DEBUG_VERBOSITY, stage
+from common.quantile_sketch import QuantileSketch
 
-def overspeeding(params, filtered_data):
+# Rows added to the quantile sketch at a time in "sketch" mode
+SKETCH_CHUNK_ROWS = 1_000_000
+
+
+def overspeeding(params, filtered_data, speed_sketch=None):
+    """
+    Flags the points faster than the percentile of all valid speeds. In
+    "sketch" mode speed_sketch, when given, already holds those speeds (the
+    loaders add each month or chunk to it, see add_valid_speeds).
+    """
+    percentile = get_percentile(params)
+
+    additionally_filtered_data = prepare_speeds(filtered_data)
+
+    with stage("speed_threshold", len(additionally_filtered_data)) as timer:
+        speed_threshold, filtered_data = compute_speed_threshold(
+            additionally_filtered_data,
+            percentile,
+            method=params["threshold_method"],
+            relative_accuracy=params["sketch_accuracy"],
+            sketch=speed_sketch,
+        )
+        timer.rows_out = 1
+
+    with stage("overspeed_flags", len(additionally_filtered_data)) as timer:
+        additionally_filtered_data["overspeed_flag"] = (
+            additionally_filtered_data["computed_speed_knots"] > speed_threshold
+        )
+        timer.rows_out = int(additionally_filtered_data["overspeed_flag"].sum())
+
+    # formatting the frames is expensive on large runs, so only on request
+    if params["verbosity"] >= DEBUG_VERBOSITY:
+        print(
+            f"DEBUG All Filtered Data:\n{additionally_filtered_data[['datetime_utc', 'computed_speed_knots', 'overspeed_flag']]}\n"
+        )
+
+        print(
+            f"DEBUG Flagged Data:\n{additionally_filtered_data[additionally_filtered_data['overspeed_flag']][['datetime_utc', 'computed_speed_knots', 'overspeed_flag']]}\n"
+        )
+
+    return additionally_filtered_data
+
+
+def overspeeding_by_group(params, filtered_data):
+    """
+    Grouped variant of overspeeding: one speed threshold per group of
+    params["group_by"] ("vessel_class", "length" binned by
+    params["length_bins"], "month"), all computed in a single grouped pass,
+    with every point flagged against its own group's threshold.
+
+    Returns the flagged data (with a speed_threshold column) and the
+    threshold table, one row per group.
+    """
+    percentile = get_percentile(params)
+
+    additionally_filtered_data = prepare_speeds(filtered_data)
+
+    with stage("speed_threshold", len(additionally_filtered_data)) as timer:
+        group_keys = build_speed_groups(
+            additionally_filtered_data, params["group_by"], params["length_bins"]
+        )
+        grouped_speeds = additionally_filtered_data["computed_speed_knots"].groupby(
+            group_keys, observed=True, dropna=False, sort=True
+        )
+
+        # np.percentile's linear interpolation, for every group at once
+        thresholds = grouped_speeds.quantile(percentile)
+        group_ids = grouped_speeds.ngroup().to_numpy()
+        timer.rows_out = len(thresholds)
+
+    with stage("overspeed_flags", len(additionally_filtered_data)) as timer:
+        additionally_filtered_data["speed_threshold"] = thresholds.to_numpy()[group_ids]
+        additionally_filtered_data["overspeed_flag"] = (
+            additionally_filtered_data["computed_speed_knots"]
+            > additionally_filtered_data["speed_threshold"]
+        )
+        timer.rows_out = int(additionally_filtered_data["overspeed_flag"].sum())
+
+    threshold_table = pd.DataFrame(
+        {
+            "n_points": grouped_speeds.size(),
+            "speed_threshold": thresholds,
+            "n_flagged": additionally_filtered_data["overspeed_flag"]
+            .groupby(group_keys, observed=True, dropna=False, sort=True)
+            .sum(),
+        }
+    ).reset_index()
+
+    print(f"Speed thresholds successfully generated:\n{threshold_table}\n")
+
+    return additionally_filtered_data, threshold_table
+
+
+def build_speed_groups(data, group_by, length_bins):
+    """Group key Series for overspeeding_by_group, named after the group."""
+    group_keys = []
+
+    for group in group_by:
+        if group == "vessel_class":
+            group_keys.append(data["vessel_class"])
+        elif group == "length":
+            group_keys.append(
+                pd.cut(data["length_m"], bins=length_bins, right=False).rename(
+                    "length_bin"
+                )
+            )
+        elif group == "month":
+            group_keys.append(
+                data["datetime_utc"]
+                .dt.tz_convert(None)
+                .dt.to_period("M")
+                .rename("month")
+            )
+        else:
+            raise ValueError(f"Unknown speed threshold group: {group}")
+
+    return group_keys
+
+
+def get_percentile(params):
     percentile = 0.99  # default
 
     if params["percentile"] is not None:
         percentile = params["percentile"]
 
+    return percentile
+
+
+def prepare_speeds(filtered_data):
+    """Coerces the computed speeds and applies the overspeed-specific filters."""
     # get rid of NaN speeds
     filtered_data = filtered_data.assign(
         computed_speed_knots=pd.to_numeric(
@@ -24,47 +150,67 @@ def overspeeding(params, filtered_data):
         )
     ).dropna(subset=["comput_speed_knots"])
 
-    additionally_filtered_data = apply_additional_overspeed_filters(filtered_data)
+    return apply_additional_overspeed_filters(filtered_data)
 
-    speed_threshold, filtered_data = compute_speed_threshold(
-        additionally_filtered_data, percentile
-    )
 
-    additionally_filtered_data["overspeed_flag"] = (
-        additionally_filtered_data["computed_speed_knots"] > speed_threshold
-    )
+def add_valid_speeds(sketch, filtered_data):
+    """
+    Adds the computed speeds of filtered_data that prepare_speeds keeps to
+    sketch, so a loader can sketch each month or chunk as it is filtered
+    instead of the combined data being sketched afterwards.
+    """
+    speeds = pd.to_numeric(filtered_data["comput_speed_knots"], errors="coerce")
+    keep = overspeed_filter_mask(filtered_data["status"], speeds)
+    return sketch.add(speeds[keep].to_numpy())
 
-    print(
-        f"DEBUG All Filtered Data:\n{additionally_filtered_data[['datetime_utc', 'comput_speed_knots', 'overspeed_flag']]}\n"
-    )
 
-    print(
-        f"DEBUG Flagged Data:\n{additionally_filtered_data[additionally_filtered_data['overspeed_flag']][['datetime_utc', 'computed_speed_knots', 'overspeed_flag']]}\n"
-    )
+def apply_additional_overspeed_filters(filtered_ais_data):
+    with stage("apply_additional_overspeed_filters", len(filtered_ais_data)) as timer:
+        newly_filtered_data = filtered_ais_data[
+            overspeed_filter_mask(
+                filtered_ais_data["status"], filtered_ais_data["computed_speed_knots"]
+            )
+        ]
+        timer.rows_out = len(newly_filtered_data)
 
-    return additionally_filtered_data
+    return newly_filtered_data
 
 
-def apply_additional_overspeed_filters(filtered_ais_data):
+def overspeed_filter_mask(status, speeds):
+    """True for the points the overspeed rule keeps (NaN speeds are dropped)."""
     # Remove stopped or moored data points where status code is 1 OR 5
     # AND the computed speed < 0.1 knots
-    mask_status = ~(
-        (
-            (filtered_ais_data["status"].isin([1, 5]))
-            & (filtered_ais_data["computed_speed_knots"] < 0.1)
-        )
-    )
+    mask_status = ~((status.isin([1, 5])) & (speeds < 0.1))
     # The world's fastest ship can go 58 knots, per:
     # https://maritimepage.com/what-is-the-fastest-ship-in-the-world/
     # We're being safe and adding a bit more to that, which is how
     # we get to 65 knots as the "outlier" threshold
-    mask_speed = filtered_ais_data["computed_speed_knots"] <= 65
-    newly_filtered_data = filtered_ais_data[mask_status & mask_speed]
+    mask_speed = speeds <= 65
+    return mask_status & mask_speed
 
-    return newly_filtered_data
 
+def compute_speed_threshold(
+    filtered_ais_data, percentile, method="exact", relative_accuracy=0.001, sketch=None
+):
+    """
+    method="exact" takes np.percentile of every valid speed and returns
+    (threshold, valid_speeds). method="sketch" estimates it from a mergeable
+    QuantileSketch, within relative_accuracy of the exact value, and returns
+    (threshold, sketch); the sketch of filtered_ais_data's speeds is built
+    here unless it is passed in.
+    """
+    if method == "sketch":
+        if sketch is None:
+            sketch = build_speed_sketch(filtered_ais_data, relative_accuracy)
+        speed_threshold = sketch.quantile(percentile)
+
+        print(
+            f"Speed threshold successfully estimated: {speed_threshold} knots "
+            f"(within {relative_accuracy:.2%} of the exact percentile)\n"
+        )
+
+        return speed_threshold, sketch
 
-def compute_speed_threshold(filtered_ais_data, percentile):
     valid_speeds = (
         filtered_ais_data["computed_speed_knots"]
         .replace([np.inf, -np.inf], np.nan)
@@ -76,3 +222,47 @@ def compute_speed_threshold(filtered_ais_data, percentile):
     print(f"Speed threshold successfully generated: {speed_threshold} knots\n")
 
     return speed_threshold, valid_speeds
+
+
+def sorted_percentiles(sorted_values, percentiles):
+    """
+    np.percentile(values, percentile * 100) for every percentile, read off
+    values that are already sorted, so many percentiles (and many subsets
+    of one sorted array) cost no further sorting. The interpolation repeats
+    np.percentile's arithmetic step by step, so the thresholds are identical
+    to those compute_speed_threshold gives, down to the last bit.
+    """
+    last = len(sorted_values) - 1
+    thresholds = []
+
+    for percentile in percentiles:
+        rank = last * (percentile * 100 / 100)
+        lower = min(int(np.floor(rank)), last)
+        fraction = rank - lower
+        below = sorted_values[lower]
+        above = sorted_values[min(lower + 1, last)]
+
+        difference = above - below
+        if fraction >= 0.5:
+            thresholds.append(above - difference * (1 - fraction))
+        else:
+            thresholds.append(below + difference * fraction)
+
+    return thresholds
+
+
+def build_speed_sketch(filtered_ais_data, relative_accuracy=0.001):
+    """
+    Sketches the computed speeds of already loaded data chunk by chunk,
+    merging the partial sketches, so the valid speeds are never copied out
+    as a whole. main's loaders instead sketch each month or chunk as they
+    filter it (see add_valid_speeds) and merge those sketches.
+    """
+    speeds = filtered_ais_data["computed_speed_knots"].to_numpy()
+
+    sketch = QuantileSketch(relative_accuracy)
+    for start in range(0, len(speeds), SKETCH_CHUNK_ROWS):
+        chunk = speeds[start : start + SKETCH_CHUNK_ROWS]
+        sketch.merge(QuantileSketch.from_values(chunk, relative_accuracy))
+
+    return sketch
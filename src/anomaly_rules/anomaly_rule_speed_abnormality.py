@@ -7,6 +7,130 @@
 #  This software is distributed under the 3-clause BSD License.
 #  ___________________________________________________________________________
 
+import numpy as np
+import pandas as pd
+
+from common.geodesy import KM_PER_NAUTICAL_MILE, haversine_km
+from common.instrumentation import stage
+from common.obtain_and_process_traj import segment_trajectories
+
+
+def speed_abnormality(params, filtered_data):
+    """
+    Applies the Hu et al. speed abnormality rule to every trajectory in the
+    filtered AIS data, as split by segment_trajectories (a vessel's points
+    with no gap over 30 minutes, of at least 5 points and enough area).
+    distances_km is recomputed between consecutive points of each
+    trajectory, since the point before a point in the file may have been
+    filtered out.
+
+    Returns the points of the trajectories with traj_id and
+    speed_abnormality_flag columns (MMSI index preserved) and the
+    per-trajectory label table.
+    """
+    with stage("segment_trajectories", len(filtered_data)) as timer:
+        data, summary = segment_trajectories(
+            filtered_data, time_col="datetime_utc", workers=params["workers"]
+        )
+        timer.rows_out = len(data)
+    data["distances_km"] = distances_from_previous_km(data)
+
+    with stage("speed_abnormality", len(data)) as timer:
+        point_flags, trajectory_labels = detect_speed_abnormality_batch(data)
+        timer.rows_out = int(point_flags.sum())
+    data["speed_abnormality_flag"] = point_flags
+
+    trajectory_labels = summary[["traj_id", "MMSI", "start_time", "end_time"]].merge(
+        trajectory_labels, on="traj_id"
+    )
+
+    print(
+        f"Speed abnormalities found at {int(point_flags.sum())} points in "
+        f"{int(trajectory_labels['anomalous'].sum())} of "
+        f"{len(trajectory_labels)} trajectories.\n"
+    )
+
+    return data.set_index("MMSI"), trajectory_labels
+
+
+def distances_from_previous_km(points, traj_col="traj_id"):
+    """
+    Great-circle distance (km) of each point from the point before it in its
+    trajectory (NaN for the first). Trajectories must be contiguous and in
+    time order, as segment_trajectories returns them.
+    """
+    traj_ids = points[traj_col].to_numpy()
+    lon = points["lon"].to_numpy(dtype=np.float64)
+    lat = points["lat"].to_numpy(dtype=np.float64)
+
+    distances = np.full(len(points), np.nan, dtype=np.float32)
+    same_traj = np.flatnonzero(traj_ids[1:] == traj_ids[:-1])
+    distances[same_traj + 1] = haversine_km(
+        lon[same_traj], lat[same_traj], lon[same_traj + 1], lat[same_traj + 1]
+    )
+    return distances
+
+
+def detect_speed_abnormality_batch(
+    ais_data, traj_col="traj_id", time_col="datetime_utc"
+):
+    """
+    Vectorized detect_speed_abnormality over every trajectory in ais_data at
+    once, using shifted NumPy arrays instead of a loop over rows.
+
+    Points of a trajectory must appear in time order, as they do in the
+    traj_points passed to detect_speed_abnormality; trajectories do not need
+    to be contiguous. Any time column gives the same result, since only
+    differences between consecutive points are used.
+    -------------------------------------------------------------------------------
+    INPUTS:
+    ais_data = pandas dataframe with traj_col, time_col, distances_km and
+               speed_over_ground_knots columns
+
+    Outputs:
+    point_flags = boolean numpy array, True for the points of ais_data found to be anomalous
+    trajectory_labels = dataframe with one row per trajectory: traj_col, n_points,
+                        n_abnormal and anomalous (0/1, as returned by detect_speed_abnormality)
+    """
+    traj_ids = ais_data[traj_col].to_numpy()
+    order = np.argsort(traj_ids, kind="stable")
+
+    traj_ids = traj_ids[order]
+    times_ns = (
+        ais_data[time_col].dt.tz_convert(None)
+        if ais_data[time_col].dt.tz is not None
+        else ais_data[time_col]
+    )
+    times_ns = np.asarray(times_ns, dtype="datetime64[ns]").view(np.int64)[order]
+    distances = ais_data["distances_km"].to_numpy(dtype=np.float64)[order]
+    speeds = ais_data["speed_over_ground_knots"].to_numpy(dtype=np.float64)[order]
+
+    # compare each point j with the point j+1 that follows it in the same trajectory
+    same_traj = traj_ids[1:] == traj_ids[:-1]
+    hours_btwn_pts = (times_ns[1:] - times_ns[:-1]) / 1e9 / 3600
+    moved_in_time = same_traj & (hours_btwn_pts != 0)
+
+    # average speed between the points, km/hr to knots
+    avg_speed = np.full(len(hours_btwn_pts), np.nan)
+    np.divide(distances[1:], hours_btwn_pts, out=avg_speed, where=moved_in_time)
+    avg_speed /= KM_PER_NAUTICAL_MILE
+
+    sorted_flags = np.zeros(len(traj_ids), dtype=bool)
+    sorted_flags[:-1] = moved_in_time & (avg_speed > 2 * speeds[:-1])
+
+    point_flags = np.empty_like(sorted_flags)
+    point_flags[order] = sorted_flags
+
+    trajectory_labels = (
+        pd.DataFrame({traj_col: traj_ids, "speed_abnormality_flag": sorted_flags})
+        .groupby(traj_col, sort=True)["speed_abnormality_flag"]
+        .agg(n_points="size", n_abnormal="sum")
+        .reset_index()
+    )
+    trajectory_labels["anomalous"] = (trajectory_labels["n_abnormal"] > 0).astype(int)
+
+    return point_flags, trajectory_labels
+
 
 def detect_speed_abnormality(traj_points):
     """
@@ -0,0 +1,178 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import os
+import shutil
+import pandas as pd
+
+from common.ais_schema import apply_ais_schema, columns_for
+from common.derived_speeds import derive_speeds, missing_derived_columns
+from common.timestamps import parse_timestamps
+from common.filter_trajectories import ensure_utc
+from common.spatial_index import (
+    PARTITION_CELL_DEG,
+    cells_in_bbox,
+    grid_cells,
+    region_bounds,
+)
+
+CACHE_DIR_NAME = "parquet"
+PARTITION_COL = "vessel_class"
+# Coarse spatial grid cell of each point (see common.spatial_index)
+GRID_CELL_COL = "grid_cell"
+# Written last, so a partially converted month is never mistaken for a valid
+# one. It holds the cache layout version; caches of other versions are rebuilt.
+COMPLETE_MARKER = "_COMPLETE"
+CACHE_VERSION = "2"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "The columnar AIS cache requires pyarrow. Install it with "
+            "`pip install pyarrow` or use the CSV loader."
+        ) from e
+    return pyarrow
+
+
+def pyarrow_available():
+    try:
+        _import_pyarrow()
+    except ImportError:
+        return False
+    return True
+
+
+def cache_dir_for(data_dir, file_stem):
+    """Directory holding the columnar copy of data_dir/<file_stem>.csv"""
+    return os.path.join(data_dir, CACHE_DIR_NAME, file_stem)
+
+
+def is_cached(data_dir, file_stem):
+    """
+    A month is cached when its conversion finished, with the current cache
+    layout, and is not older than the source CSV (if the CSV is still around).
+    """
+    marker = os.path.join(cache_dir_for(data_dir, file_stem), COMPLETE_MARKER)
+    if not os.path.exists(marker):
+        return False
+    with open(marker) as f:
+        if f.read().strip() != CACHE_VERSION:
+            return False
+
+    csv_path = os.path.join(data_dir, f"{file_stem}.csv")
+    if os.path.exists(csv_path):
+        return os.path.getmtime(marker) >= os.path.getmtime(csv_path)
+    return True
+
+
+def convert_csv_to_parquet(data_dir, file_stem, row_group_size=256_000):
+    """
+    One-time conversion of data_dir/<file_stem>.csv to a Parquet dataset
+    partitioned by vessel_class and by the coarse spatial grid cell of each
+    point, so class and region queries only open the files that can match.
+    Timestamps are parsed once here and the columns are cast to the AIS
+    schema (class labels normalized) so readers never redo either.
+    Rows are sorted by datetime_utc so row-group statistics can prune on time.
+    distances_km and comput_speed_knots are derived if the CSV lacks them.
+    """
+    pa = _import_pyarrow()
+
+    csv_path = os.path.join(data_dir, f"{file_stem}.csv")
+    out_dir = cache_dir_for(data_dir, file_stem)
+    tmp_dir = out_dir + ".tmp"
+
+    data = pd.read_csv(csv_path)
+    parse_timestamps(data)
+    apply_ais_schema(data)
+    derived_columns = missing_derived_columns(data.columns)
+    if derived_columns:
+        derive_speeds(data, derived_columns)
+    data[GRID_CELL_COL] = grid_cells(data["lon"], data["lat"], PARTITION_CELL_DEG)
+    data = data.sort_values("datetime_utc", kind="stable")
+
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    pa.parquet.write_to_dataset(
+        pa.Table.from_pandas(data, preserve_index=False),
+        tmp_dir,
+        partition_cols=[PARTITION_COL, GRID_CELL_COL],
+        row_group_size=row_group_size,
+    )
+    with open(os.path.join(tmp_dir, COMPLETE_MARKER), "w") as f:
+        f.write(CACHE_VERSION)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+    return out_dir
+
+
+def build_pushdown_filters(params):
+    """
+    Translates the filter_ais_data predicates that Parquet can evaluate from
+    row-group statistics and partition paths (vessel class, length, timeframe,
+    region bounding box) into pyarrow DNF filters. Hour constraints and the
+    exact region test are left to filter_ais_data.
+    """
+    filters = [(PARTITION_COL, "in", list(params["vessel_class"]))]
+
+    length_range = params["length_range"]
+    if length_range is not None:
+        filters.append(("length_m", ">=", length_range[0]))
+        filters.append(("length_m", "<=", length_range[1]))
+
+    start = params["timeframe"]["start"]
+    end = params["timeframe"]["end"]
+    if start is not None:
+        filters.append(("datetime_utc", ">=", ensure_utc(start)))
+    if end is not None:
+        filters.append(("datetime_utc", "<=", ensure_utc(end)))
+
+    bounds = region_bounds(params)
+    if bounds is not None:
+        cells = cells_in_bbox(bounds, PARTITION_CELL_DEG)
+        filters.append((GRID_CELL_COL, "in", cells.tolist()))
+        filters.append(("lon", ">=", bounds[0]))
+        filters.append(("lat", ">=", bounds[1]))
+        filters.append(("lon", "<=", bounds[2]))
+        filters.append(("lat", "<=", bounds[3]))
+
+    return filters
+
+
+def read_cached_month(data_dir, file_stem, params):
+    """
+    Reads a cached month with the vessel class/length/timeframe predicates
+    pushed down into the scan. Only the columns the anomaly rule needs, from
+    the matching partitions and row groups, are materialized.
+    """
+    pa = _import_pyarrow()
+    import pyarrow.dataset
+
+    dataset = pa.dataset.dataset(
+        cache_dir_for(data_dir, file_stem), format="parquet", partitioning="hive"
+    )
+
+    columns = columns_for(params["anomaly_type"])
+    if columns is not None:
+        columns = [col for col in columns if col in dataset.schema.names]
+
+    table = dataset.to_table(
+        columns=columns,
+        filter=pa.parquet.filters_to_expression(build_pushdown_filters(params)),
+    )
+
+    data = table.to_pandas()
+    if GRID_CELL_COL in data.columns:
+        data = data.drop(columns=GRID_CELL_COL)
+
+    return apply_ais_schema(data)
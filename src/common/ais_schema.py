@@ -0,0 +1,162 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import logging
+import numpy as np
+import pandas as pd
+
+# Configured by the entry point (see main.configure_logging), not on import
+logger = logging.getLogger(__name__)
+
+# Columns every run needs: the filter_ais_data predicates plus the keys and
+# positions that identify a point in the output. datetime_hst is not read;
+# it is derived from datetime_utc (see common.timestamps.ensure_hst).
+BASE_COLUMNS = [
+    "MMSI",
+    "datetime_utc",
+    "lat",
+    "lon",
+    "vessel_class",
+    "length_m",
+]
+
+# Additional columns read for each anomaly rule
+RULE_COLUMNS = {
+    "overspeed": ["status", "comput_speed_knots"],
+    # distances are recomputed between the points of each trajectory
+    "speed abnormality": ["speed_over_ground_knots"],
+}
+
+# Speeds, distances and lengths are reported to about 0.1 precision, which
+# float32 (~7 significant digits) holds exactly. Positions stay float64: at
+# Hawaiian longitudes float32 only resolves ~1.5 m, which is comparable to the
+# displacement between consecutive reports and would distort derived speeds.
+FLOAT32_COLUMNS = [
+    "length_m",
+    "comput_speed_knots",
+    "speed_over_ground_knots",
+    "distances_km",
+]
+FLOAT64_COLUMNS = ["lat", "lon"]
+CATEGORICAL_COLUMNS = ["vessel_class"]
+
+# The vessel classes of the Hawaii GT data and the vessel lengths (m) a
+# length range may span
+VESSEL_CLASSES = [
+    "cargo",
+    "diving",
+    "fishing",
+    "industrial vessel",
+    "military",
+    "offshore supply vessel",
+    "oil recovery",
+    "other",
+    "passenger",
+    "pilot vessel",
+    "pleasure craft/sailing",
+    "port tender",
+    "public vessel, unclassified",
+    "research vessel",
+    "school ship",
+    "search and rescue vessel",
+    "tanker",
+    "tug tow",
+]
+LENGTH_LIMITS_M = [1, 400]
+
+
+def columns_for(anomaly_type):
+    """Columns to read for a run of the given anomaly rule (None reads all)."""
+    if anomaly_type not in RULE_COLUMNS:
+        return None
+    return BASE_COLUMNS + RULE_COLUMNS[anomaly_type]
+
+
+def read_ais_csv(file_path, anomaly_type=None, **read_csv_kwargs):
+    """
+    pd.read_csv restricted to the columns anomaly_type needs, with
+    vessel_class read as a categorical. Returns a DataFrame, or a chunk
+    iterator when chunksize is passed; either way apply_ais_schema still has
+    to be applied to what is read.
+    """
+    columns = columns_for(anomaly_type)
+    usecols = None if columns is None else (lambda col: col in columns)
+
+    return pd.read_csv(
+        file_path,
+        usecols=usecols,
+        dtype={col: "category" for col in CATEGORICAL_COLUMNS},
+        **read_csv_kwargs,
+    )
+
+
+def apply_ais_schema(ais_data):
+    """
+    Casts the columns of ais_data to the compact AIS schema in place and
+    returns it. Numeric columns are coerced, so unparseable values become NaN
+    as they did in overspeeding.
+    """
+    for col in FLOAT32_COLUMNS:
+        if col in ais_data.columns and ais_data[col].dtype != np.float32:
+            ais_data[col] = pd.to_numeric(ais_data[col], errors="coerce").astype(
+                np.float32
+            )
+
+    for col in FLOAT64_COLUMNS:
+        if col in ais_data.columns and ais_data[col].dtype != np.float64:
+            ais_data[col] = pd.to_numeric(ais_data[col], errors="coerce")
+
+    if "status" in ais_data.columns:
+        ais_data["status"] = pd.to_numeric(
+            ais_data["status"], errors="coerce", downcast="integer"
+        )
+
+    # 9-digit MMSIs fit in uint32; anything else is left alone
+    if "MMSI" in ais_data.columns and ais_data["MMSI"].dtype.kind in "iu":
+        ais_data["MMSI"] = pd.to_numeric(ais_data["MMSI"], downcast="unsigned")
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in ais_data.columns:
+            ais_data[col] = normalize_vessel_class(ais_data[col])
+
+    return ais_data
+
+
+def normalize_vessel_class(vessel_class):
+    """
+    Lower-cases and strips vessel class labels, returning a categorical.
+    For categorical input only the categories are touched, not every row.
+    """
+    if not isinstance(vessel_class.dtype, pd.CategoricalDtype):
+        vessel_class = vessel_class.astype("category")
+
+    categories = vessel_class.cat.categories
+    normalized = pd.Index(categories.astype(str).str.lower().str.strip())
+    if normalized.equals(categories) and normalized.is_unique:
+        return vessel_class
+
+    # labels such as "Cargo" and "cargo " collapse onto the same category
+    new_categories = normalized.unique()
+    recode = new_categories.get_indexer(normalized)
+    codes = vessel_class.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, recode[codes], -1)
+
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=new_categories),
+        index=vessel_class.index,
+        name=vessel_class.name,
+    )
+
+
+def report_memory(stage, ais_data):
+    """Logs (at INFO) the resident size of ais_data after a pipeline stage."""
+    if ais_data is None or not logger.isEnabledFor(logging.INFO):
+        return
+    size_mb = ais_data.memory_usage(deep=True).sum() / 1024**2
+    logger.info("Memory after %s: %.1f MB (%d rows)", stage, size_mb, len(ais_data))
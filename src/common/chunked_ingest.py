@@ -0,0 +1,149 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import pandas as pd
+
+from common.ais_schema import apply_ais_schema, read_ais_csv, report_memory
+from common.derived_speeds import (
+    SpeedDeriver,
+    derive_speeds,
+    missing_derived_columns,
+)
+from common.timestamps import parse_timestamps
+from common.filter_trajectories import filter_ais_data
+from common.instrumentation import stage, timed_chunks
+from common.manifest import read_zone_runs
+
+DEFAULT_CHUNK_ROWS = 500_000
+MIN_CHUNK_ROWS = 1_000
+# Rows read to estimate the in-memory size of a parsed row
+SAMPLE_ROWS = 10_000
+# A raw chunk is held alongside its parsed timestamps and the filter masks/copies,
+# so only a fraction of the budget can go to the raw rows themselves
+WORKING_SET_FACTOR = 4
+
+
+def read_header(file_path):
+    """Reads only the column names of a CSV (used for preflight validation)."""
+    return list(pd.read_csv(file_path, nrows=0).columns)
+
+
+def derive_chunk_size(file_path, memory_budget_mb, anomaly_type=None):
+    """
+    Number of rows per chunk that keeps a chunk's working set within
+    memory_budget_mb, estimated from the parsed size of the first rows.
+    """
+    if memory_budget_mb is None:
+        return DEFAULT_CHUNK_ROWS
+
+    sample = apply_ais_schema(read_ais_csv(file_path, anomaly_type, nrows=SAMPLE_ROWS))
+    if sample.empty:
+        return DEFAULT_CHUNK_ROWS
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+
+    budget_bytes = memory_budget_mb * 1024**2
+    chunk_rows = int(budget_bytes / (bytes_per_row * WORKING_SET_FACTOR))
+
+    return max(chunk_rows, MIN_CHUNK_ROWS)
+
+
+def read_and_filter_in_chunks(
+    params, file_path, chunk_size=None, runs=None, speed_sketch=None
+):
+    """
+    Streams file_path in chunks, applying filter_ais_data to each chunk so
+    that only the filtered rows are ever accumulated. Peak memory is one raw
+    chunk plus the filtered output.
+
+    runs: (byte offset, rows) runs from common.manifest.matching_zone_runs;
+    when given, only those rows are read.
+
+    distances_km and comput_speed_knots are derived from the positions and
+    times of each chunk, before it is filtered, when the file does not have
+    them (see common.derived_speeds). If a vessel's reports are not in time
+    order across chunks, the chunked derivation would measure some of them
+    from the wrong report, so the whole file is read and derived at once
+    instead.
+
+    speed_sketch: a QuantileSketch that the valid speeds of every filtered
+    chunk are added to (see add_valid_speeds), for the sketch overspeed
+    threshold.
+    """
+    if chunk_size is None:
+        chunk_size = derive_chunk_size(
+            file_path, params["memory_budget_mb"], params["anomaly_type"]
+        )
+
+    deriver = None
+    derived_columns = missing_derived_columns(
+        read_header(file_path), params["anomaly_type"]
+    )
+    if derived_columns:
+        print(
+            f"INFO: Deriving the missing columns ({', '.join(derived_columns)}) of {file_path} from its positions and times."
+        )
+        deriver = SpeedDeriver()
+        # every report is read, as each is measured from its vessel's previous one
+        runs = None
+
+    if speed_sketch is not None:
+        from anomaly_rules.anomaly_rule_overspeeding import add_valid_speeds
+
+    print(f"INFO: Streaming {file_path} in chunks of {chunk_size} rows...")
+
+    filtered_chunks = []
+    if runs is None:
+        chunks = read_ais_csv(file_path, params["anomaly_type"], chunksize=chunk_size)
+    else:
+        chunks = read_zone_runs(
+            file_path, runs, params["anomaly_type"], chunksize=chunk_size
+        )
+    for chunk in timed_chunks(chunks, "load"):
+        parse_timestamps(chunk)
+        apply_ais_schema(chunk)
+        if deriver is not None:
+            with stage("derive_speeds", rows_in=len(chunk)) as timer:
+                deriver.derive(chunk, derived_columns)
+                timer.rows_out = len(chunk)
+
+        filtered_chunk = filter_ais_data(params, chunk, warn_if_empty=False)
+        if filtered_chunk is not None:
+            filtered_chunks.append(filtered_chunk)
+
+    if deriver is not None and deriver.late:
+        print(
+            f"WARNING: {deriver.late} reports of {file_path} are older than an earlier report of their vessel in a previous chunk. Deriving the missing columns from the whole file at once instead; sort the file by time to keep streaming it in chunks."
+        )
+        filtered_chunks = []
+        data = read_ais_csv(file_path, params["anomaly_type"])
+        parse_timestamps(data)
+        apply_ais_schema(data)
+        with stage("derive_speeds", rows_in=len(data)) as timer:
+            derive_speeds(data, derived_columns)
+            timer.rows_out = len(data)
+        filtered_data = filter_ais_data(params, data, warn_if_empty=False)
+        del data
+        if filtered_data is not None:
+            filtered_chunks.append(filtered_data)
+
+    if speed_sketch is not None:
+        for filtered_chunk in filtered_chunks:
+            add_valid_speeds(speed_sketch, filtered_chunk)
+
+    if not filtered_chunks:
+        print(
+            "WARNING: Your selected parameters have resulted in all trajectories in this data file being filtered out."
+        )
+        return None
+
+    # chunks with different class labels concatenate to object dtype
+    data = apply_ais_schema(pd.concat(filtered_chunks, ignore_index=True))
+    report_memory(f"filtering {file_path}", data)
+
+    return data
@@ -0,0 +1,277 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pandas as pd
+
+from common.geodesy import project_to_km
+
+# Trajectories hulled together in one padded block. Blocks hold trajectories
+# of similar length, so little of each block is padding, and a block holds
+# fewer of them once they are long enough to fill MAX_BLOCK_CELLS.
+CHUNK_TRAJECTORIES = 4096
+MAX_BLOCK_CELLS = 1 << 20
+# Longer trajectories (after dropping interior and duplicate points) are
+# hulled one at a time, as the lockstep chain takes one step per point
+LONG_TRACK_POINTS = 2048
+
+
+def chull_area_km2(lon, lat):
+    """Area (km²) of the convex hull of one set of lon/lat points."""
+    lon = np.asarray(lon, dtype=np.float64)
+    if len(lon) == 0:
+        return 0.0
+    return batch_chull_areas_km2(lon, lat, np.zeros(len(lon), dtype=np.int64))[0]
+
+
+def chull_areas_km2(points, traj_col="traj_id", workers=1):
+    """Convex hull area (km²) of every trajectory in points, indexed by traj_col."""
+    traj_ids, areas = batch_chull_areas_km2(
+        points["lon"].to_numpy(),
+        points["lat"].to_numpy(),
+        points[traj_col].to_numpy(),
+        workers=workers,
+        return_ids=True,
+    )
+    return pd.Series(areas, index=pd.Index(traj_ids, name=traj_col))
+
+
+def batch_chull_areas_km2(
+    lon,
+    lat,
+    traj_ids,
+    workers=1,
+    chunk_trajectories=CHUNK_TRAJECTORIES,
+    return_ids=False,
+):
+    """
+    Convex hull areas (km²) of many trajectories at once, in the order of
+    np.unique(traj_ids).
+
+    Each trajectory is projected to km around its mean latitude. Points that
+    are strictly inside the quadrilateral of a trajectory's extreme points
+    cannot be on its hull and are dropped up front (Akl-Toussaint). The rest
+    are sorted once, and Andrew's monotone chain is run on blocks of
+    trajectories in lockstep, one point position per step for every
+    trajectory in the block. Trajectories with more than LONG_TRACK_POINTS
+    points left are hulled on their own by quickhull instead. Blocks can be
+    spread over worker processes.
+
+    Trajectories with fewer than three distinct points, or whose points are
+    all collinear, have an area of 0.
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+    unique_ids, group = np.unique(traj_ids, return_inverse=True)
+    group = group.ravel()
+    n_traj = len(unique_ids)
+
+    if n_traj == 0:
+        areas = np.zeros(0)
+        return (unique_ids, areas) if return_ids else areas
+
+    counts = np.bincount(group, minlength=n_traj)
+    ref_lat = np.bincount(group, weights=lat, minlength=n_traj) / counts
+    x, y = project_to_km(lon, lat, ref_lat[group])
+
+    # make each trajectory contiguous (segment_trajectories already does)
+    if np.any(group[1:] < group[:-1]):
+        order = np.argsort(group, kind="stable")
+        group, x, y = group[order], x[order], y[order]
+
+    # drop points that cannot be on the hull before paying for the sort,
+    # and centre each trajectory on its leftmost point so the shoelace sums
+    # do not work with large coordinates
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    keep = ~_inside_extreme_quadrilateral(group, x, y, starts, n_traj)
+    left = _first_where(x == np.minimum.reduceat(x, starts)[group], group, n_traj)
+    x = x - x[left][group]
+    y = y - y[left][group]
+    group, x, y = group[keep], x[keep], y[keep]
+
+    # sort by trajectory, then x, then y, and drop duplicate points
+    order = np.lexsort((y, x, group))
+    group, x, y = group[order], x[order], y[order]
+    keep = np.ones(len(group), dtype=bool)
+    keep[1:] = (group[1:] != group[:-1]) | (x[1:] != x[:-1]) | (y[1:] != y[:-1])
+    group, x, y = group[keep], x[keep], y[keep]
+    counts = np.bincount(group, minlength=n_traj)
+
+    blocks = list(_padded_blocks(group, x, y, counts, chunk_trajectories))
+    if workers > 1 and len(blocks) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            block_areas = list(
+                executor.map(_block_areas, [block[1:] for block in blocks])
+            )
+    else:
+        block_areas = [_block_areas(block[1:]) for block in blocks]
+
+    areas = np.zeros(n_traj)
+    for block, block_area in zip(blocks, block_areas):
+        areas[block[0]] = block_area
+
+    return (unique_ids, areas) if return_ids else areas
+
+
+def _inside_extreme_quadrilateral(group, x, y, starts, n_traj):
+    """
+    True for points strictly inside the quadrilateral joining the leftmost,
+    lowest, rightmost and highest points of their trajectory. Trajectories
+    are contiguous and start at starts. Degenerate quadrilaterals contain no
+    points.
+    """
+    extremes = [
+        _first_where(values == reduce.reduceat(values, starts)[group], group, n_traj)
+        for values, reduce in (
+            (x, np.minimum),
+            (y, np.minimum),
+            (x, np.maximum),
+            (y, np.maximum),
+        )
+    ]
+    left, bottom, right, top = (extreme[group] for extreme in extremes)
+
+    inside = np.ones(len(group), dtype=bool)
+    for a, b in ((left, bottom), (bottom, right), (right, top), (top, left)):
+        inside &= _cross(x[a], y[a], x[b], y[b], x, y) > 0
+    return inside
+
+
+def _first_where(mask, group, n_traj):
+    """Index of the first point of each (contiguous) trajectory where mask is set."""
+    index = np.flatnonzero(mask)
+    first = np.ones(len(index), dtype=bool)
+    first[1:] = group[index[1:]] != group[index[:-1]]
+    result = np.zeros(n_traj, dtype=np.int64)
+    result[group[index[first]]] = index[first]
+    return result
+
+
+def _padded_blocks(group, x, y, counts, chunk_trajectories):
+    """
+    Yields (trajectory indices, X, Y, lengths) blocks: trajectories of
+    similar length, with their sorted points in padded 2-D arrays of at most
+    MAX_BLOCK_CELLS cells (or one trajectory), and then every trajectory
+    longer than LONG_TRACK_POINTS on its own, with 1-D X and Y and no lengths.
+    """
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    by_length = np.argsort(counts, kind="stable")
+    n_short = np.searchsorted(counts[by_length], LONG_TRACK_POINTS, side="right")
+
+    begin = 0
+    while begin < n_short:
+        candidates = by_length[begin : min(begin + chunk_trajectories, n_short)]
+        # the block is as wide as its last (longest) trajectory
+        cells = np.arange(1, len(candidates) + 1) * np.maximum(counts[candidates], 1)
+        n_rows = max(int(np.count_nonzero(cells <= MAX_BLOCK_CELLS)), 1)
+        traj_index = candidates[:n_rows]
+        begin += n_rows
+
+        lengths = counts[traj_index]
+        width = max(int(lengths.max()), 1)
+
+        columns = np.arange(width)
+        valid = columns[None, :] < lengths[:, None]
+        source = np.where(valid, starts[traj_index][:, None] + columns[None, :], 0)
+
+        X = np.where(valid, x[source], 0.0)
+        Y = np.where(valid, y[source], 0.0)
+        yield traj_index, X, Y, lengths
+
+    for traj in by_length[n_short:]:
+        track = slice(starts[traj], starts[traj] + counts[traj])
+        yield np.array([traj]), x[track], y[track], None
+
+
+def _block_areas(block):
+    X, Y, lengths = block
+    if lengths is None:
+        return np.array([_quickhull_area(X, Y)])
+    lower = _chain_edge_sum(X, Y, lengths, reverse=False)
+    upper = _chain_edge_sum(X, Y, lengths, reverse=True)
+    # the lower chain runs left to right and the upper chain back, so
+    # together they trace the hull once; collinear hulls cancel to 0
+    return 0.5 * np.abs(lower + upper)
+
+
+def _chain_edge_sum(X, Y, lengths, reverse):
+    """
+    Runs the monotone chain over every row of X/Y in lockstep and returns,
+    per row, the shoelace sum over the edges of the resulting chain.
+    """
+    n_rows, width = X.shape
+    rows = np.arange(n_rows)
+    hull_x = np.zeros((n_rows, width))
+    hull_y = np.zeros((n_rows, width))
+    size = np.zeros(n_rows, dtype=np.int64)
+
+    for step in range(width):
+        active = step < lengths
+        column = np.where(active, lengths - 1 - step if reverse else step, 0)
+        px, py = X[rows, column], Y[rows, column]
+
+        # pop hull points that do not make a counter-clockwise turn with p,
+        # re-checking only the rows that just popped
+        popping = rows[active]
+        while len(popping) > 0:
+            popping = popping[size[popping] >= 2]
+            last, prev = size[popping] - 1, size[popping] - 2
+            turn = _cross(
+                hull_x[popping, prev],
+                hull_y[popping, prev],
+                hull_x[popping, last],
+                hull_y[popping, last],
+                px[popping],
+                py[popping],
+            )
+            popping = popping[turn <= 0]
+            size[popping] -= 1
+
+        hull_x[rows[active], size[active]] = px[active]
+        hull_y[rows[active], size[active]] = py[active]
+        size += active
+
+    edges = np.arange(width - 1)[None, :] < (size - 1)[:, None]
+    terms = hull_x[:, :-1] * hull_y[:, 1:] - hull_x[:, 1:] * hull_y[:, :-1]
+    return np.where(edges, terms, 0.0).sum(axis=1)
+
+
+def _quickhull_area(x, y):
+    """
+    Convex hull area of one trajectory's points, sorted by x then y and
+    without duplicates. Quickhull splits the hull into the triangles it
+    finds between a hull edge and the farthest point outside it, and the
+    area is their sum.
+    """
+    if len(x) < 3:
+        return 0.0
+
+    area = 0.0
+    inner = np.arange(1, len(x) - 1)
+    # the leftmost and rightmost points split the hull into two chains
+    pending = [(0, len(x) - 1, inner), (len(x) - 1, 0, inner)]
+    while pending:
+        a, b, candidates = pending.pop()
+        turn = _cross(x[a], y[a], x[b], y[b], x[candidates], y[candidates])
+        outside = turn > 0
+        if not outside.any():
+            continue
+        candidates, turn = candidates[outside], turn[outside]
+        farthest = np.argmax(turn)
+        area += 0.5 * turn[farthest]
+        c = candidates[farthest]
+        pending.append((a, c, candidates))
+        pending.append((c, b, candidates))
+    return area
+
+
+def _cross(ox, oy, ax, ay, bx, by):
+    return (ax - ox) * (by - oy) - (ay - oy) * (bx - ox)
@@ -0,0 +1,134 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Derives the distances_km and comput_speed_knots columns of the Hawaii GT
+schema from positions and times, for AIS data that does not have them.
+
+As in the Hawaii GT files, the distance of a report is the great-circle
+distance (km) from the vessel's previous report, and its computed speed is
+that distance over the time between the two, in knots. A vessel's first
+report has neither, and reports at the same time as the previous one have
+no speed.
+"""
+
+import numpy as np
+
+from common.ais_schema import columns_for
+from common.geodesy import KM_PER_NAUTICAL_MILE, haversine_km
+from common.timestamps import epoch_ns
+
+DERIVED_COLUMNS = ["distances_km", "comput_speed_knots"]
+NS_PER_HOUR = 3600 * 10**9
+# epoch_ns of NaT
+NAT_NS = np.iinfo(np.int64).min
+
+
+def missing_derived_columns(columns, anomaly_type=None):
+    """The derived columns a run of anomaly_type needs that columns lacks."""
+    needed = columns_for(anomaly_type) or DERIVED_COLUMNS
+    return [col for col in DERIVED_COLUMNS if col in needed and col not in columns]
+
+
+class SpeedDeriver:
+    """
+    Derives the columns chunk by chunk, in the order the chunks are read,
+    keeping the last report of every vessel seen so far so the first report
+    of a vessel in a chunk is measured from its report in an earlier chunk.
+    Only the reports within a chunk need to be in time order; a report
+    older than the last one of its vessel in an earlier chunk is counted in
+    late and gets no distance or speed.
+    """
+
+    def __init__(self):
+        self.mmsi = np.empty(0, dtype=np.int64)
+        self.time_ns = np.empty(0, dtype=np.int64)
+        self.lat = np.empty(0)
+        self.lon = np.empty(0)
+        self.late = 0
+
+    def derive(self, chunk, columns=DERIVED_COLUMNS):
+        """Adds columns (of DERIVED_COLUMNS) to chunk in place and returns it."""
+        n = len(chunk)
+        mmsi = chunk["MMSI"].to_numpy().astype(np.int64)
+        times = epoch_ns(chunk["datetime_utc"])
+        lat = chunk["lat"].to_numpy(dtype=np.float64)
+        lon = chunk["lon"].to_numpy(dtype=np.float64)
+
+        # reports without a time or position are left out
+        rows = np.flatnonzero((times != NAT_NS) & np.isfinite(lat) & np.isfinite(lon))
+        order = rows[np.lexsort((times[rows], mmsi[rows]))]
+        mmsi, times, lat, lon = mmsi[order], times[order], lat[order], lon[order]
+
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = mmsi[1:] != mmsi[:-1]
+        prev_time, prev_lat, prev_lon = times.copy(), lat.copy(), lon.copy()
+        prev_time[1:], prev_lat[1:], prev_lon[1:] = times[:-1], lat[:-1], lon[:-1]
+        has_prev = ~first
+
+        # the first report of a vessel continues from its last in earlier chunks
+        starts = np.flatnonzero(first)
+        carried = np.searchsorted(self.mmsi, mmsi[starts])
+        carried = np.minimum(carried, max(len(self.mmsi) - 1, 0))
+        found = np.zeros(len(starts), dtype=bool)
+        if len(self.mmsi):
+            found = self.mmsi[carried] == mmsi[starts]
+        starts, carried = starts[found], carried[found]
+        prev_time[starts] = self.time_ns[carried]
+        prev_lat[starts] = self.lat[carried]
+        prev_lon[starts] = self.lon[carried]
+        has_prev[starts] = True
+
+        hours = (times - prev_time) / NS_PER_HOUR
+        late = has_prev & (hours < 0)
+        self.late += int(late.sum())
+        has_prev &= ~late
+
+        distances = np.full(len(order), np.nan)
+        distances[has_prev] = haversine_km(
+            prev_lon[has_prev], prev_lat[has_prev], lon[has_prev], lat[has_prev]
+        )
+        speeds = np.full(len(order), np.nan)
+        moved = has_prev & (hours > 0)
+        speeds[moved] = distances[moved] / hours[moved] / KM_PER_NAUTICAL_MILE
+
+        self._carry(mmsi, times, lat, lon)
+
+        for col, values in [
+            ("distances_km", distances),
+            ("comput_speed_knots", speeds),
+        ]:
+            if col in columns:
+                unsorted = np.full(n, np.nan, dtype=np.float32)
+                unsorted[order] = values
+                chunk[col] = unsorted
+
+        return chunk
+
+    def _carry(self, mmsi, times, lat, lon):
+        """Keeps the latest report of each vessel, from the state or the sorted chunk."""
+        last = np.ones(len(mmsi), dtype=bool)
+        last[:-1] = mmsi[:-1] != mmsi[1:]
+
+        all_mmsi = np.concatenate([self.mmsi, mmsi[last]])
+        all_times = np.concatenate([self.time_ns, times[last]])
+        order = np.lexsort((all_times, all_mmsi))
+        keep = np.ones(len(order), dtype=bool)
+        keep[:-1] = all_mmsi[order][:-1] != all_mmsi[order][1:]
+        order = order[keep]
+
+        self.mmsi = all_mmsi[order]
+        self.time_ns = all_times[order]
+        self.lat = np.concatenate([self.lat, lat[last]])[order]
+        self.lon = np.concatenate([self.lon, lon[last]])[order]
+
+
+def derive_speeds(ais_data, columns=DERIVED_COLUMNS):
+    """Adds columns (of DERIVED_COLUMNS) to a whole data set in place and returns it."""
+    return SpeedDeriver().derive(ais_data, columns)
@@ -7,54 +7,180 @@
 #  This software is distributed under the 3-clause BSD License.
 #  ___________________________________________________________________________
 
+import numpy as np
+from datetime import datetime
+
+from common.ais_schema import normalize_vessel_class
+from common.instrumentation import stage
+from common.spatial_index import load_region, points_in_bbox, points_in_region
+from common.timestamps import epoch_ns
+
+US_PER_DAY = 86_400 * 1_000_000
+# Rows sampled to estimate how selective each predicate is
+SELECTIVITY_SAMPLE_ROWS = 10_000
+
 
 # Function to filter AIS data based on user selections
-def filter_ais_data(params, ais_data):
-    """Filters AIS data based on user selections."""
-    vessel_classes = params["vessel_class"]
-    length_range = params["length_range"]
-    timeframe = params["timeframe"]
+def filter_ais_data(params, ais_data, warn_if_empty=True, return_selectivity=False):
+    """
+    Filters AIS data based on user selections.
+
+    warn_if_empty: print a warning when every row is filtered out. Callers
+    filtering many small chunks of one file turn this off and warn once.
+    return_selectivity: also return the per-predicate row counts from
+    build_filter_mask, as (filtered_data, selectivity).
+    """
+    with stage("filter_ais_data", len(ais_data)) as timer:
+        # VESSEL CLASS labels are normalized once per category, not per row
+        ais_data["vessel_class"] = normalize_vessel_class(ais_data["vessel_class"])
+
+        keep_rows, selectivity = build_filter_mask(params, ais_data)
+
+        if not keep_rows.any():
+            if warn_if_empty:
+                print(
+                    "WARNING: Your selected parameters have resulted in all trajectories in this data file being filtered out."
+                )
+            filtered_data = None
+
+        else:
+            filtered_data = ais_data[keep_rows]
+        timer.rows_out = 0 if filtered_data is None else len(filtered_data)
+
+    if return_selectivity:
+        return filtered_data, selectivity
+    return filtered_data
+
+
+def build_filter_mask(params, ais_data):
+    """
+    Evaluates the vessel class, length, timeframe, hour and region
+    predicates as one boolean mask over ais_data without copying any rows.
+
+    Predicates run most selective first (estimated on a sample), and each one
+    is only evaluated on the rows every earlier predicate kept. Returns the
+    mask and a list of {"predicate", "rows_in", "rows_out"} in run order.
+    """
+    predicates = compile_predicates(params, ais_data)
+    n_rows = len(ais_data)
+
+    sample = np.arange(0, n_rows, max(1, n_rows // SELECTIVITY_SAMPLE_ROWS))
+    if len(sample) > 0:
+        predicates.sort(key=lambda predicate: predicate[1](sample).mean())
+
+    # a slice view stands in for "all rows" until the first predicate has run
+    rows = slice(None)
+    selectivity = []
+    for name, evaluate in predicates:
+        rows_in = n_rows if isinstance(rows, slice) else len(rows)
+        with stage(f"filter_ais_data.{name}", rows_in) as timer:
+            kept = evaluate(rows)
+            rows = np.flatnonzero(kept) if isinstance(rows, slice) else rows[kept]
+            timer.rows_out = len(rows)
+        selectivity.append(
+            {"predicate": name, "rows_in": rows_in, "rows_out": len(rows)}
+        )
+
+    keep_rows = np.zeros(n_rows, dtype=bool)
+    keep_rows[rows] = True
+
+    return keep_rows, selectivity
+
+
+def compile_predicates(params, ais_data):
+    """
+    Returns (name, evaluate) pairs for the filters set in params, where
+    evaluate(rows) gives the boolean result for the integer positions rows.
+    Every predicate works on NumPy views of the columns: categorical codes
+    for the vessel class and int64 epoch nanoseconds for the timestamps.
+    """
+    predicates = []
 
     # VESSEL CLASS
-    ais_data["vessel_class"] = ais_data["vessel_class"].str.lower().str.strip()
+    if params["vessel_class"] is not None:
+        vessel_class = ais_data["vessel_class"].cat
+        class_codes = vessel_class.codes.to_numpy()
+        wanted_codes = vessel_class.categories.get_indexer(params["vessel_class"])
+        wanted_codes = wanted_codes[wanted_codes >= 0]
 
-    ais_data = ais_data[
-        ais_data["vessel_class"].isin(vessel_classes)
-    ]  # only include trajectories with the labels from params
+        predicates.append(
+            ("vessel_class", lambda rows: np.isin(class_codes[rows], wanted_codes))
+        )
 
     # LENGTH RANGE
-    ais_data = ais_data[
-        (ais_data["length_m"] >= length_range[0])
-        & (ais_data["length_m"] <= length_range[1])
-    ]
-
-    # Check ranges based on UTC timestamps - need to check whether it's timezone aware timestamping or not
-    timeframe["start"] = ensure_utc(timeframe["start"])
-    timeframe["end"] = ensure_utc(timeframe["end"])
-
-    # TIMEFRAME
-    ais_data = ais_data[
-        (ais_data["datetime_utc"] >= timeframe["start"])
-        & (ais_data["datetime_utc"] <= timeframe["end"])
-    ]
-
-    ais_data["time"] = ais_data["datetime_utc"].dt.time
-
-    # HOUR CONSTRAINTS
-    params["hour_constraint"]["start"]
-
-    ais_data = ais_data[
-        (ais_data["time"] >= params["hour_constraint"]["start"].time())
-        & (ais_data["time"] <= params["hour_constraint"]["end"].time())
-    ]
-
-    if ais_data.empty:
-        print(
-            "WARNING: Your selected parameters have resulted in all trajectories in this data file being filtered out."
+    if params["length_range"] is not None:
+        length = ais_data["length_m"].to_numpy()
+        min_length, max_length = params["length_range"]
+
+        predicates.append(
+            (
+                "length_range",
+                lambda rows: (length[rows] >= min_length)
+                & (length[rows] <= max_length),
+            )
+        )
+
+    utc_ns = epoch_ns(ais_data["datetime_utc"])
+
+    # TIMEFRAME, checked against UTC timestamps
+    timeframe = params["timeframe"]
+    if timeframe["start"] is not None and timeframe["end"] is not None:
+        start_ns = ensure_utc(timeframe["start"]).value
+        end_ns = ensure_utc(timeframe["end"]).value
+
+        predicates.append(
+            (
+                "timeframe",
+                lambda rows: (utc_ns[rows] >= start_ns) & (utc_ns[rows] <= end_ns),
+            )
         )
 
-    else:
-        return ais_data
+    # HOUR CONSTRAINTS, on the UTC time of day in microseconds
+    hour_constraint = params["hour_constraint"]
+    if hour_constraint["start"] is not None and hour_constraint["end"] is not None:
+        start_us = time_of_day_us(hour_constraint["start"])
+        end_us = time_of_day_us(hour_constraint["end"])
+
+        def in_hours(rows):
+            time_us = (utc_ns[rows] // 1_000) % US_PER_DAY
+            if start_us <= end_us:
+                return (time_us >= start_us) & (time_us <= end_us)
+            # the window wraps past midnight, e.g. 22:00-04:00
+            return (time_us >= start_us) | (time_us <= end_us)
+
+        predicates.append(("hour_constraint", in_hours))
+
+    # REGION, a lon/lat bounding box and/or the polygons of a region file
+    if params["bbox"] is not None or params["region_file"] is not None:
+        lon = ais_data["lon"].to_numpy()
+        lat = ais_data["lat"].to_numpy()
+        bbox = params["bbox"]
+        region = None
+        if params["region_file"] is not None:
+            region = load_region(params["region_file"])
+
+        def in_region(rows):
+            lon_rows, lat_rows = lon[rows], lat[rows]
+            kept = np.ones(len(lon_rows), dtype=bool)
+            if bbox is not None:
+                kept = points_in_bbox(lon_rows, lat_rows, bbox)
+            # only the points inside the box are tested against the polygons
+            if region is not None:
+                kept[kept] = points_in_region(lon_rows[kept], lat_rows[kept], region)
+            return kept
+
+        predicates.append(("region", in_region))
+
+    return predicates
+
+
+def time_of_day_us(value):
+    """Microseconds since midnight of a datetime.time or datetime."""
+    if isinstance(value, datetime):
+        value = value.time()
+    return (
+        (value.hour * 60 + value.minute) * 60 + value.second
+    ) * 1_000_000 + value.microsecond
 
 
 def ensure_utc(dt):
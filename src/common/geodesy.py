@@ -0,0 +1,33 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_NAUTICAL_MILE = 1.852
+
+
+def haversine_km(lon1, lat1, lon2, lat2):
+    """Element-wise great-circle distance (km) between lon/lat arrays in degrees."""
+    lon1, lat1, lon2, lat2 = map(np.radians, (lon1, lat1, lon2, lat2))
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def project_to_km(lon, lat, ref_lat):
+    """
+    Equirectangular projection of lon/lat (degrees) to km, scaled at
+    ref_lat. Accurate to well under 1% over the extent of a trajectory.
+    """
+    x = EARTH_RADIUS_KM * np.radians(lon) * np.cos(np.radians(ref_lat))
+    y = EARTH_RADIUS_KM * np.radians(lat)
+    return x, y
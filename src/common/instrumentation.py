@@ -0,0 +1,229 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import io
+import json
+import platform
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_KINDS = ["cpu", "memory"]
+# Lines of the profile printed at the end of a --profile run
+PROFILE_TOP_LINES = 20
+# Verbosity at which the DEBUG dumps of the detection rules are printed (-vv);
+# -v only turns on the INFO log messages
+DEBUG_VERBOSITY = 2
+
+
+def peak_rss_mb():
+    """The high-water mark of this process's resident memory, or None where unknown."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024
+
+
+class StageTimer:
+    """What the code inside a stage sets: the rows it produced."""
+
+    __slots__ = ("rows_out",)
+
+    def __init__(self):
+        self.rows_out = None
+
+
+class RunReport:
+    """
+    Wall time, CPU time, rows in/out and peak RSS of each pipeline stage.
+    A stage entered several times (once per month, chunk, ...) is summed
+    into one entry, with the number of calls; peak RSS is the process's
+    high-water mark when the stage last finished.
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.started_wall = time.perf_counter()
+        self.started_cpu = time.process_time()
+        self.extra = {}
+
+    def add(self, name, wall_s, cpu_s, rows_in=None, rows_out=None, rss_mb=None):
+        entry = self.stages.setdefault(
+            name,
+            {
+                "calls": 0,
+                "wall_s": 0.0,
+                "cpu_s": 0.0,
+                "rows_in": None,
+                "rows_out": None,
+                "peak_rss_mb": None,
+            },
+        )
+        entry["calls"] += 1
+        entry["wall_s"] += wall_s
+        entry["cpu_s"] += cpu_s
+        if rows_in is not None:
+            entry["rows_in"] = (entry["rows_in"] or 0) + int(rows_in)
+        if rows_out is not None:
+            entry["rows_out"] = (entry["rows_out"] or 0) + int(rows_out)
+        if rss_mb is not None:
+            entry["peak_rss_mb"] = max(entry["peak_rss_mb"] or 0, rss_mb)
+
+    def merge(self, stages):
+        """Adds the stages recorded by another process (e.g. a worker)."""
+        for name, entry in stages.items():
+            existing = self.stages.get(name)
+            if existing is None:
+                self.stages[name] = dict(entry)
+                continue
+            existing["calls"] += entry["calls"]
+            existing["wall_s"] += entry["wall_s"]
+            existing["cpu_s"] += entry["cpu_s"]
+            for key in ["rows_in", "rows_out"]:
+                if entry[key] is not None:
+                    existing[key] = (existing[key] or 0) + entry[key]
+            if entry["peak_rss_mb"] is not None:
+                existing["peak_rss_mb"] = max(
+                    existing["peak_rss_mb"] or 0, entry["peak_rss_mb"]
+                )
+
+    def to_dict(self, params=None):
+        return {
+            "started_at": self.started_at,
+            "wall_s": time.perf_counter() - self.started_wall,
+            "cpu_s": time.process_time() - self.started_cpu,
+            "peak_rss_mb": peak_rss_mb(),
+            "python": platform.python_version(),
+            "params": params,
+            **self.extra,
+            "stages": [{"stage": name, **entry} for name, entry in self.stages.items()],
+        }
+
+    def write(self, path, params=None):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(params), f, indent=1, default=str)
+        return path
+
+
+_report = RunReport()
+
+
+def run_report():
+    """The report the stages of the current run are recorded in."""
+    return _report
+
+
+def reset_run_report():
+    global _report
+    _report = RunReport()
+    return _report
+
+
+@contextmanager
+def stage(name, rows_in=None):
+    """
+    Records the block as one call of the stage name in the current run
+    report. Set rows_out on the yielded timer to record the rows produced.
+    """
+    timer = StageTimer()
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    try:
+        yield timer
+    finally:
+        _report.add(
+            name,
+            time.perf_counter() - wall,
+            time.process_time() - cpu,
+            rows_in,
+            timer.rows_out,
+            peak_rss_mb(),
+        )
+
+
+def timed_chunks(chunks, name):
+    """Yields from chunks, recording the production of each one as a call of stage name."""
+    chunks = iter(chunks)
+    while True:
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        chunk = next(chunks, None)
+        if chunk is None:
+            return
+        _report.add(
+            name,
+            time.perf_counter() - wall,
+            time.process_time() - cpu,
+            rows_out=len(chunk),
+            rss_mb=peak_rss_mb(),
+        )
+        yield chunk
+
+
+def start_profiler(kind):
+    """Starts a cProfile ("cpu") or tracemalloc ("memory") profile; None for no profile."""
+    # the profilers are only imported by the runs that use them
+    if kind == "cpu":
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    if kind == "memory":
+        import tracemalloc
+
+        tracemalloc.start()
+    return None
+
+
+def stop_profiler(kind, profiler, path_base):
+    """
+    Stops the profile of start_profiler, saves it next to the output
+    (<path_base>.prof for pstats / snakeviz, <path_base>_tracemalloc.txt)
+    and prints its top lines. Returns the path saved to.
+    """
+    if kind == "cpu":
+        import pstats
+
+        profiler.disable()
+        path = path_base + ".prof"
+        profiler.dump_stats(path)
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(
+            PROFILE_TOP_LINES
+        )
+        print(text.getvalue())
+        return path
+
+    if kind == "memory":
+        import tracemalloc
+
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        lines = [f"Peak traced memory: {peak / 1024**2:.1f} MB", ""]
+        for stat in snapshot.statistics("lineno"):
+            lines.append(str(stat))
+        path = path_base + "_tracemalloc.txt"
+        with open(path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        print("\n".join(lines[: PROFILE_TOP_LINES + 2]) + "\n")
+        _report.extra["traced_peak_mb"] = peak / 1024**2
+        return path
+
+    return None
@@ -0,0 +1,265 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import json
+import os
+import numpy as np
+import pandas as pd
+
+from common.ais_schema import BASE_COLUMNS, apply_ais_schema, read_ais_csv
+from common.filter_trajectories import ensure_utc
+from common.spatial_index import region_bounds
+from common.timestamps import parse_timestamps
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_VERSION = 1
+# Rows summarized by each zone map within a file; matching zones are read by
+# seeking straight to their first byte
+ZONE_ROWS = 100_000
+# Bytes scanned at a time when locating the first byte of each zone
+SCAN_BLOCK_BYTES = 64 * 1024**2
+
+
+def manifest_path(data_dir):
+    return os.path.join(data_dir, MANIFEST_FILE)
+
+
+def load_manifest(data_dir):
+    """The data directory's manifest ({file name: entry}), empty if there is none."""
+    try:
+        with open(manifest_path(data_dir)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest["files"]
+
+
+def save_manifest(data_dir, files):
+    path = manifest_path(data_dir)
+    with open(path + ".tmp", "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def manifest_entry(data_dir, file_name, build=False):
+    """
+    The manifest entry of data_dir/file_name, or None when there is no
+    entry matching the file's current mtime and size. With build set, a
+    missing or stale entry is (re)built and saved first.
+    """
+    file_path = os.path.join(data_dir, file_name)
+    if not os.path.exists(file_path):
+        return None
+
+    files = load_manifest(data_dir)
+    entry = files.get(file_name)
+    if entry is not None and entry["source"] == _file_signature(file_path):
+        return entry
+    if not build:
+        return None
+
+    print(f"INFO: Adding {file_name} to the data manifest...")
+    entry = build_manifest_entry(file_path)
+    # reload in case another file was added meanwhile
+    files = load_manifest(data_dir)
+    files[file_name] = entry
+    save_manifest(data_dir, files)
+    return entry
+
+
+def build_manifest_entry(file_path, zone_rows=ZONE_ROWS):
+    """
+    Zone maps of an AIS CSV: for the whole file and for every block of
+    zone_rows rows, the min/max datetime_utc, length_m, lat and lon, the
+    set of vessel classes and the row count, plus the file's MMSI count and
+    the byte offset of each block.
+    """
+    offsets = _zone_offsets(file_path, zone_rows)
+
+    zones = []
+    mmsis = []
+    chunks = pd.read_csv(
+        file_path,
+        usecols=lambda col: col in BASE_COLUMNS,
+        dtype={"vessel_class": "category"},
+        chunksize=zone_rows,
+    )
+    for offset, chunk in zip(offsets, chunks):
+        parse_timestamps(chunk)
+        apply_ais_schema(chunk)
+        mmsis.append(chunk["MMSI"].unique())
+        zones.append({"offset": int(offset), **_zone_map(chunk)})
+
+    entry = {
+        "source": _file_signature(file_path),
+        "rows": sum(zone["rows"] for zone in zones),
+        "mmsi_count": int(len(np.unique(np.concatenate(mmsis)))) if mmsis else 0,
+        **_combine_zone_maps(zones),
+        "zones": zones,
+    }
+    return entry
+
+
+def zone_can_match(zone, params):
+    """
+    False when no row summarized by zone (a file entry or one of its zones)
+    can pass the vessel class, length, timeframe or region filters.
+    """
+    if zone["rows"] == 0:
+        return False
+
+    if params["vessel_class"] is not None and not set(zone["vessel_classes"]) & set(
+        params["vessel_class"]
+    ):
+        return False
+
+    if params["length_range"] is not None:
+        min_length, max_length = params["length_range"]
+        if zone["length_m"] is None or not _overlaps(
+            zone["length_m"], (min_length, max_length)
+        ):
+            return False
+
+    start, end = params["timeframe"]["start"], params["timeframe"]["end"]
+    if start is not None and end is not None:
+        if zone["datetime_utc"] is None:
+            return False
+        zone_times = [pd.Timestamp(time) for time in zone["datetime_utc"]]
+        if not _overlaps(zone_times, (ensure_utc(start), ensure_utc(end))):
+            return False
+
+    bounds = region_bounds(params)
+    if bounds is not None:
+        if zone["lon"] is None or zone["lat"] is None:
+            return False
+        if not _overlaps(zone["lon"], (bounds[0], bounds[2])):
+            return False
+        if not _overlaps(zone["lat"], (bounds[1], bounds[3])):
+            return False
+
+    return True
+
+
+def matching_zone_runs(entry, params):
+    """
+    (byte offset, rows) of every run of consecutive zones of entry that can
+    match params, so each run is read with one seek.
+    """
+    runs = []
+    end_of_last_run = None
+    for index, zone in enumerate(entry["zones"]):
+        if not zone_can_match(zone, params):
+            continue
+        if end_of_last_run == index:
+            runs[-1] = (runs[-1][0], runs[-1][1] + zone["rows"])
+        else:
+            runs.append((zone["offset"], zone["rows"]))
+        end_of_last_run = index + 1
+    return runs
+
+
+def read_zone_runs(file_path, runs, anomaly_type=None, chunksize=None):
+    """
+    Yields the raw rows of each (byte offset, rows) run, read with
+    read_ais_csv after seeking to the run's first byte; runs longer than
+    chunksize are yielded in chunks. apply_ais_schema still has to be
+    applied to what is yielded.
+    """
+    names = list(pd.read_csv(file_path, nrows=0).columns)
+    with open(file_path, "rb") as f:
+        for offset, rows in runs:
+            f.seek(offset)
+            reader = read_ais_csv(
+                f,
+                anomaly_type,
+                header=None,
+                names=names,
+                nrows=rows,
+                chunksize=chunksize or rows,
+            )
+            with reader:
+                yield from reader
+
+
+def _file_signature(file_path):
+    stat = os.stat(file_path)
+    return {"mtime": stat.st_mtime, "size": stat.st_size}
+
+
+def _zone_offsets(file_path, zone_rows):
+    """Byte offset of data rows 0, zone_rows, 2 * zone_rows, ... of a CSV."""
+    offsets = []
+    with open(file_path, "rb") as f:
+        block_start = len(f.readline())
+        offsets.append(block_start)
+        # data row r starts right after the r-th newline following the header
+        newlines_seen = 0
+        while True:
+            block = f.read(SCAN_BLOCK_BYTES)
+            if not block:
+                break
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == 10)
+            first_zone = newlines_seen // zone_rows + 1
+            last_zone = (newlines_seen + len(newlines)) // zone_rows
+            for zone in range(first_zone, last_zone + 1):
+                offsets.append(
+                    block_start + newlines[zone * zone_rows - newlines_seen - 1] + 1
+                )
+            newlines_seen += len(newlines)
+            block_start += len(block)
+    return offsets
+
+
+def _zone_map(chunk):
+    def value_range(values):
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return None
+        return [float(values.min()), float(values.max())]
+
+    times = chunk["datetime_utc"].dropna()
+    return {
+        "rows": len(chunk),
+        "datetime_utc": (
+            [times.min().isoformat(), times.max().isoformat()] if len(times) else None
+        ),
+        "length_m": value_range(chunk["length_m"].to_numpy(dtype=np.float64)),
+        "lat": value_range(chunk["lat"].to_numpy(dtype=np.float64)),
+        "lon": value_range(chunk["lon"].to_numpy(dtype=np.float64)),
+        "vessel_classes": sorted(
+            chunk["vessel_class"].dropna().astype(str).unique().tolist()
+        ),
+    }
+
+
+def _combine_zone_maps(zones):
+    def combined_range(key, parse=lambda value: value):
+        ranges = [zone[key] for zone in zones if zone[key] is not None]
+        if not ranges:
+            return None
+        return [
+            min(ranges, key=lambda r: parse(r[0]))[0],
+            max(ranges, key=lambda r: parse(r[1]))[1],
+        ]
+
+    return {
+        "datetime_utc": combined_range("datetime_utc", pd.Timestamp),
+        "length_m": combined_range("length_m"),
+        "lat": combined_range("lat"),
+        "lon": combined_range("lon"),
+        "vessel_classes": sorted(
+            set().union(*(zone["vessel_classes"] for zone in zones))
+        ),
+    }
+
+
+def _overlaps(value_range, wanted_range):
+    return value_range[0] <= wanted_range[1] and value_range[1] >= wanted_range[0]
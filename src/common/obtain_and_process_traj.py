@@ -10,49 +10,51 @@
 import logging
 import numpy as np
 import pandas as pd
-from datetime import datetime
 
-from tracktable.domain.terrestrial import Trajectory, TrajectoryPoint
+from common.convex_hull import chull_area_km2, chull_areas_km2
+from common.geodesy import KM_PER_NAUTICAL_MILE, haversine_km
+from common.timestamps import ensure_hst, epoch_ns
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    filename="output.log",
-    filemode="a",
-)
-
-timestamp = datetime.now().strftime("%d-%m-%Y")
+# Configured by the entry point (see main.configure_logging), not on import
+logger = logging.getLogger(__name__)
 
 
 def obtain_trajectory(
     data_dict, mmsi_val, date1, date2, primary_dt="datetime_hst", inc_date=None
 ):
     """
-    Obtains the AIS points associated with the vessel given in mmsi_val between
-    date1 and date2.
+    Obtains the AIS points associated with the vessel(s) given in mmsi_val
+    (one MMSI or a list) between date1 and date2.
 
+    data_dict maps (year, month) to that month's points, indexed by MMSI.
+    For repeated lookups, common.vessel_index.get_vessel_points reads many
+    vessels' points straight from the on-disk vessel index instead.
     """
     try:
-        vessel_df_list = []
-        dr = pd.date_range(date1, date2, freq="D")
-        df_key_list = list(set(zip(dr.year, dr.month)))
+        mmsis = np.atleast_1d(mmsi_val)
+        # the months are those of the dates as given, in their own time zone
+        months = pd.period_range(
+            pd.Timestamp(date1).tz_localize(None),
+            pd.Timestamp(date2).tz_localize(None),
+            freq="M",
+        )
 
-        for year, month in df_key_list:
-            try:
-                for mmsi in mmsi_val:
-                    vessel_df_list.append(data_dict[year, month].loc[mmsi])
-            except KeyError:
-                vessel_df_list.append(data_dict[year, month].loc[mmsi_val])
+        vessel_df_list = []
+        for month in months:
+            month_df = data_dict[month.year, month.month]
+            vessel_df_list.append(month_df[month_df.index.isin(mmsis)])
 
         vessel_df = pd.concat(vessel_df_list)
+        if primary_dt == "datetime_hst":
+            ensure_hst(vessel_df)
 
         points_df = vessel_df[
             (vessel_df[primary_dt] >= date1) & (vessel_df[primary_dt] <= date2)
-        ].sort_values(by=primary_dt)
+        ].sort_values(by=primary_dt, kind="stable")
 
         return points_df
     except Exception as e:
-        logging.error("Error occurred while trying to obtain trajectory: %s", e)
+        logger.error("Error occurred while trying to obtain trajectory: %s", e)
         raise
 
 
@@ -62,54 +64,116 @@ def extract_traj_from_df(
     sep_time=np.timedelta64(30, "m"),
     min_points=5,
     min_chull_area=0.2,
+    workers=1,
 ):
     """
     Extracts trajectories from the AIS points DataFrame.
 
+    Returns the PdTrajectory objects of the trajectories kept by
+    segment_trajectories, sorted by end time, and their end times.
     """
-    mmsi_list = AIS_points_df.index.unique()
+    points, summary = segment_trajectories(
+        AIS_points_df, time_col, sep_time, min_points, min_chull_area, workers
+    )
+    summary = summary.sort_values("end_time", kind="stable")
+
+    points_by_traj = points.set_index("MMSI").groupby("traj_id", sort=False)
     trajectory_list = []
-    for mmsi in mmsi_list:
-        vessel_points = AIS_points_df.loc[mmsi]
-        traj_points = (
-            [0]
-            + list(
-                np.where(
-                    (
-                        vessel_points[time_col].iloc[1:]
-                        - vessel_points[time_col].iloc[:-1]
-                    )
-                    > sep_time
-                )[0]
-                + 1
-            )
-            + [vessel_points.shape[0]]
-        )
-        for i in range(len(traj_points) - 1):
-            traj_df = vessel_points.iloc[
-                traj_points[i] : traj_points[i + 1]
-            ].drop_duplicates()
-
-            if traj_df.shape[0] >= min_points:
-                traj_obj = PdTrajectory(traj_df, primary_dt=time_col)
-                traj_obj.get_chull_area()
-
-                if traj_obj.chull_area > min_chull_area:
-                    trajectory_list.append(traj_obj)
-
-    final_times = [t.traj_df[time_col].iloc[-1] for t in trajectory_list]
-    end_times_sortarg = list(np.argsort(final_times))
-    return (
-        list(np.array(trajectory_list, dtype=object)[end_times_sortarg]),
-        np.array(final_times)[end_times_sortarg],
+    for traj_id, chull_area in zip(summary["traj_id"], summary["chull_area"]):
+        traj_df = points_by_traj.get_group(traj_id).drop(columns="traj_id")
+        traj_obj = PdTrajectory(traj_df, primary_dt=time_col)
+        traj_obj.chull_area = chull_area
+        trajectory_list.append(traj_obj)
+
+    return trajectory_list, summary["end_time"].to_numpy()
+
+
+def segment_trajectories(
+    AIS_points_df,
+    time_col="datetime_hst",
+    sep_time=np.timedelta64(30, "m"),
+    min_points=5,
+    min_chull_area=0.2,
+    workers=1,
+):
+    """
+    Splits the AIS points (indexed by MMSI) into trajectories in a single
+    pass: the points are sorted once by (MMSI, time_col) and a new
+    trajectory starts at every new vessel or gap longer than sep_time.
+    Duplicate points are dropped within each trajectory, then trajectories
+    with fewer than min_points points or a convex hull area (km²) of at most
+    min_chull_area are discarded. The hull areas of all trajectories are
+    computed in one batch, spread over workers processes.
+
+    Returns the kept points as one flat DataFrame with MMSI and traj_id
+    columns, and a summary with one row per kept trajectory (traj_id, MMSI,
+    start_time, end_time, n_points, chull_area).
+    """
+    points = AIS_points_df.rename_axis("MMSI").reset_index()
+    if time_col == "datetime_hst":
+        # on the reset copy, so the caller's frame is left as it was
+        ensure_hst(points)
+    points = points.sort_values(["MMSI", time_col], kind="stable", ignore_index=True)
+
+    mmsi = points["MMSI"].to_numpy()
+    times_ns = epoch_ns(points[time_col])
+    starts_traj = np.ones(len(points), dtype=bool)
+    starts_traj[1:] = (mmsi[1:] != mmsi[:-1]) | (
+        np.diff(times_ns) > pd.Timedelta(sep_time).value
     )
+    points["traj_id"] = np.cumsum(starts_traj) - 1
+
+    # traj_id is one of the columns, so duplicates are only dropped within a trajectory
+    points = points[~points.duplicated()]
+
+    n_points = points.groupby("traj_id", sort=True).size()
+    points = points[points["traj_id"].isin(n_points.index[n_points >= min_points])]
+
+    chull_area = chull_areas_km2(points, workers=workers)
+    points = points[
+        points["traj_id"].isin(chull_area.index[chull_area > min_chull_area])
+    ]
+
+    grouped = points.groupby("traj_id", sort=True)
+    summary = grouped.agg(
+        MMSI=("MMSI", "first"),
+        start_time=(time_col, "first"),
+        end_time=(time_col, "last"),
+        n_points=(time_col, "size"),
+    )
+    summary["chull_area"] = chull_area.reindex(summary.index)
+
+    return points.reset_index(drop=True), summary.reset_index()
 
 
 class PdTrajectory:
     """
     Class representing a trajectory of a vessel based on AIS data.
+
+    Positions and times are held as contiguous NumPy arrays taken from
+    traj_df, which is referenced rather than copied. Distances and speeds
+    are computed from those arrays, and the tracktable trajectory is only
+    built when traj_tt is first accessed.
     """
 
+    __slots__ = (
+        "traj_df",
+        "npoints",
+        "ncol",
+        "primary_dt",
+        "object_id",
+        "lon",
+        "lat",
+        "times_ns",
+        "chull_area",
+        "distances",
+        "current_lengths",
+        "speeds_knots",
+        "total_length",
+        "turn_angles",
+        "_traj_tt",
+    )
+
     def __init__(self, traj_df, primary_dt="datetime_hst"):
         """
         Initializes the trajectory object.
@@ -119,38 +183,72 @@ class PdTrajectory:
 
         """
 
-        self.traj_df = traj_df.copy()
+        self.traj_df = traj_df
         self.npoints, self.ncol = traj_df.shape
         self.primary_dt = primary_dt
-        self.get_tracktable_traj()
+        self.object_id = str(traj_df.index[0]) if self.npoints else ""
+        self.lon = traj_df["lon"].to_numpy(dtype=np.float64)
+        self.lat = traj_df["lat"].to_numpy(dtype=np.float64)
+        self.times_ns = epoch_ns(traj_df[primary_dt])
         self.chull_area = 0
         self.distances = False
+        self.current_lengths = None
+        self.speeds_knots = None
+        self.total_length = None
         self.turn_angles = False
+        self._traj_tt = None
+
+    @property
+    def traj_tt(self):
+        """The tracktable trajectory, built on first access."""
+        if self._traj_tt is None:
+            self.get_tracktable_traj()
+        return self._traj_tt
 
     def get_tracktable_traj(self):
         """Converts the trajectory DataFrame into a tracktable trajectory."""
-        self.traj_tt = Trajectory()
-        for i in range(self.npoints):
-            point = TrajectoryPoint(
-                self.traj_df.iloc[i]["lon"], self.traj_df.iloc[i]["lat"]
-            )
-            point.object_id = str(self.traj_df.index.unique()[0])
-            point.timestamp = self.traj_df.iloc[i][self.primary_dt]
-            self.traj_tt.append(point)
+        from tracktable.domain.terrestrial import Trajectory, TrajectoryPoint
+
+        timestamps = self.traj_df[self.primary_dt].dt.to_pydatetime()
+
+        self._traj_tt = Trajectory()
+        for lon, lat, timestamp in zip(self.lon, self.lat, timestamps):
+            point = TrajectoryPoint(lon, lat)
+            point.object_id = self.object_id
+            point.timestamp = timestamp
+            self._traj_tt.append(point)
+
+        return self._traj_tt
 
     def get_chull_area(self):
-        """Calculates the convex hull area of the trajectory."""
-        # Implementation of convex hull area calculation goes here
-        pass
+        """Calculates the convex hull area (km²) of the trajectory."""
+        self.chull_area = chull_area_km2(self.lon, self.lat)
+        return self.chull_area
 
     def get_distances(self):
-        """Calculates distances for the trajectory."""
-        self.traj_df["Current Lengths"] = np.array(
-            [self.traj_tt[i].current_length for i in range(self.npoints)]
+        """
+        Calculates the haversine distance (km) from each point to the next
+        one (distances, NaN for the first point), the cumulative length at
+        each point (current_lengths), the implied speed in knots between
+        points (speeds_knots, NaN where no time passes) and total_length.
+        If traj_df already has distances_km, total_length is their sum.
+        """
+        self.distances = np.full(self.npoints, np.nan)
+        self.distances[1:] = haversine_km(
+            self.lon[:-1], self.lat[:-1], self.lon[1:], self.lat[1:]
         )
+        self.current_lengths = np.nancumsum(self.distances)
+
+        hours = np.diff(self.times_ns) / 1e9 / 3600
+        self.speeds_knots = np.full(self.npoints, np.nan)
+        np.divide(
+            self.distances[1:] / KM_PER_NAUTICAL_MILE,
+            hours,
+            out=self.speeds_knots[1:],
+            where=hours != 0,
+        )
+
         if "distances_km" in self.traj_df.columns:
-            self.total_length = np.sum(self.traj_df["distances_km"])
+            self.total_length = np.nansum(self.traj_df["distances_km"])
         else:
-            self.traj_df["distances_km"] = np.array(
-                [np.nan] + list(self.traj_df["Current Lengths"].iloc[1:])
-            )
+            self.total_length = np.sum(self.distances[1:])
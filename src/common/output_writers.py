@@ -0,0 +1,261 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import bz2
+import gzip
+import lzma
+import os
+from urllib.parse import quote
+
+import numpy as np
+
+from common.instrumentation import stage
+from common.timestamps import ensure_hst, epoch_ns
+
+OUTPUT_FORMATS = ["csv", "parquet", "feather"]
+PARTITION_COLUMNS = ["month", "vessel_class"]
+# Compressions each format supports; the first is the default
+COMPRESSIONS = {
+    "csv": [None, "gzip", "bz2", "xz"],
+    "parquet": ["snappy", "zstd", "gzip", "lz4", "brotli", "none"],
+    "feather": ["lz4", "zstd", "none"],
+}
+CSV_OPENERS = {
+    "gzip": (gzip.open, ".gz"),
+    "bz2": (bz2.open, ".bz2"),
+    "xz": (lzma.open, ".xz"),
+}
+# Rows formatted and written at a time
+OUTPUT_BATCH_ROWS = 500_000
+# Columns kept by the flags only mode, besides the flag columns
+KEY_COLUMNS = ["MMSI", "datetime_utc", "lat", "lon", "vessel_class"]
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet and Feather output require pyarrow. Install it with "
+            "`pip install pyarrow` or use --output_format csv."
+        ) from e
+    return pyarrow
+
+
+class CsvWriter:
+    """Appends batches to one CSV file, writing the header with the first."""
+
+    extension = ".csv"
+
+    def __init__(self, path, compression=None):
+        if compression is None:
+            self.path = path
+            self.file = open(path, "w", newline="")
+        else:
+            opener, suffix = CSV_OPENERS[compression]
+            self.path = path + suffix
+            self.file = opener(self.path, "wt", newline="")
+        self.wrote_header = False
+
+    def write(self, batch):
+        batch.to_csv(self.file, header=not self.wrote_header, index=False)
+        self.wrote_header = True
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Writes each batch as a row group of one Parquet file, with the first batch's schema."""
+
+    extension = ".parquet"
+
+    def __init__(self, path, compression="snappy"):
+        self.pa = _import_pyarrow()
+        self.path = path
+        self.compression = compression
+        self.schema = None
+        self.writer = None
+
+    def write(self, batch):
+        if self.writer is None:
+            table = self.pa.Table.from_pandas(batch, preserve_index=False)
+            self.schema = table.schema
+            self.writer = self.pa.parquet.ParquetWriter(
+                self.path, self.schema, compression=self.compression
+            )
+        else:
+            table = self.pa.Table.from_pandas(
+                batch, schema=self.schema, preserve_index=False
+            )
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class FeatherWriter:
+    """
+    Writes batches as record batches of one Feather (Arrow IPC) file.
+    Categorical columns are written as strings, since one IPC file cannot
+    hold a different dictionary per batch.
+    """
+
+    extension = ".feather"
+
+    def __init__(self, path, compression="lz4"):
+        self.pa = _import_pyarrow()
+        self.path = path
+        self.compression = None if compression == "none" else compression
+        self.schema = None
+        self.writer = None
+
+    def write(self, batch):
+        categorical = batch.select_dtypes("category").columns
+        if len(categorical):
+            batch = batch.astype({col: str for col in categorical})
+
+        if self.writer is None:
+            table = self.pa.Table.from_pandas(batch, preserve_index=False)
+            self.schema = table.schema
+            options = self.pa.ipc.IpcWriteOptions(compression=self.compression)
+            self.writer = self.pa.ipc.new_file(self.path, self.schema, options=options)
+        else:
+            table = self.pa.Table.from_pandas(
+                batch, schema=self.schema, preserve_index=False
+            )
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+WRITERS = {"csv": CsvWriter, "parquet": ParquetWriter, "feather": FeatherWriter}
+
+
+class PartitionedWriter:
+    """
+    Splits each batch by month (of datetime_utc) or vessel class and
+    appends the parts to one file per partition, laid out like a Hive
+    partitioned dataset: <path>/<column>=<value>/part-0.<ext>. The vessel
+    class column is left out of Parquet and Feather files, whose readers
+    restore it from the directory names, but kept in CSV files.
+    """
+
+    def __init__(self, path, output_format, compression, partition_by):
+        self.path = path
+        self.output_format = output_format
+        self.compression = compression
+        self.partition_by = partition_by
+        self.writers = {}
+        os.makedirs(path, exist_ok=True)
+
+    def write(self, batch):
+        if self.partition_by == "month":
+            times = epoch_ns(batch["datetime_utc"]).view("datetime64[ns]")
+            keys = times.astype("datetime64[M]").astype(str)
+        else:
+            keys = batch[self.partition_by].astype(str).to_numpy()
+
+        drop_key = self.partition_by in batch.columns and self.output_format != "csv"
+        for key in np.unique(keys):
+            part = batch[keys == key]
+            if drop_key:
+                part = part.drop(columns=self.partition_by)
+            self._writer_for(key).write(part)
+
+    def _writer_for(self, key):
+        if key not in self.writers:
+            part_dir = os.path.join(
+                self.path, f"{self.partition_by}={quote(key, safe='')}"
+            )
+            os.makedirs(part_dir, exist_ok=True)
+            writer_class = WRITERS[self.output_format]
+            self.writers[key] = writer_class(
+                os.path.join(part_dir, "part-0" + writer_class.extension),
+                self.compression,
+            )
+        return self.writers[key]
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+def open_output_writer(path_base, params):
+    """
+    The writer for params["output_format"], params["output_compression"]
+    and params["output_partition"]. Its path is path_base plus the format's
+    extension, or path_base as a directory when partitioned.
+    """
+    output_format = params["output_format"]
+    compression = params["output_compression"]
+    if compression is None:
+        compression = COMPRESSIONS[output_format][0]
+
+    if params["output_partition"] is not None:
+        return PartitionedWriter(
+            path_base, output_format, compression, params["output_partition"]
+        )
+    writer_class = WRITERS[output_format]
+    return writer_class(path_base + writer_class.extension, compression)
+
+
+def write_output(data, path_base, params, flag_columns, index=False):
+    """
+    Writes data (a results frame) with the writer of open_output_writer,
+    OUTPUT_BATCH_ROWS rows at a time, so that only one batch is ever
+    formatted in memory. datetime_hst is derived per batch. In flags only
+    mode (params["flags_only"]) just the rows with one of flag_columns set
+    and the KEY_COLUMNS, flag columns and speed columns are written.
+
+    Returns the path written to.
+    """
+    with stage("write_output", len(data)) as timer:
+        writer = open_output_writer(path_base, params)
+        timer.rows_out = 0
+        try:
+            # an empty frame still writes its header or schema
+            for start in range(0, max(len(data), 1), OUTPUT_BATCH_ROWS):
+                batch = data.iloc[start : start + OUTPUT_BATCH_ROWS]
+                if index:
+                    batch = batch.reset_index()
+                if params["flags_only"]:
+                    batch = select_flagged(batch, flag_columns)
+                else:
+                    batch = ensure_hst(batch.copy())
+                writer.write(batch)
+                timer.rows_out += len(batch)
+        finally:
+            writer.close()
+
+    return writer.path
+
+
+def select_flagged(batch, flag_columns):
+    """The flagged rows of batch with only the key, speed and flag columns."""
+    # the MMSI is kept even where the full output leaves out the index
+    if "MMSI" not in batch.columns and batch.index.name == "MMSI":
+        batch = batch.reset_index()
+
+    flagged = np.zeros(len(batch), dtype=bool)
+    for col in flag_columns:
+        flagged |= batch[col].to_numpy(dtype=bool)
+
+    columns = [
+        col
+        for col in batch.columns
+        if col in KEY_COLUMNS
+        or col in flag_columns
+        or col in ("computed_speed_knots", "speed_over_ground_knots", "speed_threshold")
+    ]
+    return batch.loc[flagged, columns]
@@ -0,0 +1,168 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import math
+import numpy as np
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a relative-error guarantee (DDSketch,
+    Masson et al. 2019, https://arxiv.org/abs/1908.10693).
+
+    Values are counted in logarithmically sized buckets, so the sketch's
+    size depends on the range of the values and not on how many there are,
+    and two sketches merge exactly by adding their bucket counts. Sketches
+    built on separate months, chunks or worker processes can therefore be
+    combined without ever holding all of the values at once.
+
+    Error bound: for any q, quantile(q) differs from
+    np.percentile(values, 100 * q) (linear interpolation) by at most
+    relative_accuracy * |np.percentile(values, 100 * q)|. The bound is
+    relative to the value, so it is tightest exactly where the overspeed
+    threshold lives: the upper tail, whose ranks a rank-error sketch (KLL)
+    can only resolve to within a fixed fraction of all points.
+    """
+
+    # magnitudes below this are counted as zero
+    MIN_MAGNITUDE = 1e-9
+
+    def __init__(self, relative_accuracy=0.001):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1.")
+
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.zero_count = 0
+        # dense bucket counts for positive values and for the magnitudes of
+        # negative values; _offset is the bucket index of element 0
+        self._positive = np.zeros(0, dtype=np.int64)
+        self._positive_offset = 0
+        self._negative = np.zeros(0, dtype=np.int64)
+        self._negative_offset = 0
+
+    @classmethod
+    def from_values(cls, values, relative_accuracy=0.001):
+        sketch = cls(relative_accuracy)
+        sketch.add(values)
+        return sketch
+
+    @property
+    def count(self):
+        return int(self.zero_count + self._positive.sum() + self._negative.sum())
+
+    def add(self, values):
+        """Adds an array of values. NaN and infinite values are ignored."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[np.isfinite(values)]
+
+        near_zero = np.abs(values) < self.MIN_MAGNITUDE
+        self.zero_count += int(near_zero.sum())
+
+        positive = values[~near_zero & (values > 0)]
+        negative = -values[~near_zero & (values < 0)]
+
+        self._positive, self._positive_offset = self._add_to_store(
+            self._positive, self._positive_offset, self._bucket_index(positive)
+        )
+        self._negative, self._negative_offset = self._add_to_store(
+            self._negative, self._negative_offset, self._bucket_index(negative)
+        )
+        return self
+
+    def merge(self, other):
+        """Adds the counts of other (built with the same accuracy) to self."""
+        if other.gamma != self.gamma:
+            raise ValueError(
+                "Only sketches with the same relative_accuracy can be merged."
+            )
+
+        self.zero_count += other.zero_count
+        self._positive, self._positive_offset = self._merge_stores(
+            self._positive,
+            self._positive_offset,
+            other._positive,
+            other._positive_offset,
+        )
+        self._negative, self._negative_offset = self._merge_stores(
+            self._negative,
+            self._negative_offset,
+            other._negative,
+            other._negative_offset,
+        )
+        return self
+
+    def quantile(self, q):
+        """
+        Estimate of np.percentile(values, 100 * q), interpolating linearly
+        between the estimates of the two order statistics around rank
+        q * (count - 1) exactly as np.percentile does.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1.")
+        if self.count == 0:
+            raise ValueError("Cannot compute a quantile of an empty sketch.")
+
+        rank = q * (self.count - 1)
+        lower = math.floor(rank)
+        upper = min(lower + 1, self.count - 1)
+        fraction = rank - lower
+
+        lower_value = self._value_at_rank(lower)
+        upper_value = self._value_at_rank(upper)
+        return lower_value + fraction * (upper_value - lower_value)
+
+    def _value_at_rank(self, rank):
+        """Representative value of the bucket holding the rank-th smallest value."""
+        # negative magnitudes are stored in increasing order, so walk them backwards
+        negative_cumulative = np.cumsum(self._negative[::-1])
+        if negative_cumulative.size and rank < negative_cumulative[-1]:
+            position = int(np.searchsorted(negative_cumulative, rank, side="right"))
+            index = self._negative_offset + len(self._negative) - 1 - position
+            return -self._bucket_value(index)
+        rank -= int(negative_cumulative[-1]) if negative_cumulative.size else 0
+
+        if rank < self.zero_count:
+            return 0.0
+        rank -= self.zero_count
+
+        positive_cumulative = np.cumsum(self._positive)
+        position = int(np.searchsorted(positive_cumulative, rank, side="right"))
+        return self._bucket_value(self._positive_offset + position)
+
+    def _bucket_index(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+
+    def _bucket_value(self, index):
+        # every magnitude in (gamma^(i-1), gamma^i] is within relative_accuracy of this
+        return 2 * self.gamma**index / (self.gamma + 1)
+
+    @staticmethod
+    def _add_to_store(store, offset, indices):
+        if indices.size == 0:
+            return store, offset
+        low = int(indices.min())
+        counts = np.bincount(indices - low)
+        return QuantileSketch._merge_stores(store, offset, counts, low)
+
+    @staticmethod
+    def _merge_stores(store, offset, other, other_offset):
+        if other.size == 0:
+            return store, offset
+        if store.size == 0:
+            return other.astype(np.int64, copy=True), other_offset
+
+        low = min(offset, other_offset)
+        high = max(offset + len(store), other_offset + len(other))
+        merged = np.zeros(high - low, dtype=np.int64)
+        merged[offset - low : offset - low + len(store)] += store
+        merged[other_offset - low : other_offset - low + len(other)] += other
+        return merged, low
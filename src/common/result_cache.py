@@ -0,0 +1,109 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import hashlib
+import json
+import os
+import pickle
+import pandas as pd
+
+from common.filter_trajectories import ensure_utc, time_of_day_us
+
+# Bumped whenever the layout of cached frames changes, so old entries miss
+CACHE_FORMAT_VERSION = 1
+ENTRY_SUFFIX = ".pkl"
+DEFAULT_MAX_CACHE_MB = 512
+
+
+def filter_key(params, source_files):
+    """
+    Hash of everything the output of load_and_filter_data depends on: the
+    normalized filter params and the size and mtime of every source file.
+    Params that only affect later stages (percentile, threshold method,
+    grouping, ...) are left out, so runs that differ only in those share
+    an entry.
+    """
+    timeframe = params["timeframe"]
+    hours = params["hour_constraint"]
+    normalized = {
+        "version": CACHE_FORMAT_VERSION,
+        "anomaly_type": params["anomaly_type"],
+        "Hawaii_GT": params["Hawaii_GT"],
+        "AIS_file_name": None if params["Hawaii_GT"] else params["AIS_file_name"],
+        "vessel_class": sorted(set(params["vessel_class"] or [])) or None,
+        "length_range": params["length_range"],
+        "timeframe": [
+            None if value is None else ensure_utc(pd.Timestamp(value)).isoformat()
+            for value in (timeframe["start"], timeframe["end"])
+        ],
+        "hour_constraint": [
+            None if value is None else time_of_day_us(value)
+            for value in (hours["start"], hours["end"])
+        ],
+        "bbox": params["bbox"],
+        "region_file": params["region_file"],
+        "sources": [_file_fingerprint(path) for path in sorted(set(source_files))],
+    }
+    encoded = json.dumps(normalized, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def load_cached_result(cache_dir, key):
+    """The cached frame for key, or None. A hit marks the entry as recently used."""
+    path = _entry_path(cache_dir, key)
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+    os.utime(path)
+    return data
+
+
+def store_result(cache_dir, key, data, max_cache_mb=DEFAULT_MAX_CACHE_MB):
+    """
+    Stores data under key, then evicts the least recently used entries
+    until the cache fits in max_cache_mb.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    path = _entry_path(cache_dir, key)
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + ".tmp", path)
+
+    evict_lru(cache_dir, max_cache_mb)
+
+
+def evict_lru(cache_dir, max_cache_mb):
+    """Deletes entries, least recently used first, until the total fits the cap."""
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(ENTRY_SUFFIX):
+            stat = os.stat(os.path.join(cache_dir, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+    total_bytes = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total_bytes <= max_cache_mb * 1024**2:
+            break
+        os.remove(os.path.join(cache_dir, name))
+        total_bytes -= size
+
+
+def _entry_path(cache_dir, key):
+    return os.path.join(cache_dir, key + ENTRY_SUFFIX)
+
+
+def _file_fingerprint(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [os.path.basename(path), None, None]
+    return [os.path.basename(path), stat.st_size, stat.st_mtime_ns]
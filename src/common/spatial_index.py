@@ -0,0 +1,95 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import functools
+import numpy as np
+
+# Cells of the fixed lon/lat grid the columnar cache is partitioned by, so
+# region queries skip the files of every cell outside the region's bounding box
+PARTITION_CELL_DEG = 1.0
+
+
+def grid_cells(lon, lat, cell_deg=PARTITION_CELL_DEG):
+    """Id of the grid cell holding each lon/lat point (row-major from -180, -90)."""
+    n_cols = int(np.ceil(360 / cell_deg))
+    col = np.floor((np.asarray(lon) + 180) / cell_deg).astype(np.int64)
+    row = np.floor((np.asarray(lat) + 90) / cell_deg).astype(np.int64)
+    return (row * n_cols + np.clip(col, 0, n_cols - 1)).astype(np.int32)
+
+
+def cells_in_bbox(bbox, cell_deg=PARTITION_CELL_DEG):
+    """Ids of every grid cell overlapping bbox (min_lon, min_lat, max_lon, max_lat)."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    n_cols = int(np.ceil(360 / cell_deg))
+    cols = np.arange(
+        np.floor((min_lon + 180) / cell_deg), np.floor((max_lon + 180) / cell_deg) + 1
+    ).astype(np.int64)
+    rows = np.arange(
+        np.floor((min_lat + 90) / cell_deg), np.floor((max_lat + 90) / cell_deg) + 1
+    ).astype(np.int64)
+    return (rows[:, None] * n_cols + np.clip(cols, 0, n_cols - 1)[None, :]).ravel()
+
+
+@functools.lru_cache(maxsize=8)
+def load_region(path):
+    """
+    The union of every geometry in a GeoJSON file, shapefile or any other
+    file geopandas can read, in lon/lat (EPSG:4326).
+    """
+    try:
+        import geopandas
+    except ImportError as e:
+        raise ImportError(
+            "Region filters require geopandas. Install it with "
+            "`pip install .[geo]` or use --bbox."
+        ) from e
+
+    regions = geopandas.read_file(path)
+    if regions.crs is not None:
+        regions = regions.to_crs(epsg=4326)
+    return regions.union_all()
+
+
+def region_bounds(params):
+    """
+    Bounding box (min_lon, min_lat, max_lon, max_lat) every point that
+    passes the region filters lies in, or None when no region is set.
+    """
+    bounds = []
+    if params["bbox"] is not None:
+        bounds.append(tuple(params["bbox"]))
+    if params["region_file"] is not None:
+        bounds.append(tuple(load_region(params["region_file"]).bounds))
+    if not bounds:
+        return None
+
+    min_lons, min_lats, max_lons, max_lats = zip(*bounds)
+    return max(min_lons), max(min_lats), min(max_lons), min(max_lats)
+
+
+def points_in_bbox(lon, lat, bbox):
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+
+
+def points_in_region(lon, lat, region):
+    """
+    Boolean mask of the lon/lat points that lie in the shapely geometry
+    region (boundary included). Only the points inside the region's
+    bounding box are tested against the prepared geometry.
+    """
+    import shapely
+
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.asarray(lat, dtype=np.float64)
+
+    inside = points_in_bbox(lon, lat, region.bounds)
+    shapely.prepare(region)
+    inside[inside] = shapely.intersects_xy(region, lon[inside], lat[inside])
+    return inside
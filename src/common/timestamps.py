@@ -0,0 +1,71 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pandas as pd
+from datetime import timedelta, timezone
+
+from common.instrumentation import stage
+
+# Hawaii does not observe daylight saving time, so HST is always UTC-10
+HST = timezone(timedelta(hours=-10))
+
+# Every datetime_utc value in the Hawaii GT files carries this offset.
+# pandas parses ISO 8601 strings without an offset several times faster than
+# with one, so it is stripped before parsing when all values have it.
+UTC_SUFFIX = "+00:00"
+
+
+def parse_datetime_utc(values):
+    """
+    Parses datetime_utc strings with a fixed ISO 8601 format (no per-call
+    format inference) to datetime64[ns, UTC], i.e. int64 epoch nanoseconds.
+    Naive timestamps are taken to be UTC.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        if values.dt.tz is None:
+            return values.dt.tz_localize("UTC").astype("datetime64[ns, UTC]")
+        return values.dt.tz_convert("UTC").astype("datetime64[ns, UTC]")
+
+    if values.str.endswith(UTC_SUFFIX, na=True).all():
+        values = values.str.removesuffix(UTC_SUFFIX)
+
+    parsed = pd.to_datetime(values, format="ISO8601", utc=True, cache=False)
+    return parsed.astype("datetime64[ns, UTC]")
+
+
+def parse_timestamps(ais_data):
+    """
+    Parses datetime_utc in place and drops datetime_hst, which ensure_hst
+    derives from datetime_utc for the consumers that need it.
+    """
+    with stage("parse_timestamps", len(ais_data)) as timer:
+        ais_data["datetime_utc"] = parse_datetime_utc(ais_data["datetime_utc"])
+        if "datetime_hst" in ais_data.columns:
+            ais_data.drop(columns="datetime_hst", inplace=True)
+        timer.rows_out = len(ais_data)
+    return ais_data
+
+
+def ensure_hst(ais_data):
+    """Adds datetime_hst (derived from datetime_utc) to ais_data if missing."""
+    if "datetime_hst" not in ais_data.columns:
+        ais_data["datetime_hst"] = ais_data["datetime_utc"].dt.tz_convert(HST)
+    return ais_data
+
+
+def epoch_ns(timestamps):
+    """
+    int64 epoch nanoseconds of a datetime Series (zero-copy when it is
+    already datetime64[ns, UTC]). Naive timestamps are taken to be UTC.
+    """
+    naive_utc = timestamps
+    if timestamps.dt.tz is not None:
+        naive_utc = timestamps.dt.tz_convert(None)
+    return np.asarray(naive_utc, dtype="datetime64[ns]").view(np.int64)
@@ -0,0 +1,231 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import json
+import os
+import shutil
+import numpy as np
+import pandas as pd
+
+from common.ais_schema import apply_ais_schema
+from common.filter_trajectories import ensure_utc
+from common.timestamps import parse_timestamps
+
+INDEX_DIR_NAME = "vessel_index"
+# Written last, so a partially built index is never mistaken for a valid one
+COMPLETE_MARKER = "_COMPLETE"
+METADATA_FILE = "metadata.json"
+# sorted unique MMSIs, and the row offsets of each MMSI's points
+KEYS_FILE = "_mmsi.npy"
+OFFSETS_FILE = "_offsets.npy"
+
+
+def index_dir_for(data_dir, file_stem):
+    """Directory holding the vessel index of data_dir/<file_stem>.csv"""
+    return os.path.join(data_dir, INDEX_DIR_NAME, file_stem)
+
+
+def is_indexed(data_dir, file_stem):
+    """
+    A month is indexed when its index finished building and is not older
+    than the source CSV (if the CSV is still around).
+    """
+    marker = os.path.join(index_dir_for(data_dir, file_stem), COMPLETE_MARKER)
+    if not os.path.exists(marker):
+        return False
+
+    csv_path = os.path.join(data_dir, f"{file_stem}.csv")
+    if os.path.exists(csv_path):
+        return os.path.getmtime(marker) >= os.path.getmtime(csv_path)
+    return True
+
+
+def build_vessel_index(data_dir, file_stem):
+    """
+    One-time conversion of data_dir/<file_stem>.csv to a vessel index: the
+    points sorted by (MMSI, datetime_utc), one .npy file per column, and an
+    offset table giving the contiguous row range of every MMSI. Categorical
+    columns are stored as codes with their categories in the metadata, and
+    datetime_utc as UTC nanoseconds.
+    """
+    csv_path = os.path.join(data_dir, f"{file_stem}.csv")
+    out_dir = index_dir_for(data_dir, file_stem)
+    tmp_dir = out_dir + ".tmp"
+
+    data = pd.read_csv(csv_path)
+    parse_timestamps(data)
+    apply_ais_schema(data)
+    data = data.sort_values(["MMSI", "datetime_utc"], kind="stable")
+
+    mmsi = data["MMSI"].to_numpy()
+    starts_mmsi = np.flatnonzero(np.r_[True, mmsi[1:] != mmsi[:-1]])
+
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, KEYS_FILE), mmsi[starts_mmsi])
+    np.save(
+        os.path.join(tmp_dir, OFFSETS_FILE),
+        np.r_[starts_mmsi, len(mmsi)].astype(np.int64),
+    )
+
+    metadata = {"rows": len(data), "columns": {}, "categories": {}}
+    for col in data.columns.drop("MMSI"):
+        values = data[col]
+        if isinstance(values.dtype, pd.DatetimeTZDtype):
+            kind, array = "datetime", values.dt.tz_convert(None).to_numpy()
+        elif values.dtype.kind in "biuf":
+            kind, array = "numeric", values.to_numpy()
+        else:
+            values = values.astype("category")
+            metadata["categories"][col] = values.cat.categories.astype(str).tolist()
+            kind, array = "categorical", values.cat.codes.to_numpy()
+
+        metadata["columns"][col] = kind
+        np.save(os.path.join(tmp_dir, f"{col}.npy"), array)
+
+    with open(os.path.join(tmp_dir, METADATA_FILE), "w") as f:
+        json.dump(metadata, f)
+    open(os.path.join(tmp_dir, COMPLETE_MARKER), "w").close()
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp_dir, out_dir)
+
+    return out_dir
+
+
+class VesselIndex:
+    """
+    A month's vessel index, memory-mapped. The points of one MMSI (and,
+    within them, of a time window) occupy one contiguous row range, which
+    is found by binary search and sliced from the column files without
+    copying them.
+    """
+
+    def __init__(self, index_dir):
+        with open(os.path.join(index_dir, METADATA_FILE)) as f:
+            metadata = json.load(f)
+
+        self.index_dir = index_dir
+        self.nrows = metadata["rows"]
+        self.column_kinds = metadata["columns"]
+        self.categories = metadata["categories"]
+        self.mmsi = np.load(os.path.join(index_dir, KEYS_FILE))
+        self.offsets = np.load(os.path.join(index_dir, OFFSETS_FILE))
+        self.columns = {
+            col: np.load(os.path.join(index_dir, f"{col}.npy"), mmap_mode="r")
+            for col in self.column_kinds
+        }
+
+    @classmethod
+    def open(cls, data_dir, file_stem, build=False):
+        """Opens the index of a month, building it first if build is set."""
+        if not is_indexed(data_dir, file_stem):
+            if not build:
+                raise FileNotFoundError(
+                    f"{file_stem} has no up-to-date vessel index. Build it with "
+                    "build_vessel_index or run main.py with --build_vessel_index."
+                )
+            print(f"INFO: Building the vessel index of {file_stem}.csv...")
+            build_vessel_index(data_dir, file_stem)
+        return cls(index_dir_for(data_dir, file_stem))
+
+    def row_range(self, mmsi, start=None, end=None):
+        """
+        Slice of the rows of mmsi with start <= datetime_utc <= end (either
+        bound may be None). The slice is empty if the MMSI is not indexed.
+        """
+        position = np.searchsorted(self.mmsi, mmsi)
+        if position == len(self.mmsi) or self.mmsi[position] != mmsi:
+            return slice(0, 0)
+
+        first, last = self.offsets[position], self.offsets[position + 1]
+        if start is None and end is None:
+            return slice(int(first), int(last))
+
+        # the MMSI's points are sorted by time, so the window is a sub-range
+        times = self.columns["datetime_utc"][first:last]
+        offset = first
+        if start is not None:
+            first = offset + np.searchsorted(times, _utc_datetime64(start), "left")
+        if end is not None:
+            last = offset + np.searchsorted(times, _utc_datetime64(end), "right")
+        return slice(int(first), int(max(first, last)))
+
+    def vessel_arrays(self, mmsi, start=None, end=None, columns=None):
+        """Zero-copy views of the columns for one MMSI and time window."""
+        rows = self.row_range(mmsi, start, end)
+        return {col: self.columns[col][rows] for col in columns or self.columns}
+
+    def get_points(self, mmsis, start=None, end=None, columns=None):
+        """
+        DataFrame (indexed by MMSI, sorted by MMSI then datetime_utc) of the
+        points of every MMSI in mmsis within the time window. Each column is
+        gathered from its row ranges with a single copy.
+        """
+        columns = list(columns or self.columns)
+        ranges = [
+            (mmsi, self.row_range(mmsi, start, end))
+            for mmsi in np.unique(np.atleast_1d(mmsis))
+        ]
+        ranges = [(mmsi, rows) for mmsi, rows in ranges if rows.stop > rows.start]
+
+        index = pd.Index(
+            np.repeat(
+                np.array([mmsi for mmsi, _ in ranges], dtype=self.mmsi.dtype),
+                [rows.stop - rows.start for _, rows in ranges],
+            ),
+            name="MMSI",
+        )
+        data = {}
+        for col in columns:
+            array = self.columns[col]
+            values = (
+                np.concatenate([array[rows] for _, rows in ranges])
+                if ranges
+                else array[:0].copy()
+            )
+            data[col] = self._to_series_values(col, values)
+
+        return pd.DataFrame(data, index=index)
+
+    def _to_series_values(self, col, values):
+        kind = self.column_kinds[col]
+        if kind == "datetime":
+            return pd.DatetimeIndex(values).tz_localize("UTC")
+        if kind == "categorical":
+            return pd.Categorical.from_codes(values, categories=self.categories[col])
+        return values
+
+
+def get_vessel_points(
+    data_dir, mmsis, start, end, columns=None, file_prefix="Hawaii", build=False
+):
+    """
+    Batch lookup of the points of many vessels between start and end
+    (inclusive; naive times are taken as UTC), across every month file
+    <file_prefix>_YYYY_MM in the window, in one call. Returns a DataFrame
+    indexed by MMSI and sorted by MMSI then datetime_utc.
+    """
+    start, end = ensure_utc(pd.Timestamp(start)), ensure_utc(pd.Timestamp(end))
+    months = pd.period_range(start.tz_convert(None), end.tz_convert(None), freq="M")
+
+    frames = []
+    for month in months:
+        file_stem = f"{file_prefix}_{month.year}_{month.month:02d}"
+        index = VesselIndex.open(data_dir, file_stem, build=build)
+        frames.append(index.get_points(mmsis, start, end, columns))
+
+    points = pd.concat(frames)
+    # months are in time order, so a stable sort on MMSI keeps each
+    # vessel's points in time order
+    return points.sort_index(kind="stable")
+
+
+def _utc_datetime64(timestamp):
+    return ensure_utc(pd.Timestamp(timestamp)).tz_convert(None).to_datetime64()
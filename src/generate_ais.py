@@ -0,0 +1,461 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Generates seeded synthetic AIS data in the schema of the HawaiiCoast_GT
+month files (Hawaii_<year>_<month>.csv), for benchmarks and for trying the
+pipeline without the Zenodo download, e.g.:
+
+    python src/generate_ais.py --rows 1000000 --start 2017-01 --months 3 --out /tmp/ais
+    python src/main.py ... --Hawaii_GT true   # after copying the files to data/
+
+--inject adds synthetic anomalies with ground-truth labels, for measuring
+how well the anomaly rules find them:
+
+    python src/generate_ais.py --rows 20000000 --months 2 --out /tmp/ais --inject overspeed "speed abnormality"
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from anomaly_generation.anomaly_injection import INJECTION_TYPES, inject_anomalies
+from common.geodesy import EARTH_RADIUS_KM, KM_PER_NAUTICAL_MILE, haversine_km
+from common.output_writers import (
+    OUTPUT_FORMATS,
+    WRITERS,
+    open_output_writer,
+)
+from common.timestamps import HST, ensure_hst, epoch_ns
+from params_builder import DEFAULT_INJECT_FRACTION
+
+# share of the fleet, length range (m), cruise speed and its spread (knots)
+VESSEL_CLASSES = {
+    "cargo": (0.22, (90, 300), 14.0, 2.0),
+    "tanker": (0.12, (80, 280), 12.5, 1.5),
+    "fishing": (0.16, (10, 60), 8.0, 3.0),
+    "passenger": (0.10, (20, 300), 16.0, 3.0),
+    "tug tow": (0.12, (15, 45), 7.0, 2.0),
+    "pleasure craft/sailing": (0.16, (5, 40), 6.0, 2.5),
+    "military": (0.04, (30, 200), 15.0, 4.0),
+    "research vessel": (0.04, (30, 100), 9.0, 2.0),
+    "pilot vessel": (0.04, (10, 25), 10.0, 3.0),
+}
+# Maritime identification digits the MMSIs are drawn from (US first)
+MIDS = [367, 366, 338, 538, 636, 477, 563, 352, 355, 431]
+# Waters around the main Hawaiian islands (min_lon, min_lat, max_lon, max_lat)
+HAWAII_BBOX = (-161.0, 18.5, -154.5, 23.0)
+# Average reports of one vessel in one month, used to size the default fleet
+REPORTS_PER_VESSEL_MONTH = 2_000
+# Rows generated (and held in memory) at a time
+GENERATE_BATCH_ROWS = 500_000
+# Shortest interval (s) between the reports of a vessel, before any compression
+MIN_REPORT_INTERVAL_S = 10
+# Chance per report that a new spell of cruising or being stopped starts,
+# and the share of spells spent stopped (anchored or moored)
+SPELL_CHANGE_PROB = 0.01
+STOPPED_SHARE = 0.25
+# Heading change (degrees) between consecutive reports, one standard deviation
+TURN_SD_DEG = 8.0
+# GPS position noise, one standard deviation (km)
+POSITION_NOISE_KM = 0.005
+# Decimals positions are reported to (~0.1 m, finer than AIS's 1/10000 minute)
+POSITION_DECIMALS = 6
+KM_PER_DEGREE = EARTH_RADIUS_KM * np.pi / 180
+
+
+class Fleet:
+    """
+    The vessels of a synthetic data set: their static data (MMSI, class,
+    length, cruise speed) and the state each one's track continues from in
+    the next month (position, heading, stopped or not).
+    """
+
+    def __init__(self, n_vessels, seed=0):
+        rng = np.random.default_rng(seed)
+        names = list(VESSEL_CLASSES)
+        shares = np.array([VESSEL_CLASSES[name][0] for name in names])
+
+        self.n_vessels = n_vessels
+        suffixes = rng.choice(1_000_000, n_vessels, replace=False)
+        self.mmsi = rng.choice(MIDS, n_vessels) * 1_000_000 + suffixes
+        self.class_codes = rng.choice(len(names), n_vessels, p=shares / shares.sum())
+        self.class_names = names
+
+        length_ranges = np.array([VESSEL_CLASSES[name][1] for name in names])
+        low, high = length_ranges[self.class_codes].T
+        self.length_m = np.round(low + rng.random(n_vessels) * (high - low))
+
+        cruise = np.array([VESSEL_CLASSES[name][2] for name in names])
+        spread = np.array([VESSEL_CLASSES[name][3] for name in names])
+        self.cruise_knots = np.maximum(
+            cruise[self.class_codes]
+            + spread[self.class_codes] * rng.standard_normal(n_vessels),
+            1.0,
+        )
+        self.speed_sd = 0.1 * self.cruise_knots
+        # how much of the month each vessel reports for, on average
+        self.activity = rng.lognormal(0.0, 1.0, n_vessels)
+
+        min_lon, min_lat, max_lon, max_lat = HAWAII_BBOX
+        self.lat = rng.uniform(min_lat, max_lat, n_vessels)
+        self.lon = rng.uniform(min_lon, max_lon, n_vessels)
+        self.heading = rng.uniform(0, 2 * np.pi, n_vessels)
+        self.stopped = rng.random(n_vessels) < STOPPED_SHARE
+
+
+def segment_cumsum(values, starts):
+    """Cumulative sum of values restarting at every index where starts is True."""
+    total = np.cumsum(values)
+    offsets = np.maximum.accumulate(np.where(starts, np.arange(len(values)), 0))
+    return total - total[offsets] + values[offsets]
+
+
+def fold_into(values, low, high):
+    """Reflects values into [low, high], as a track bouncing off the edges would."""
+    width = high - low
+    return low + width - np.abs(np.mod(values - low, 2 * width) - width)
+
+
+def generate_tracks(fleet, vessels, counts, month_start, month_end, rng):
+    """
+    The reports of the given vessels (indices into fleet) for one month,
+    counts[i] of them for vessels[i], as a frame in the Hawaii GT schema
+    ordered by MMSI and time. Each vessel reports at random times within an
+    active window of the month, cruising on a wandering heading with
+    stopped (anchored/moored) spells, continuing from the fleet state,
+    which is updated to where each track ends.
+    """
+    n = int(counts.sum())
+    local = np.repeat(np.arange(len(vessels)), counts)
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = local[1:] != local[:-1]
+    ends = np.flatnonzero(np.append(starts[1:], True))
+
+    # report intervals: at least MIN_REPORT_INTERVAL_S apart, with
+    # exponential gaps on top, stretched to fill each vessel's active window
+    month_s = (month_end.value - month_start.value) / 1e9
+    window_start_s = rng.uniform(0, 0.5, len(vessels)) * month_s
+    window_s = (month_s - window_start_s) * rng.uniform(0.3, 1.0, len(vessels))
+    extra_gap_s = np.maximum(window_s / counts - MIN_REPORT_INTERVAL_S, 0)
+    gaps_s = MIN_REPORT_INTERVAL_S + extra_gap_s[local] * rng.exponential(1.0, n)
+    gaps_s[starts] = 0
+    elapsed_s = segment_cumsum(gaps_s, starts)
+    total_s = elapsed_s[ends]
+    scale = np.divide(window_s, total_s, out=np.ones(len(vessels)), where=total_s > 0)
+    elapsed_s *= np.minimum(scale, 1.0)[local]
+    times_ns = month_start.value + ((window_start_s[local] + elapsed_s) * 1e9).astype(
+        np.int64
+    )
+    hours = np.zeros(n)
+    hours[1:] = np.diff(times_ns) / 3.6e12
+    hours[starts] = 0
+
+    # under way or stopped: the state drawn at the start of the latest spell
+    new_spell = rng.random(n) < SPELL_CHANGE_PROB
+    new_spell[starts] = True
+    spell_stopped = rng.random(n) < STOPPED_SHARE
+    spell_stopped[starts] = fleet.stopped[vessels]
+    stopped = spell_stopped[np.maximum.accumulate(np.where(new_spell, np.arange(n), 0))]
+
+    speeds = np.maximum(
+        fleet.cruise_knots[vessels][local]
+        + fleet.speed_sd[vessels][local] * rng.standard_normal(n),
+        0.5,
+    )
+    speeds[stopped] = np.abs(0.05 * rng.standard_normal(int(stopped.sum())))
+
+    turns = np.radians(TURN_SD_DEG) * rng.standard_normal(n)
+    turns[starts] = fleet.heading[vessels]
+    headings = segment_cumsum(turns, starts)
+
+    # dead reckoning from the position each track continues from
+    steps_km = speeds * KM_PER_NAUTICAL_MILE * hours
+    north_km = segment_cumsum(steps_km * np.cos(headings), starts)
+    east_km = segment_cumsum(steps_km * np.sin(headings), starts)
+    lat0 = fleet.lat[vessels][local]
+    min_lon, min_lat, max_lon, max_lat = HAWAII_BBOX
+    true_lat = fold_into(lat0 + north_km / KM_PER_DEGREE, min_lat, max_lat)
+    true_lon = fold_into(
+        fleet.lon[vessels][local]
+        + east_km / (KM_PER_DEGREE * np.cos(np.radians(lat0))),
+        min_lon,
+        max_lon,
+    )
+
+    fleet.lat[vessels] = true_lat[ends]
+    fleet.lon[vessels] = true_lon[ends]
+    fleet.heading[vessels] = np.mod(headings[ends], 2 * np.pi)
+    fleet.stopped[vessels] = stopped[ends]
+
+    # what the transponder reports: noisy positions and rounded speeds
+    lat = true_lat + POSITION_NOISE_KM / KM_PER_DEGREE * rng.standard_normal(n)
+    lon = true_lon + POSITION_NOISE_KM / (
+        KM_PER_DEGREE * np.cos(np.radians(true_lat))
+    ) * rng.standard_normal(n)
+    lat = np.round(lat, POSITION_DECIMALS)
+    lon = np.round(lon, POSITION_DECIMALS)
+    sog = np.round(np.maximum(speeds + 0.1 * rng.standard_normal(n), 0), 1)
+
+    # distances and implied speeds between consecutive reports of a vessel
+    distances = np.full(n, np.nan)
+    distances[1:] = haversine_km(lon[:-1], lat[:-1], lon[1:], lat[1:])
+    distances[starts] = np.nan
+    computed = sog.copy()
+    moved = ~starts & (hours > 0)
+    computed[moved] = distances[moved] / hours[moved] / KM_PER_NAUTICAL_MILE
+    distances = np.round(distances, 6)
+    computed = np.round(computed, 4)
+
+    class_codes = fleet.class_codes[vessels][local]
+    status = np.zeros(n, dtype=np.int8)
+    status[stopped] = rng.choice([1, 5], int(stopped.sum()))
+    # fishing vessels and sailboats report their activity part of the time
+    for name, code in [("fishing", 7), ("pleasure craft/sailing", 8)]:
+        engaged = (
+            ~stopped
+            & (class_codes == fleet.class_names.index(name))
+            & (rng.random(n) < 0.5)
+        )
+        status[engaged] = code
+
+    return pd.DataFrame(
+        {
+            "MMSI": fleet.mmsi[vessels][local],
+            "datetime_utc": pd.to_datetime(times_ns, utc=True),
+            "lat": lat,
+            "lon": lon,
+            "speed_over_ground_knots": sog,
+            "vessel_class": pd.Categorical.from_codes(
+                class_codes, categories=fleet.class_names
+            ),
+            "length_m": fleet.length_m[vessels][local],
+            "status": status,
+            "comput_speed_knots": computed,
+            "distances_km": distances,
+        }
+    )
+
+
+def format_timestamps(batch):
+    """
+    batch with datetime_utc and datetime_hst as the strings of the Hawaii GT
+    files, formatted as whole arrays, which is many times faster than
+    letting to_csv format each timestamp.
+    """
+    times_ns = epoch_ns(batch["datetime_utc"])
+    hst_ns = times_ns + int(HST.utcoffset(None).total_seconds()) * 10**9
+    return batch.assign(
+        datetime_utc=np.char.add(_iso_ns(times_ns), "+00:00"),
+        datetime_hst=np.char.add(_iso_ns(hst_ns), "-10:00"),
+    )
+
+
+def _iso_ns(times_ns):
+    text = np.datetime_as_string(times_ns.view("datetime64[ns]"), unit="ns")
+    return np.char.replace(text, "T", " ")
+
+
+def generate_month(fleet, rows, month_start, seed=0, batch_rows=GENERATE_BATCH_ROWS):
+    """
+    Yields the rows reports of one month in frames of at most
+    batch_rows rows (or one vessel's reports, if more), vessel by vessel in
+    MMSI order. The rows are spread over the fleet by its activity.
+    """
+    month_start = pd.Timestamp(month_start, tz="UTC")
+    month_end = month_start + pd.offsets.MonthBegin(1)
+    rng = np.random.default_rng([seed, month_start.year, month_start.month])
+
+    counts = rng.multinomial(rows, fleet.activity / fleet.activity.sum())
+    vessels = np.argsort(fleet.mmsi)
+    vessels = vessels[counts[vessels] > 0]
+    counts = counts[vessels]
+
+    batch_ids = np.cumsum(counts) // batch_rows
+    for batch_id in np.unique(batch_ids):
+        in_batch = batch_ids == batch_id
+        yield generate_tracks(
+            fleet, vessels[in_batch], counts[in_batch], month_start, month_end, rng
+        )
+
+
+def write_months(
+    out_dir,
+    rows,
+    start,
+    months,
+    n_vessels=None,
+    seed=0,
+    output_format="csv",
+    prefix="Hawaii",
+    inject_types=None,
+    inject_fraction=DEFAULT_INJECT_FRACTION,
+):
+    """
+    Writes rows reports split evenly over months files starting with the
+    month start ("YYYY-MM"), named like the Hawaii GT files
+    (<prefix>_<year>_<month>), one generated batch at a time. Returns the
+    paths written.
+
+    With inject_types, anomalies of those types are injected into
+    inject_fraction of the trajectories of each batch, and their labels are
+    written next to each month file (<prefix>_<year>_<month>_labels.csv).
+    """
+    if n_vessels is None:
+        n_vessels = int(
+            np.clip(rows // (months * REPORTS_PER_VESSEL_MONTH), 10, 1_000_000)
+        )
+    fleet = Fleet(n_vessels, seed)
+    output_params = {
+        "output_format": output_format,
+        "output_partition": None,
+        "output_compression": None,
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    rows_per_month = np.full(months, rows // months)
+    rows_per_month[: rows % months] += 1
+    for month_start, month_rows in zip(
+        pd.date_range(start, periods=months, freq="MS"), rows_per_month
+    ):
+        writer = open_output_writer(
+            os.path.join(
+                out_dir, f"{prefix}_{month_start.year}_{month_start.month:02d}"
+            ),
+            output_params,
+        )
+        labels = []
+        try:
+            for batch_id, batch in enumerate(
+                generate_month(fleet, int(month_rows), month_start, seed)
+            ):
+                if inject_types:
+                    # a batch holds all of its vessels' reports of the month
+                    batch, batch_labels = inject_anomalies(
+                        batch,
+                        inject_types,
+                        inject_fraction,
+                        [seed, month_start.year, month_start.month, batch_id],
+                    )
+                    labels.append(batch_labels)
+                if output_format == "csv":
+                    batch = format_timestamps(batch)
+                writer.write(ensure_hst(batch))
+        finally:
+            writer.close()
+        paths.append(writer.path)
+
+        if inject_types:
+            labels = pd.concat(labels, ignore_index=True)
+            labels["traj_id"] = np.arange(len(labels))
+            labels.to_csv(
+                os.path.join(
+                    out_dir,
+                    f"{prefix}_{month_start.year}_{month_start.month:02d}_labels.csv",
+                ),
+                index=False,
+            )
+
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic AIS month files in the Hawaii GT schema."
+    )
+    parser.add_argument(
+        "--rows", type=int, default=1_000_000, help="Total reports. Default is 1M."
+    )
+    parser.add_argument(
+        "--start", default="2017-01", help="First month (YYYY-MM). Default is 2017-01."
+    )
+    parser.add_argument(
+        "--months", type=int, default=1, help="Number of month files. Default is 1."
+    )
+    parser.add_argument(
+        "--vessels",
+        type=int,
+        help=f"Fleet size. Default is one vessel per {REPORTS_PER_VESSEL_MONTH} reports a month.",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Random seed. Default is 0."
+    )
+    parser.add_argument(
+        "--out", required=True, help="Directory to write the month files to."
+    )
+    parser.add_argument(
+        "--output_format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Format of the month files (Parquet and Feather require pyarrow). Default is csv.",
+    )
+    parser.add_argument(
+        "--prefix", default="Hawaii", help="File name prefix. Default is Hawaii."
+    )
+    parser.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="Replace month files that already exist in --out.",
+    )
+    parser.add_argument(
+        "--inject",
+        nargs="+",
+        choices=INJECTION_TYPES,
+        help="Inject anomalies of these types and write their labels next to each month file.",
+    )
+    parser.add_argument(
+        "--inject_fraction",
+        type=float,
+        default=DEFAULT_INJECT_FRACTION,
+        help=f"Share of the trajectories --inject injects an anomaly into. Default is {DEFAULT_INJECT_FRACTION}.",
+    )
+    args = parser.parse_args()
+    if not 0 < args.inject_fraction <= 1:
+        parser.error("--inject_fraction must be above 0 and at most 1.")
+
+    extension = WRITERS[args.output_format].extension
+    existing = [
+        name
+        for name in (
+            f"{args.prefix}_{month.year}_{month.month:02d}{extension}"
+            for month in pd.date_range(args.start, periods=args.months, freq="MS")
+        )
+        if os.path.exists(os.path.join(args.out, name))
+    ]
+    if existing and not args.overwrite:
+        parser.error(
+            f"{args.out} already has {', '.join(existing)}; pass --overwrite to replace them."
+        )
+
+    started = time.perf_counter()
+    paths = write_months(
+        args.out,
+        args.rows,
+        args.start,
+        args.months,
+        args.vessels,
+        args.seed,
+        args.output_format,
+        args.prefix,
+        args.inject,
+        args.inject_fraction,
+    )
+    elapsed = time.perf_counter() - started
+    print(
+        f"INFO: Wrote {args.rows} reports to {len(paths)} files in {elapsed:.1f} s "
+        f"({args.rows / max(elapsed, 1e-9):.0f} rows/s): {', '.join(paths)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
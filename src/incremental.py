@@ -0,0 +1,310 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import copy
+import hashlib
+import json
+import os
+import pickle
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+from anomaly_rules.anomaly_rule_overspeeding import (
+    build_speed_groups,
+    get_percentile,
+    prepare_speeds,
+    sorted_percentiles,
+)
+from common.chunked_ingest import read_and_filter_in_chunks
+from common.filter_trajectories import time_of_day_us
+from common.output_writers import write_output
+from common.quantile_sketch import QuantileSketch
+from common.timestamps import epoch_ns
+
+STATE_FILE = "state.json"
+GROUPS_FILE = "groups.pkl"
+DIGEST_BLOCK_BYTES = 1 << 20
+# In sketch mode only the points above the (percentile - TAIL_MARGIN)
+# quantile of their group are kept, since only they can ever flip while the
+# threshold stays above that quantile
+TAIL_MARGIN = 0.02
+
+
+def state_fingerprint(params):
+    """The params a threshold state depends on; later updates must match them."""
+    hours = params["hour_constraint"]
+    return {
+        "vessel_class": sorted(params["vessel_class"] or []) or None,
+        "length_range": params["length_range"],
+        "hour_constraint": [
+            None if value is None else time_of_day_us(value)
+            for value in (hours["start"], hours["end"])
+        ],
+        "bbox": params["bbox"],
+        "region_file": params["region_file"],
+        "percentile": get_percentile(params),
+        "group_by": params["group_by"],
+        "length_bins": params["length_bins"] if params["group_by"] else None,
+        "threshold_method": params["threshold_method"],
+        "sketch_accuracy": params["sketch_accuracy"],
+    }
+
+
+def file_digest(file_path):
+    """SHA-256 of the file's contents, which identifies it whatever its name or mtime."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(DIGEST_BLOCK_BYTES):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_state(state_dir):
+    """(metadata, groups) of the threshold state in state_dir, or (None, {})."""
+    if not os.path.exists(os.path.join(state_dir, STATE_FILE)):
+        return None, {}
+    with open(os.path.join(state_dir, STATE_FILE)) as f:
+        metadata = json.load(f)
+    with open(os.path.join(state_dir, GROUPS_FILE), "rb") as f:
+        groups = pickle.load(f)
+    return metadata, groups
+
+
+def save_state(state_dir, metadata, groups):
+    os.makedirs(state_dir, exist_ok=True)
+    groups_path = os.path.join(state_dir, GROUPS_FILE)
+    with open(groups_path + ".tmp", "wb") as f:
+        pickle.dump(groups, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(groups_path + ".tmp", groups_path)
+
+    # written last, so it only ever describes a complete groups file
+    state_path = os.path.join(state_dir, STATE_FILE)
+    with open(state_path + ".tmp", "w") as f:
+        json.dump(metadata, f, indent=1)
+    os.replace(state_path + ".tmp", state_path)
+
+
+def run_incremental_update(params, file_path, state_dir, output_path):
+    """
+    Adds one new AIS file to the persisted overspeed threshold state in
+    state_dir (created on the first run) without touching earlier files.
+
+    Per group (see params["group_by"]) the state holds either every valid
+    speed seen so far, sorted, with the MMSI and time of its point
+    ("exact"), or a QuantileSketch plus the points in the upper tail
+    ("sketch"). The new file's speeds are merged in and the thresholds
+    recomputed. A historical point's flag can only flip if its speed lies
+    between its group's old and new threshold, so only that slice of the
+    sorted speeds is re-flagged.
+
+    The whole file is ingested (params["timeframe"] is ignored); the other
+    filters, the percentile and the grouping must match the earlier runs.
+    Files are told apart by their contents: a file already in the state is
+    skipped under any name, and a changed file under the name of one in the
+    state is refused, since the speeds it added cannot be taken out again.
+
+    Writes the new file's flagged points, the flipped historical flags and
+    the old and new thresholds to <output_path>/incremental_<date>/.
+    """
+    params = copy.deepcopy(params)
+    params["anomaly_type"] = "overspeed"
+    params["timeframe"] = {"start": None, "end": None}
+
+    file_name = os.path.basename(file_path)
+    source = {"size": os.path.getsize(file_path), "sha256": file_digest(file_path)}
+    fingerprint = state_fingerprint(params)
+
+    metadata, groups = load_state(state_dir)
+    if metadata is None:
+        metadata = {"fingerprint": fingerprint, "files": {}}
+    elif metadata["fingerprint"] != fingerprint:
+        raise ValueError(
+            f"The threshold state in {state_dir} was built with different "
+            "filters, percentile, grouping or threshold method. Use another "
+            "--state_dir or the original parameters."
+        )
+    added_as = [name for name, added in metadata["files"].items() if added == source]
+    if added_as:
+        print(
+            f"WARNING: {file_name} is already part of the threshold state"
+            + (f" (as {added_as[0]})." if added_as[0] != file_name else ".")
+        )
+        return None
+    if file_name in metadata["files"]:
+        raise ValueError(
+            f"{file_name} has changed since it was added to the threshold state "
+            f"in {state_dir}, and its earlier speeds cannot be taken out of it. "
+            "Add new data under a new file name, or rebuild the state from the "
+            "current files in a new --state_dir."
+        )
+
+    data = read_and_filter_in_chunks(params, file_path)
+    if data is None:
+        raise ValueError(f"No data in {file_name} passed the filters.")
+    data = prepare_speeds(data)
+
+    labels = group_labels(data, params)
+    speeds = data["computed_speed_knots"].to_numpy()
+    mmsi = data["MMSI"].to_numpy()
+    times_ns = epoch_ns(data["datetime_utc"])
+    valid = np.isfinite(speeds)
+    percentile = get_percentile(params)
+
+    thresholds = []
+    flipped = []
+    new_thresholds = np.full(len(data), np.nan)
+    for label in np.unique(labels):
+        in_group = labels == label
+        rows = in_group & valid
+        group = groups.get(label)
+        old_threshold = None if group is None else group["threshold"]
+        # update_group replaces these arrays, so they stay the history
+        history = None if group is None else dict(group)
+
+        group = update_group(
+            group,
+            speeds[rows],
+            mmsi[rows],
+            times_ns[rows],
+            percentile,
+            params["threshold_method"],
+            params["sketch_accuracy"],
+        )
+        groups[label] = group
+        new_thresholds[in_group] = group["threshold"]
+
+        thresholds.append(
+            {
+                "group": label,
+                "old_threshold": old_threshold,
+                "new_threshold": group["threshold"],
+                "n_points": group["count"],
+            }
+        )
+        if history is not None:
+            flipped.append(
+                flipped_points(history, old_threshold, group["threshold"], label)
+            )
+
+    # groups the new file has no points in keep their thresholds
+    data["speed_threshold"] = new_thresholds
+    data["overspeed_flag"] = speeds > new_thresholds
+
+    metadata["files"][file_name] = source
+    save_state(state_dir, metadata, groups)
+
+    flipped = (
+        pd.concat(flipped, ignore_index=True)
+        if flipped
+        else pd.DataFrame(
+            columns=["group", "MMSI", "datetime_utc", "speed_knots", "overspeed_flag"]
+        )
+    )
+    thresholds = pd.DataFrame(thresholds)
+
+    run_dir = os.path.join(
+        output_path, f"incremental_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
+    )
+    os.makedirs(run_dir, exist_ok=True)
+    write_output(
+        data,
+        os.path.join(run_dir, os.path.splitext(file_name)[0]),
+        params,
+        flag_columns=["overspeed_flag"],
+        index=True,
+    )
+    flipped.to_csv(os.path.join(run_dir, "flipped_flags.csv"), index=False)
+    thresholds.to_csv(os.path.join(run_dir, "thresholds.csv"), index=False)
+
+    print(f"Speed thresholds after adding {file_name}:\n{thresholds}\n")
+    print(
+        f"{len(flipped)} historical overspeed flags flipped "
+        f"({int(flipped['overspeed_flag'].sum())} newly flagged, "
+        f"{int((~flipped['overspeed_flag'].astype(bool)).sum())} no longer flagged)."
+    )
+    print(f"Successfully saved the incremental update to {run_dir}.")
+
+    return data, flipped, thresholds
+
+
+def group_labels(data, params):
+    """One string label per row naming its speed group ("all" without grouping)."""
+    if not params["group_by"]:
+        return np.full(len(data), "all", dtype=object)
+
+    group_keys = build_speed_groups(data, params["group_by"], params["length_bins"])
+    labels = group_keys[0].astype(str).to_numpy(dtype=object)
+    for key in group_keys[1:]:
+        labels = labels + "|" + key.astype(str).to_numpy(dtype=object)
+    return labels
+
+
+def update_group(group, speeds, mmsi, times_ns, percentile, method, accuracy):
+    """Merges a file's valid speeds of one group into its state."""
+    order = np.argsort(speeds, kind="stable")
+    speeds, mmsi, times_ns = speeds[order], mmsi[order], times_ns[order]
+
+    if group is None:
+        group = {
+            "count": 0,
+            "speeds": speeds[:0],
+            "mmsi": mmsi[:0],
+            "times_ns": times_ns[:0],
+            "sketch": QuantileSketch(accuracy) if method == "sketch" else None,
+        }
+
+    # both arrays are sorted, so the new points are slotted straight in
+    positions = np.searchsorted(group["speeds"], speeds, side="right")
+    group["speeds"] = np.insert(group["speeds"], positions, speeds)
+    group["mmsi"] = np.insert(group["mmsi"], positions, mmsi)
+    group["times_ns"] = np.insert(group["times_ns"], positions, times_ns)
+    group["count"] += len(speeds)
+
+    if method == "sketch":
+        group["sketch"].add(speeds)
+        group["threshold"] = group["sketch"].quantile(percentile)
+
+        # keep only the tail points, which are the only ones that can flip
+        guard = group["sketch"].quantile(max(percentile - TAIL_MARGIN, 0))
+        keep_from = np.searchsorted(group["speeds"], guard, side="left")
+        if group["threshold"] < group.get("guard", -np.inf):
+            print(
+                "WARNING: The speed threshold fell below the speeds kept in the "
+                "sketch state; flags of points below the kept tail are not reported."
+            )
+        group["guard"] = max(guard, group.get("guard", -np.inf))
+        for key in ["speeds", "mmsi", "times_ns"]:
+            group[key] = group[key][keep_from:]
+    else:
+        group["threshold"] = sorted_percentiles(group["speeds"], [percentile])[0]
+
+    return group
+
+
+def flipped_points(history, old_threshold, new_threshold, label):
+    """
+    The points of history (a group's state before the update) whose flag
+    (speed > threshold) differs between old_threshold and new_threshold,
+    with their new flag. They are exactly the sorted speeds between the two
+    thresholds.
+    """
+    low, high = sorted([old_threshold, new_threshold])
+    start = np.searchsorted(history["speeds"], low, side="right")
+    stop = np.searchsorted(history["speeds"], high, side="right")
+
+    return pd.DataFrame(
+        {
+            "group": label,
+            "MMSI": history["mmsi"][start:stop],
+            "datetime_utc": pd.to_datetime(history["times_ns"][start:stop], utc=True),
+            "speed_knots": history["speeds"][start:stop],
+            "overspeed_flag": new_threshold < old_threshold,
+        }
+    )
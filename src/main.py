@@ -7,13 +7,56 @@
 #  This software is distributed under the 3-clause BSD License.
 #  ___________________________________________________________________________
 
+import logging
 import os
 import pandas as pd
 from datetime import datetime
 
-from anomaly_rules.anomaly_rule_overspeeding import overspeeding
-from params_builder import ParamsBuilder, ArgParser
+# The anomaly rules and the sweep, incremental and streaming modes are
+# imported where they are selected, so a run only loads what it uses
+from params_builder import DEFAULT_INJECT_FRACTION, ParamsBuilder, ArgParser
+from common.timestamps import parse_timestamps
 from common.filter_trajectories import filter_ais_data
+from common.ais_schema import (
+    LENGTH_LIMITS_M,
+    VESSEL_CLASSES,
+    apply_ais_schema,
+    read_ais_csv,
+    report_memory,
+)
+from common.output_writers import COMPRESSIONS, write_output
+from common.instrumentation import (
+    reset_run_report,
+    run_report,
+    stage,
+    start_profiler,
+    stop_profiler,
+)
+from common.chunked_ingest import read_and_filter_in_chunks, read_header
+from common.derived_speeds import derive_speeds, missing_derived_columns
+from common.quantile_sketch import QuantileSketch
+from common.ais_cache import (
+    COMPLETE_MARKER,
+    cache_dir_for,
+    convert_csv_to_parquet,
+    is_cached,
+    pyarrow_available,
+    read_cached_month,
+)
+from common.vessel_index import build_vessel_index, is_indexed
+from common.spatial_index import load_region
+from common.result_cache import (
+    DEFAULT_MAX_CACHE_MB,
+    filter_key,
+    load_cached_result,
+    store_result,
+)
+from common.manifest import (
+    manifest_entry,
+    matching_zone_runs,
+    read_zone_runs,
+    zone_can_match,
+)
 
 one_dir_up_from_this_file = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
 
@@ -27,32 +70,146 @@ def main():
     params_builder.update_params(args)
 
     params = params_builder.params
+    configure_logging(params)
+
+    # a sweep takes its filters from the job file instead of the prompts
+    if params["sweep_file"] is not None:
+        from sweep import run_sweep
+
+        run_sweep(
+            params,
+            params["sweep_file"],
+            complete_params,
+            load_and_filter_data_with_cache,
+            os.path.join(one_dir_up_from_this_file, "output"),
+        )
+        return
+
+    # so does an incremental update, which reads the whole new file
+    if params["incremental_file"] is not None:
+        from incremental import run_incremental_update
+
+        params["Hawaii_GT"] = False
+        params["AIS_file_name"] = params["incremental_file"]
+        params["timeframe"] = {"start": pd.Timestamp.min, "end": pd.Timestamp.max}
+        params = complete_params(params)
+
+        run_incremental_update(
+            params,
+            os.path.join(
+                one_dir_up_from_this_file, "data", f"{params['AIS_file_name']}.csv"
+            ),
+            params["state_dir"]
+            or os.path.join(one_dir_up_from_this_file, "state", "overspeed"),
+            os.path.join(one_dir_up_from_this_file, "output"),
+        )
+        return
 
-    params = fill_in_params(params)  # first pass
+    # and the streaming mode, which runs until its source ends
+    if params["stream_source"] is not None:
+        from streaming import run_stream
 
-    # the way this is set up, they will not be kicked out and have to rerun main, no matter how many times they give incorrect input
-    # the errors will just be a notification, they will be looped back to try again
-    while not validate_params(params):
-        params = fill_in_params(params)
+        run_stream(
+            params,
+            params["state_dir"]
+            or os.path.join(one_dir_up_from_this_file, "state", "overspeed"),
+        )
+        return
+
+    params = complete_params(params)
+
+    # every stage of the run is recorded in the run report written with the output
+    reset_run_report()
+    profiler = start_profiler(params["profile"])
+
+    if params["inject_types"] is not None:
+        # the injected data keeps every column, for any rule to be run on it
+        params["anomaly_type"] = None
+
+    # a single sketch threshold is estimated from the speeds of each month or
+    # chunk as it is loaded, and not from the combined data
+    speed_sketch = None
+    if (
+        params["inject_types"] is None
+        and params["anomaly_type"] == "overspeed"
+        and params["threshold_method"] == "sketch"
+        and not params["group_by"]
+    ):
+        speed_sketch = QuantileSketch(params["sketch_accuracy"])
 
     print("\nParameter specifications are complete. Loading filtered AIS data... \n")
-    ais_data = load_and_filter_data(params)
+    ais_data = load_and_filter_data_with_cache(params, speed_sketch)
 
     print("AIS data loaded and filtered successfully. \n")
 
-    if params["anomaly_type"] == "overspeed":
+    if params["inject_types"] is not None:
+        from anomaly_generation.anomaly_injection import FLAG_COLUMNS, inject_anomalies
+
+        print("Injecting synthetic anomalies... \n")
+        processed_data, injection_labels = inject_anomalies(
+            ais_data,
+            params["inject_types"],
+            params["inject_fraction"],
+            params["seed"],
+            params["workers"],
+        )
+        report_memory("anomaly injection", processed_data)
+
+        current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+        output_path = os.path.join(one_dir_up_from_this_file, "output")
+        os.makedirs(output_path, exist_ok=True)
+
+        labels_path = os.path.join(output_path, f"injected_labels_{current_date}.csv")
+        injection_labels.to_csv(labels_path, index=False)
+
+        path = write_output(
+            processed_data,
+            os.path.join(output_path, f"injected_{current_date}"),
+            params,
+            flag_columns=[FLAG_COLUMNS[kind] for kind in params["inject_types"]],
+            index=True,
+        )
+
+        print(
+            f"Successfully saved data (with {len(injection_labels)} injected trajectories flagged) "
+            f"to {path} and the label of each injected trajectory to {labels_path}."
+        )
+
+    elif params["anomaly_type"] == "overspeed":
+        from anomaly_rules.anomaly_rule_overspeeding import (
+            overspeeding,
+            overspeeding_by_group,
+        )
 
         print("Calculating speed threshold... \n")
-        processed_data = overspeeding(params, ais_data)
+        threshold_table = None
+        if params["group_by"]:
+            processed_data, threshold_table = overspeeding_by_group(params, ais_data)
+        else:
+            processed_data = overspeeding(params, ais_data, speed_sketch)
+        report_memory("overspeeding", processed_data)
 
         current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
 
         output_path = os.path.join(one_dir_up_from_this_file, "output")
         os.makedirs(output_path, exist_ok=True)
 
-        path = os.path.join(output_path, f"overspeed_detection_{current_date}.csv")
-        # then save processed to a csv in an output dir
-        processed_data.to_csv(path, index=False)
+        if threshold_table is not None:
+            threshold_path = os.path.join(
+                output_path, f"overspeed_thresholds_{current_date}.csv"
+            )
+            threshold_table.to_csv(threshold_path, index=False)
+            print(f"Saved the speed threshold of each group to {threshold_path}.")
+
+        # HST is only derived for the rows that made it through filtering,
+        # one output batch at a time
+        path = write_output(
+            processed_data,
+            os.path.join(output_path, f"overspeed_detection_{current_date}"),
+            params,
+            flag_columns=["overspeed_flag"],
+        )
 
         # We have determined through trial-and-error that datasets
         # smaller than 50,000 are somewhat unreliable in their calculated results.
@@ -69,12 +226,81 @@ def main():
         )
 
     elif params["anomaly_type"] == "speed abnormality":
+        from anomaly_rules.anomaly_rule_speed_abnormality import speed_abnormality
+
+        print("Detecting speed abnormalities... \n")
+        processed_data, trajectory_labels = speed_abnormality(params, ais_data)
+        report_memory("speed abnormality", processed_data)
+
+        current_date = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+
+        output_path = os.path.join(one_dir_up_from_this_file, "output")
+        os.makedirs(output_path, exist_ok=True)
+
+        labels_path = os.path.join(
+            output_path, f"speed_abnormality_trajectories_{current_date}.csv"
+        )
+        trajectory_labels.to_csv(labels_path, index=False)
+
+        path = write_output(
+            processed_data,
+            os.path.join(output_path, f"speed_abnormality_detection_{current_date}"),
+            params,
+            flag_columns=["speed_abnormality_flag"],
+            index=True,
+        )
+
         print(
-            "Speed abnormality functionality still in production. Please reach out to developers."
+            f"Successfully saved data (with all speed abnormality points flagged) to {path} "
+            f"and the label of each trajectory to {labels_path}."
         )
 
     # other anomaly type cases will be run here
 
+    if params["inject_types"] is not None:
+        report_prefix = "injected"
+    elif params["anomaly_type"] == "overspeed":
+        report_prefix = "overspeed"
+    else:
+        report_prefix = "speed_abnormality"
+    stop_profiler(
+        params["profile"],
+        profiler,
+        os.path.join(output_path, f"{report_prefix}_profile_{current_date}"),
+    )
+    report_path = run_report().write(
+        os.path.join(output_path, f"{report_prefix}_run_report_{current_date}.json"),
+        params,
+    )
+    print(
+        f"INFO: Saved the run report (time, rows and memory per stage) to {report_path}."
+    )
+
+
+def configure_logging(params):
+    """
+    Sets up the log messages of the library modules: warnings and errors by
+    default, info with -v, on stderr or appended to params["log_file"].
+    """
+    logging.basicConfig(
+        level=logging.INFO if params["verbosity"] >= 1 else logging.WARNING,
+        format="%(asctime)s - %(levelname)s - %(message)s",
+        filename=params["log_file"],
+        filemode="a",
+    )
+
+
+def complete_params(params):
+    """Prompts for the missing params until they are all valid."""
+    params = fill_in_params(params)  # first pass
+
+    # the way this is set up, they will not be kicked out and have to rerun main, no matter how many times they give incorrect input
+    # the errors will just be a notification, they will be looped back to try again
+    while not validate_params(params):
+        params = fill_in_params(params)
+
+    return params
+
 
 def fill_in_params(params):
     global PASS
@@ -189,8 +415,7 @@ def validate_params(params):
     # needs to be an anomaly type that we support
     if params["anomaly_type"] not in [
         "overspeed",
-        # speed abnormality not completed
-        # "speed abnormality",
+        "speed abnormality",
     ]:
         print(
             "PARAM ERROR: Anomaly Type ~ Please choose from the allowed anomaly rule/generation types"
@@ -212,39 +437,21 @@ def validate_params(params):
     # if a user wants to select their own file, they need to set Hawaii_GT to False
     if params["Hawaii_GT"] == False:
         try:
-            # try to read the file they asked for as a csv
+            # try to read the header of the file they asked for as a csv
             file_name = params["AIS_file_name"]
             file_path = os.path.join(
                 one_dir_up_from_this_file, "data", f"{file_name}.csv"
             )
-            pd.read_csv(file_path)
+            read_header(file_path)
 
         except Exception as e:
             params["AIS_file_name"] = None
             print(
                 f"Cannot find specified file. Make sure file exists and you are entering the name correctly. {e}"
             )
+            return False
 
-    valid_vessel_classes = [
-        "cargo",
-        "diving",
-        "fishing",
-        "industrial vessel",
-        "military",
-        "offshore supply vessel",
-        "oil recovery",
-        "other",
-        "passenger",
-        "pilot vessel",
-        "pleasure craft/sailing",
-        "port tender",
-        "public vessel, unclassified",
-        "research vessel",
-        "school ship",
-        "search and rescue vessel",
-        "tanker",
-        "tug tow",
-    ]
+    valid_vessel_classes = VESSEL_CLASSES
     # make sure it's a vessel class that we know is valid
     if not any(vessel in valid_vessel_classes for vessel in params["vessel_class"]):
         print(f"PARAM ERROR: Vessel class ~ Please choose from {valid_vessel_classes}.")
@@ -271,17 +478,155 @@ def validate_params(params):
         print("PARAM ERROR: Hour constraint ~ please insert a valid hour")
         return False
 
+    bbox = params["bbox"]
+    if bbox is not None and not (
+        len(bbox) == 4
+        and -180 <= bbox[0] < bbox[2] <= 180
+        and -90 <= bbox[1] < bbox[3] <= 90
+    ):
+        print(
+            "PARAM ERROR: Bounding box ~ please insert min_lon min_lat max_lon max_lat in degrees, each minimum below its maximum. Continuing without a bounding box."
+        )
+        params["bbox"] = None
+        return False
+
+    if params["region_file"] is not None:
+        try:
+            load_region(params["region_file"])
+        except Exception as e:
+            print(
+                f"PARAM ERROR: Region ~ could not read polygons from {params['region_file']}. Continuing without a region. {e}"
+            )
+            params["region_file"] = None
+            return False
+
+    if not (isinstance(params["workers"], int) and params["workers"] >= 1):
+        print("PARAM ERROR: Workers ~ please specify at least 1 worker process.")
+        params["workers"] = 1
+        return False
+
+    if not 0 < params["sketch_accuracy"] < 1:
+        print("PARAM ERROR: Sketch accuracy ~ please insert a value between 0 and 1.")
+        params["sketch_accuracy"] = 0.001
+        return False
+
+    bins = params["length_bins"]
+    if len(bins) < 2 or any(low >= high for low, high in zip(bins, bins[1:])):
+        print(
+            "PARAM ERROR: Length bins ~ please insert at least two increasing bin edges."
+        )
+        params["length_bins"] = [0, 25, 50, 100, 200, 400]
+        return False
+
+    if params["output_format"] != "csv" and not pyarrow_available():
+        print(
+            f"PARAM ERROR: Output format ~ {params['output_format']} output requires pyarrow. Continuing with CSV output."
+        )
+        params["output_format"] = "csv"
+        params["output_compression"] = None
+        return False
+
+    compressions = COMPRESSIONS[params["output_format"]]
+    if params["output_compression"] not in [None, *compressions]:
+        print(
+            f"PARAM ERROR: Output compression ~ please choose from {[c for c in compressions if c]} for {params['output_format']} output."
+        )
+        params["output_compression"] = None
+        return False
+
+    if params["cache_max_mb"] <= 0:
+        print("PARAM ERROR: Cache size ~ please specify a positive number of MB.")
+        params["cache_max_mb"] = DEFAULT_MAX_CACHE_MB
+        return False
+
+    if params["memory_budget_mb"] is not None and params["memory_budget_mb"] <= 0:
+        print("PARAM ERROR: Memory budget ~ please specify a positive number of MB.")
+        params["memory_budget_mb"] = None
+        return False
+
+    if not 0 < params["inject_fraction"] <= 1:
+        print(
+            "PARAM ERROR: Injection fraction ~ please insert a value above 0 and at most 1."
+        )
+        params["inject_fraction"] = DEFAULT_INJECT_FRACTION
+        return False
+
     # checks to make sure the length is a non-negative, reasonable range
-    if not all(1 <= x <= 400 for x in params["length_range"]):
+    min_length, max_length = LENGTH_LIMITS_M
+    if not all(min_length <= x <= max_length for x in params["length_range"]):
         print(
-            "PARAM ERROR: Length range ~ please insert a valid length range (between 1 and 400)."
+            f"PARAM ERROR: Length range ~ please insert a valid length range (between {min_length} and {max_length})."
         )
         return False
 
     return True
 
 
-def load_and_filter_data(params):
+def load_and_filter_data_with_cache(params, speed_sketch=None):
+    """
+    load_and_filter_data, served from the result cache when a run with the
+    same filters over the same (unchanged) source files already stored its
+    output, and stored there otherwise, when params["use_result_cache"] is
+    set (--cache). Either way speed_sketch ends up holding the valid speeds
+    of the returned data.
+    """
+    if not params["use_result_cache"]:
+        return load_and_filter_data(params, speed_sketch)
+
+    cache_dir = params["cache_dir"] or os.path.join(one_dir_up_from_this_file, "cache")
+    key = filter_key(params, source_files(params))
+
+    with stage("load_result_cache") as timer:
+        data = load_cached_result(cache_dir, key)
+        timer.rows_out = None if data is None else len(data)
+    if data is not None:
+        print(f"INFO: Loaded the filtered data from the result cache ({key[:12]}).")
+        report_memory("load_and_filter_data", data)
+        if speed_sketch is not None:
+            from anomaly_rules.anomaly_rule_overspeeding import add_valid_speeds
+
+            add_valid_speeds(speed_sketch, data)
+        return data
+
+    data = load_and_filter_data(params, speed_sketch)
+    store_result(cache_dir, key, data, params["cache_max_mb"])
+    print(f"INFO: Stored the filtered data in the result cache ({key[:12]}).")
+
+    return data
+
+
+def source_files(params):
+    """Every file the output of load_and_filter_data is derived from."""
+    data_dir = os.path.join(one_dir_up_from_this_file, "data")
+    files = []
+
+    if params["Hawaii_GT"] is True:
+        for date in pd.date_range(
+            start=params["timeframe"]["start"],
+            end=params["timeframe"]["end"],
+            freq="MS",
+        ):
+            file_stem = f"Hawaii_{date.year}_{date.month:02d}"
+            files.append(os.path.join(data_dir, f"{file_stem}.csv"))
+            # months may be read from the columnar cache alone
+            files.append(
+                os.path.join(cache_dir_for(data_dir, file_stem), COMPLETE_MARKER)
+            )
+    else:
+        files.append(os.path.join(data_dir, f"{params['AIS_file_name']}.csv"))
+
+    if params["region_file"] is not None:
+        files.append(params["region_file"])
+
+    return files
+
+
+def load_and_filter_data(params, speed_sketch=None):
+    """
+    Loads and filters the Hawaii GT months or the custom file of params.
+    When speed_sketch is given, the valid speeds of every month or chunk are
+    added to it as it is filtered, by the worker process that loads it.
+    """
 
     try:
         if params["Hawaii_GT"] is True:
@@ -291,34 +636,28 @@ def load_and_filter_data(params):
 
             # generate the list of month-year combinations
             date_range = pd.date_range(start=start_date, end=end_date, freq="MS")
+            date_range = prune_months_with_manifest(params, date_range)
 
-            data_frames = []
-
-            for date in date_range:
-                file_name = f"Hawaii_{date.year}_{date.month:02d}.csv"
-                file_path = os.path.join(
-                    one_dir_up_from_this_file, "data", f"{file_name}"
-                )
-                print(f"INFO: Loading file {file_path}...")
-
-                # each month is filtered before being concatenated to final dataframe
-                current_month = pd.read_csv(file_path)
-                current_month["datetime_utc"] = pd.to_datetime(
-                    current_month["datetime_utc"]
-                )
-                current_month["datetime_hst"] = pd.to_datetime(
-                    current_month["datetime_hst"]
+            if params["workers"] > 1:
+                data_frames = load_and_filter_months_in_parallel(
+                    params, date_range, speed_sketch
                 )
+            else:
+                data_frames = []
 
-                current_month_filtered = filter_ais_data(params, current_month)
+                for date in date_range:
+                    current_month_filtered = load_and_filter_month(
+                        params, date, speed_sketch
+                    )
 
-                data_frames.append(current_month_filtered)
+                    data_frames.append(current_month_filtered)
 
             if not data_frames or all(df is None for df in data_frames):
                 raise ValueError(
                     "No data could be gathered given your specified parameters. Please adjust and try again."
                 )
-            data = pd.concat(data_frames)
+            # months with different class labels concatenate to object dtype
+            data = apply_ais_schema(pd.concat(data_frames))
 
         else:
             file_name = params["AIS_file_name"]
@@ -326,14 +665,32 @@ def load_and_filter_data(params):
                 one_dir_up_from_this_file, "data", f"{file_name}.csv"
             )
 
-            data = pd.read_csv(file_path)
+            data_dir = os.path.join(one_dir_up_from_this_file, "data")
+            entry = manifest_entry(
+                data_dir, f"{file_name}.csv", build=params["build_manifest"]
+            )
+            if entry is None:
+                data = read_and_filter_in_chunks(
+                    params, file_path, speed_sketch=speed_sketch
+                )
+            elif zone_can_match(entry, params):
+                runs = matching_zone_runs(entry, params)
+                data = read_and_filter_in_chunks(
+                    params, file_path, runs=runs, speed_sketch=speed_sketch
+                )
+            else:
+                print(
+                    f"INFO: Skipping {file_name}.csv; the data manifest shows no rows can match the filters."
+                )
+                data = None
 
-            data["datetime_utc"] = pd.to_datetime(data["datetime_utc"])
-            data["datetime_hst"] = pd.to_datetime(data["datetime_hst"])
-            # filter before returning
-            filter_ais_data(params, data)
+            if data is None:
+                raise ValueError(
+                    "No data could be gathered given your specified parameters. Please adjust and try again."
+                )
 
         data.set_index("MMSI", inplace=True)
+        report_memory("load_and_filter_data", data)
 
         return data
 
@@ -344,6 +701,158 @@ def load_and_filter_data(params):
         raise
 
 
+def load_and_filter_month(params, date, speed_sketch=None):
+    """
+    Loads and filters a single Hawaii_GT month. Uses the columnar cache (with
+    the filters pushed down into the read) when one exists, and falls back on
+    the CSV otherwise. The month's valid speeds are added to speed_sketch,
+    if given.
+    """
+    data_dir = os.path.join(one_dir_up_from_this_file, "data")
+    file_stem = f"Hawaii_{date.year}_{date.month:02d}"
+
+    if params["build_vessel_index"] and not is_indexed(data_dir, file_stem):
+        print(f"INFO: Building the vessel index of {file_stem}.csv...")
+        build_vessel_index(data_dir, file_stem)
+
+    use_cache = pyarrow_available()
+    if use_cache and params["build_cache"] and not is_cached(data_dir, file_stem):
+        print(f"INFO: Converting {file_stem}.csv to the columnar cache...")
+        convert_csv_to_parquet(data_dir, file_stem)
+
+    if use_cache and is_cached(data_dir, file_stem):
+        print(f"INFO: Loading {file_stem} from the columnar cache...")
+        with stage("load") as timer:
+            current_month = read_cached_month(data_dir, file_stem, params)
+            timer.rows_out = len(current_month)
+    else:
+        file_path = os.path.join(data_dir, f"{file_stem}.csv")
+        entry = manifest_entry(data_dir, f"{file_stem}.csv")
+        derived_columns = missing_derived_columns(
+            read_header(file_path), params["anomaly_type"]
+        )
+        if derived_columns:
+            print(
+                f"INFO: Deriving the missing columns ({', '.join(derived_columns)}) of {file_stem}.csv from its positions and times."
+            )
+            # every report is read, as each is measured from its vessel's previous one
+            entry = None
+
+        if entry is None:
+            print(f"INFO: Loading file {file_path}...")
+            with stage("load") as timer:
+                current_month = read_ais_csv(file_path, params["anomaly_type"])
+                timer.rows_out = len(current_month)
+        else:
+            # only the zones of the file that can match are read
+            runs = matching_zone_runs(entry, params)
+            print(
+                f"INFO: Loading {sum(rows for _, rows in runs)} of {entry['rows']} rows of {file_path}..."
+            )
+            if not runs:
+                return None
+            with stage("load") as timer:
+                current_month = pd.concat(
+                    read_zone_runs(file_path, runs, params["anomaly_type"]),
+                    ignore_index=True,
+                )
+                timer.rows_out = len(current_month)
+        parse_timestamps(current_month)
+        apply_ais_schema(current_month)
+        if derived_columns:
+            with stage("derive_speeds", rows_in=len(current_month)) as timer:
+                derive_speeds(current_month, derived_columns)
+                timer.rows_out = len(current_month)
+
+    report_memory(f"loading {file_stem}", current_month)
+
+    # each month is filtered before being concatenated to final dataframe
+    current_month_filtered = filter_ais_data(params, current_month)
+    report_memory(f"filtering {file_stem}", current_month_filtered)
+
+    if speed_sketch is not None and current_month_filtered is not None:
+        from anomaly_rules.anomaly_rule_overspeeding import add_valid_speeds
+
+        add_valid_speeds(speed_sketch, current_month_filtered)
+
+    return current_month_filtered
+
+
+def load_and_filter_month_with_stages(params, date, sketch_speeds=False):
+    """
+    load_and_filter_month in a worker process, returning its filtered month,
+    the stages it recorded, for the parent to merge into its run report, and
+    (if sketch_speeds) the sketch of its valid speeds, for the parent to
+    merge into the run's sketch.
+    """
+    reset_run_report()
+    speed_sketch = QuantileSketch(params["sketch_accuracy"]) if sketch_speeds else None
+    month = load_and_filter_month(params, date, speed_sketch)
+    return month, run_report().stages, speed_sketch
+
+
+def prune_months_with_manifest(params, date_range):
+    """
+    Drops the months whose data manifest entry shows that none of their
+    rows can pass the filters. Entries are built first if
+    params["build_manifest"] is set; months without an entry are kept.
+    """
+    data_dir = os.path.join(one_dir_up_from_this_file, "data")
+    kept_dates = []
+
+    for date in date_range:
+        file_name = f"Hawaii_{date.year}_{date.month:02d}.csv"
+        entry = manifest_entry(data_dir, file_name, build=params["build_manifest"])
+        if entry is not None and not zone_can_match(entry, params):
+            print(
+                f"INFO: Skipping {file_name}; the data manifest shows no rows can match the filters."
+            )
+            continue
+        kept_dates.append(date)
+
+    return kept_dates
+
+
+def load_and_filter_months_in_parallel(params, date_range, speed_sketch=None):
+    """
+    Runs load_and_filter_month for every month on a pool of params["workers"]
+    processes. Each worker only sends back its filtered month (the stages it
+    recorded and, with speed_sketch, the sketch of the month's speeds, which
+    is merged into speed_sketch), and the results are returned in date order
+    regardless of which worker finishes first.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    data_frames = []
+
+    with ProcessPoolExecutor(max_workers=params["workers"]) as executor:
+        futures = [
+            executor.submit(
+                load_and_filter_month_with_stages,
+                params,
+                date,
+                speed_sketch is not None,
+            )
+            for date in date_range
+        ]
+
+        for date, future in zip(date_range, futures):
+            try:
+                month, stages, month_sketch = future.result()
+                data_frames.append(month)
+                run_report().merge(stages)
+                if speed_sketch is not None:
+                    speed_sketch.merge(month_sketch)
+            except Exception as e:
+                for pending in futures:
+                    pending.cancel()
+                raise RuntimeError(
+                    f"Loading Hawaii_{date.year}_{date.month:02d}.csv failed in a worker process: {e}"
+                ) from e
+
+    return data_frames
+
+
 if __name__ == "__main__":
 
     main()
@@ -11,6 +11,16 @@ import argparse
 import pandas as pd
 from datetime import datetime
 
+from common.ais_schema import VESSEL_CLASSES
+from common.result_cache import DEFAULT_MAX_CACHE_MB
+from common.output_writers import OUTPUT_FORMATS, PARTITION_COLUMNS
+from common.instrumentation import PROFILE_KINDS
+
+# Messages the streaming mode buffers before it slows down or drops its source
+DEFAULT_QUEUE_SIZE = 10_000
+# Share of the trajectories --inject injects an anomaly into
+DEFAULT_INJECT_FRACTION = 0.05
+
 
 class ParamsBuilder:
     def __init__(self):
@@ -30,6 +40,37 @@ class ParamsBuilder:
                 "start": None,
                 "end": None,
             },
+            "bbox": None,
+            "region_file": None,
+            "build_cache": False,
+            "build_vessel_index": False,
+            "build_manifest": False,
+            "use_result_cache": False,
+            "cache_dir": None,
+            "cache_max_mb": DEFAULT_MAX_CACHE_MB,
+            "workers": 1,
+            "memory_budget_mb": None,
+            "threshold_method": "exact",
+            "sketch_accuracy": 0.001,
+            "group_by": None,
+            "sweep_file": None,
+            "incremental_file": None,
+            "state_dir": None,
+            "stream_source": None,
+            "speed_threshold": None,
+            "alerts_file": None,
+            "queue_size": DEFAULT_QUEUE_SIZE,
+            "output_format": "csv",
+            "output_partition": None,
+            "output_compression": None,
+            "flags_only": False,
+            "verbosity": 0,
+            "profile": None,
+            "log_file": None,
+            "length_bins": [0, 25, 50, 100, 200, 400],
+            "inject_types": None,
+            "inject_fraction": DEFAULT_INJECT_FRACTION,
+            "seed": 0,
         }
 
     def update_params(self, args):
@@ -68,6 +109,104 @@ class ParamsBuilder:
                 args.hour_end, "%H:%M"
             ).time()
 
+        if args.bbox is not None:
+            self.params["bbox"] = args.bbox
+
+        if args.region is not None:
+            self.params["region_file"] = args.region
+
+        if args.build_cache:
+            self.params["build_cache"] = True
+
+        if args.build_vessel_index:
+            self.params["build_vessel_index"] = True
+
+        if args.build_manifest:
+            self.params["build_manifest"] = True
+
+        if args.cache:
+            self.params["use_result_cache"] = True
+
+        if args.no_cache:
+            self.params["use_result_cache"] = False
+
+        if args.cache_dir is not None:
+            self.params["cache_dir"] = args.cache_dir
+
+        if args.cache_max_mb is not None:
+            self.params["cache_max_mb"] = args.cache_max_mb
+
+        if args.workers is not None:
+            self.params["workers"] = args.workers
+
+        if args.memory_budget is not None:
+            self.params["memory_budget_mb"] = args.memory_budget
+
+        if args.threshold_method is not None:
+            self.params["threshold_method"] = args.threshold_method
+
+        if args.sketch_accuracy is not None:
+            self.params["sketch_accuracy"] = args.sketch_accuracy
+
+        if args.group_by is not None:
+            self.params["group_by"] = args.group_by
+
+        if args.sweep is not None:
+            self.params["sweep_file"] = args.sweep
+
+        if args.incremental is not None:
+            self.params["incremental_file"] = args.incremental
+
+        if args.state_dir is not None:
+            self.params["state_dir"] = args.state_dir
+
+        if args.stream is not None:
+            self.params["stream_source"] = args.stream
+
+        if args.speed_threshold is not None:
+            self.params["speed_threshold"] = args.speed_threshold
+
+        if args.alerts is not None:
+            self.params["alerts_file"] = args.alerts
+
+        if args.queue_size is not None:
+            self.params["queue_size"] = args.queue_size
+
+        if args.output_format is not None:
+            self.params["output_format"] = args.output_format
+
+        if args.partition_by is not None:
+            self.params["output_partition"] = args.partition_by
+
+        if args.compression is not None:
+            self.params["output_compression"] = args.compression
+
+        if args.flags_only:
+            self.params["flags_only"] = True
+
+        if args.verbose:
+            self.params["verbosity"] = args.verbose
+
+        if args.profile is not None:
+            self.params["profile"] = args.profile
+
+        if args.log_file is not None:
+            self.params["log_file"] = args.log_file
+
+        if args.length_bins is not None:
+            self.params["length_bins"] = [
+                float(edge) for edge in args.length_bins.split(",")
+            ]
+
+        if args.inject is not None:
+            self.params["inject_types"] = args.inject
+
+        if args.inject_fraction is not None:
+            self.params["inject_fraction"] = args.inject_fraction
+
+        if args.seed is not None:
+            self.params["seed"] = args.seed
+
 
 class ArgParser:
     def __init__(self):
@@ -80,7 +219,7 @@ class ArgParser:
 
         self.parser.add_argument(
             "--anomaly_type",
-            choices=["overspeed"],
+            choices=["overspeed", "speed abnormality"],
             help="Type of anomaly to detect (choose one).",
         )
 
@@ -100,26 +239,7 @@ class ArgParser:
             "--vessel_class",
             type=str,
             nargs="+",  # Allows multiple inputs
-            choices=[
-                "cargo",
-                "diving",
-                "fishing",
-                "industrial vessel",
-                "military",
-                "offshore supply vessel",
-                "oil recovery",
-                "other",
-                "passenger",
-                "pilot vessel",
-                "pleasure craft/sailing",
-                "port tender",
-                "public vessel, unclassified",
-                "research vessel",
-                "school ship",
-                "search and rescue vessel",
-                "tanker",
-                "tug tow",
-            ],
+            choices=VESSEL_CLASSES,
             help="Vessel classes (multiple allowed).",
         )
 
@@ -154,5 +274,207 @@ class ArgParser:
             help="End of hour constraints (24 hour timekeeping - HH:MM, no AM/PM)",
         )
 
+        self.parser.add_argument(
+            "--bbox",
+            nargs=4,
+            type=float,
+            metavar=("MIN_LON", "MIN_LAT", "MAX_LON", "MAX_LAT"),
+            help="Keep only points inside the box (degrees), e.g., -158.3 21.2 -157.6 21.7.",
+        )
+
+        self.parser.add_argument(
+            "--region",
+            type=str,
+            help="Keep only points inside the polygons of a GeoJSON file, shapefile or other file readable by geopandas.",
+        )
+
+        self.parser.add_argument(
+            "--build_cache",
+            action="store_true",
+            help="Convert the Hawaii GT month files to the columnar (Parquet) cache before loading (requires pyarrow).",
+        )
+
+        self.parser.add_argument(
+            "--build_vessel_index",
+            action="store_true",
+            help="Build the on-disk MMSI/time index of each Hawaii GT month file used for fast vessel lookups.",
+        )
+
+        self.parser.add_argument(
+            "--build_manifest",
+            action="store_true",
+            help="Record per-file zone maps (time, class, length and position ranges) in data/manifest.json so files and parts of files that cannot match the filters are skipped.",
+        )
+
+        self.parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Reuse the filtered data of an earlier run with the same filters from the result cache, and store this run's there. The cache holds pickles: only use a cache directory you trust.",
+        )
+
+        self.parser.add_argument(
+            "--no_cache",
+            "--no-cache",
+            action="store_true",
+            help="Do not use the result cache (the default); overrides --cache.",
+        )
+
+        self.parser.add_argument(
+            "--cache_dir",
+            "--cache-dir",
+            type=str,
+            help="Directory of the filtered-data result cache. Default is cache/ in the repository root.",
+        )
+
+        self.parser.add_argument(
+            "--cache_max_mb",
+            type=float,
+            help=f"Size cap (in MB) of the result cache; the least recently used entries are evicted. Default is {DEFAULT_MAX_CACHE_MB}.",
+        )
+
+        self.parser.add_argument(
+            "--workers",
+            type=int,
+            help="Number of processes used to load and filter Hawaii GT months in parallel. Default is 1.",
+        )
+
+        self.parser.add_argument(
+            "--memory_budget",
+            "--memory-budget",
+            type=float,
+            help="Approximate memory (in MB) a chunk of a custom AIS file may use while it is streamed and filtered; sets the chunk size.",
+        )
+
+        self.parser.add_argument(
+            "--threshold_method",
+            choices=["exact", "sketch"],
+            help="Compute the speed threshold exactly or estimate it with a mergeable quantile sketch. Default is exact.",
+        )
+
+        self.parser.add_argument(
+            "--sketch_accuracy",
+            type=float,
+            help="Relative accuracy of the quantile sketch (between 0 and 1). Default is 0.001.",
+        )
+
+        self.parser.add_argument(
+            "--group_by",
+            type=str,
+            nargs="+",
+            choices=["vessel_class", "length", "month"],
+            help="Compute a separate speed threshold for each group (multiple allowed).",
+        )
+
+        self.parser.add_argument(
+            "--length_bins",
+            type=str,
+            help="Comma-separated length bin edges in meters for --group_by length, e.g., 0,25,50,100,200,400.",
+        )
+
+        self.parser.add_argument(
+            "--sweep",
+            type=str,
+            help="Run the overspeed jobs (percentiles and vessel class/length subsets) of a JSON or YAML job file over one loaded dataset.",
+        )
+
+        self.parser.add_argument(
+            "--incremental",
+            type=str,
+            help="Add one new AIS file (name without extension, in data/) to the saved overspeed threshold state, flag its points and report the historical flags that flipped.",
+        )
+
+        self.parser.add_argument(
+            "--state_dir",
+            type=str,
+            help="Directory of the threshold state used by --incremental. Default is state/overspeed.",
+        )
+
+        self.parser.add_argument(
+            "--stream",
+            type=str,
+            help="Detect anomalies in a live AIS feed: - (stdin), tail:PATH, tcp://HOST:PORT or udp://HOST:PORT. Alerts are written as JSON lines.",
+        )
+
+        self.parser.add_argument(
+            "--speed_threshold",
+            type=float,
+            help="Overspeed threshold in knots for --stream. Default is the thresholds of the --incremental state.",
+        )
+
+        self.parser.add_argument(
+            "--alerts",
+            type=str,
+            help="File the --stream alerts are appended to. Default is stdout.",
+        )
+
+        self.parser.add_argument(
+            "--queue_size",
+            type=int,
+            help=f"Messages --stream buffers before it slows down (or, for UDP, drops from) the source. Default is {DEFAULT_QUEUE_SIZE}.",
+        )
+
+        self.parser.add_argument(
+            "--output_format",
+            choices=OUTPUT_FORMATS,
+            help="Format of the flagged output (Parquet and Feather require pyarrow). Default is csv.",
+        )
+
+        self.parser.add_argument(
+            "--partition_by",
+            choices=PARTITION_COLUMNS,
+            help="Write the flagged output as a directory with one file per month or vessel class.",
+        )
+
+        self.parser.add_argument(
+            "--compression",
+            type=str,
+            help="Output compression: gzip, bz2 or xz for csv; snappy (default), zstd, gzip, lz4, brotli or none for parquet; lz4 (default), zstd or none for feather.",
+        )
+
+        self.parser.add_argument(
+            "--flags_only",
+            action="store_true",
+            help="Write only the flagged rows and their key columns (MMSI, time, position, vessel class, speed, flag).",
+        )
+
+        self.parser.add_argument(
+            "-v",
+            "--verbose",
+            action="count",
+            default=0,
+            help="Print more detail; -v logs INFO messages, -vv also prints the DEBUG dumps of the filtered and flagged data.",
+        )
+
+        self.parser.add_argument(
+            "--profile",
+            choices=PROFILE_KINDS,
+            help="Profile the run with cProfile (cpu) or tracemalloc (memory) and save the profile next to the output.",
+        )
+
+        self.parser.add_argument(
+            "--log_file",
+            type=str,
+            help="Append log messages to this file instead of printing them to stderr.",
+        )
+
+        self.parser.add_argument(
+            "--inject",
+            nargs="+",
+            choices=["overspeed", "speed abnormality"],
+            help="Inject synthetic anomalies of these types into the filtered data and save it with ground-truth labels, instead of detecting anomalies.",
+        )
+
+        self.parser.add_argument(
+            "--inject_fraction",
+            type=float,
+            help=f"Share of the trajectories --inject injects an anomaly into. Default is {DEFAULT_INJECT_FRACTION}.",
+        )
+
+        self.parser.add_argument(
+            "--seed",
+            type=int,
+            help="Random seed of --inject. Default is 0.",
+        )
+
     def parse(self):
         return self.parser.parse_args()
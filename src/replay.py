@@ -0,0 +1,189 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+"""
+Replays an AIS CSV as a live feed for the streaming mode of main.py, in
+datetime_utc order and --speedup times faster than real time, e.g.:
+
+    python src/replay.py data/Hawaii_2017_01.csv --speedup 3600 | python src/main.py --stream -
+    python src/replay.py data/Hawaii_2017_01.csv --speedup 0 --to tcp://127.0.0.1:9999
+"""
+
+import argparse
+import asyncio
+import csv
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from common.timestamps import parse_datetime_utc
+from streaming import parse_endpoint
+
+# Lines packed into one UDP datagram stay below a typical MTU
+MAX_DATAGRAM_BYTES = 1400
+# Sleeps shorter than this are skipped; the next lines are sent late instead
+MIN_SLEEP_S = 0.001
+
+
+def load_replay_lines(file_path, limit=None):
+    """The header and the data lines of file_path in datetime_utc order, with their epoch ns."""
+    with open(file_path, newline="") as f:
+        # the raw text of the record csv.reader has just parsed, which may
+        # span lines when a field is quoted
+        record_lines = []
+
+        def read_lines():
+            for line in f:
+                record_lines.append(line)
+                yield line
+
+        reader = csv.reader(read_lines())
+        column = next(reader).index("datetime_utc")
+        header = "".join(record_lines)
+        record_lines.clear()
+        lines, times = [], []
+        for row in reader:
+            line = "".join(record_lines)
+            record_lines.clear()
+            # pd.read_csv skips blank lines too
+            if not row:
+                continue
+            lines.append(line if line.endswith("\n") else line + "\n")
+            times.append(row[column] or None)
+
+    times_ns = parse_datetime_utc(pd.Series(times, dtype=object))
+    times_ns = np.asarray(times_ns.dt.tz_convert(None), dtype="datetime64[ns]").view(
+        np.int64
+    )
+    order = np.argsort(times_ns, kind="stable")
+    if limit is not None:
+        order = order[:limit]
+
+    return header, [lines[i] for i in order], times_ns[order]
+
+
+async def replay(header, lines, times_ns, speedup, send):
+    """
+    Sends the lines through send(line) so that line i leaves
+    (times_ns[i] - times_ns[0]) / speedup seconds after the first; a
+    speedup of 0 sends them as fast as the destination accepts them.
+    Returns the largest delay (s) behind that schedule.
+    """
+    await send(header)
+    started = time.perf_counter()
+    max_lag = 0.0
+    for line, time_ns in zip(lines, times_ns):
+        if speedup > 0:
+            due = (time_ns - times_ns[0]) / 1e9 / speedup
+            ahead = due - (time.perf_counter() - started)
+            if ahead > MIN_SLEEP_S:
+                await asyncio.sleep(ahead)
+            max_lag = max(max_lag, -ahead)
+        await send(line)
+    return max_lag
+
+
+async def replay_to(destination, header, lines, times_ns, speedup):
+    kind, target = parse_endpoint(destination)
+
+    if kind == "stdin":
+        out = sys.stdout
+
+        async def send(line):
+            out.write(line)
+            # a pipe is block buffered: paced lines have to leave on time
+            if speedup > 0:
+                out.flush()
+
+        try:
+            return await replay(header, lines, times_ns, speedup, send)
+        finally:
+            out.flush()
+
+    if kind == "tcp":
+        _, writer = await asyncio.open_connection(*target)
+
+        async def send(line):
+            writer.write(line.encode())
+            # waits while the detector's socket buffer is full (backpressure)
+            await writer.drain()
+
+        try:
+            return await replay(header, lines, times_ns, speedup, send)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    if kind == "udp":
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(
+            asyncio.DatagramProtocol, remote_addr=target
+        )
+        pending = []
+
+        def flush():
+            if pending:
+                transport.sendto("".join(pending).encode())
+                pending.clear()
+
+        async def send(line):
+            if sum(map(len, pending)) + len(line) > MAX_DATAGRAM_BYTES:
+                flush()
+            pending.append(line)
+            # only batch lines that are due together
+            if speedup > 0:
+                flush()
+
+        try:
+            return await replay(header, lines, times_ns, speedup, send)
+        finally:
+            flush()
+            transport.close()
+
+    raise ValueError(f"Cannot replay to {destination}; use -, tcp:// or udp://.")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Replay an AIS CSV as a live feed for main.py --stream."
+    )
+    parser.add_argument("file", help="AIS CSV file to replay.")
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=60.0,
+        help="How many times faster than real time to replay (0 = as fast as possible). Default is 60.",
+    )
+    parser.add_argument(
+        "--to",
+        default="-",
+        help="Destination: - (stdout), tcp://HOST:PORT or udp://HOST:PORT. Default is stdout.",
+    )
+    parser.add_argument("--limit", type=int, help="Replay only the first N messages.")
+    args = parser.parse_args()
+
+    header, lines, times_ns = load_replay_lines(args.file, args.limit)
+    print(f"INFO: Replaying {len(lines)} messages to {args.to}...", file=sys.stderr)
+
+    started = time.perf_counter()
+    max_lag = asyncio.run(replay_to(args.to, header, lines, times_ns, args.speedup))
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"INFO: Replayed {len(lines)} messages in {elapsed:.2f} s "
+        f"({len(lines) / max(elapsed, 1e-9):.0f}/s), at most {max_lag * 1000:.1f} ms "
+        "behind schedule.",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
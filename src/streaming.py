@@ -0,0 +1,587 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import asyncio
+import csv
+import json
+import signal
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from common.filter_trajectories import US_PER_DAY, time_of_day_us
+from common.geodesy import KM_PER_NAUTICAL_MILE, haversine_km
+from common.spatial_index import load_region, points_in_bbox, points_in_region
+from incremental import group_labels, load_state, state_fingerprint
+
+# Column order of the Hawaii GT files, used until a CSV header line arrives
+AIS_FIELDS = [
+    "MMSI",
+    "datetime_utc",
+    "lat",
+    "lon",
+    "speed_over_ground_knots",
+    "vessel_class",
+    "length_m",
+    "status",
+    "comput_speed_knots",
+    "distances_km",
+    "datetime_hst",
+]
+# Messages handled per wake-up of the detector before its alerts are flushed
+MAX_BATCH = 1_000
+# Same gap rule as extract_traj_from_df: a longer gap starts a new segment
+SEP_TIME_NS = pd.Timedelta(30, "m").value
+# Vessels silent for longer than SEP_TIME_NS are forgotten every so many messages
+EVICT_EVERY = 100_000
+READ_HINT_BYTES = 64 * 1024
+TAIL_POLL_S = 0.2
+STATS_INTERVAL_S = 10
+LATENCY_SAMPLES = 100_000
+# Same exclusions as apply_additional_overspeed_filters
+MOORED_STATUSES = (1, 5)
+MAX_SPEED_KNOTS = 65
+
+
+def parse_endpoint(spec):
+    """
+    ("stdin", None), ("tail", path), ("tcp", (host, port)) or
+    ("udp", (host, port)) for "-", "tail:PATH", "tcp://HOST:PORT" or
+    "udp://HOST:PORT".
+    """
+    if spec == "-":
+        return "stdin", None
+    if spec.startswith("tail:"):
+        return "tail", spec[len("tail:") :]
+    for scheme in ("tcp", "udp"):
+        if spec.startswith(f"{scheme}://"):
+            host, _, port = spec[len(scheme) + 3 :].rpartition(":")
+            return scheme, (host or "127.0.0.1", int(port))
+    raise ValueError(
+        f"Unknown stream {spec}; use -, tail:PATH, tcp://HOST:PORT or udp://HOST:PORT."
+    )
+
+
+def load_stream_thresholds(params, state_dir):
+    """
+    {group label: speed threshold} for the overspeed rule: the single
+    params["speed_threshold"] if given, else the thresholds of the
+    incremental state in state_dir (see incremental.py), else None.
+    """
+    if params["speed_threshold"] is not None:
+        return {"all": params["speed_threshold"]}
+
+    metadata, groups = load_state(state_dir)
+    if metadata is None:
+        return None
+    if metadata["fingerprint"] != state_fingerprint(params):
+        raise ValueError(
+            f"The threshold state in {state_dir} was built with different "
+            "filters, percentile, grouping or threshold method. Use another "
+            "--state_dir, the original parameters or --speed_threshold."
+        )
+    return {label: float(group["threshold"]) for label, group in groups.items()}
+
+
+class VesselState:
+    """The last point of a vessel and the start of its current segment."""
+
+    __slots__ = ("time_ns", "lon", "lat", "sog", "segment_start_ns")
+
+    def __init__(self, time_ns, lon, lat, sog, segment_start_ns):
+        self.time_ns = time_ns
+        self.lon = lon
+        self.lat = lat
+        self.sog = sog
+        self.segment_start_ns = segment_start_ns
+
+
+class StreamingDetector:
+    """
+    Evaluates the overspeed and speed abnormality rules on one AIS message
+    at a time, keeping only the last point of each vessel.
+
+    A message is flagged as overspeed when its computed speed (or, without
+    one, the average speed since the vessel's last point) is above its
+    group's threshold, after the exclusions of
+    apply_additional_overspeed_filters. The speed abnormality rule of
+    detect_speed_abnormality flags a vessel's previous point when the
+    average speed from it to the new point is more than twice its speed
+    over ground; points further apart than SEP_TIME_NS are in different
+    segments and are not compared.
+    """
+
+    def __init__(
+        self, params, thresholds=None, rules=("overspeed", "speed abnormality")
+    ):
+        self.params = params
+        self.thresholds = thresholds
+        self.group_by = (
+            None if params["speed_threshold"] is not None else params["group_by"]
+        )
+        self.rules = rules
+        self.fields = AIS_FIELDS
+        self.vessels = {}
+        self.newest_ns = 0
+        self.counts = {
+            "messages": 0,
+            "invalid": 0,
+            "filtered": 0,
+            "late": 0,
+            "overspeed": 0,
+            "speed abnormality": 0,
+        }
+
+        self.region = None
+        if params["region_file"] is not None:
+            self.region = load_region(params["region_file"])
+        hours = params["hour_constraint"]
+        self.hours_us = None
+        if hours["start"] is not None and hours["end"] is not None:
+            self.hours_us = (
+                time_of_day_us(hours["start"]),
+                time_of_day_us(hours["end"]),
+            )
+        self.group_label = lru_cache(maxsize=4096)(self._group_label)
+
+    def process_line(self, line):
+        """Alerts (dicts) raised by one CSV or JSON line; a CSV header only sets the fields."""
+        line = line.strip()
+        if not line:
+            return []
+        if line.startswith("MMSI,"):
+            self.fields = next(csv.reader([line]))
+            return []
+
+        try:
+            record = self.parse_record(line)
+        except (ValueError, KeyError, TypeError):
+            self.counts["invalid"] += 1
+            return []
+        return self.process(record)
+
+    def parse_record(self, line):
+        if line.startswith("{"):
+            record = json.loads(line)
+        else:
+            record = dict(zip(self.fields, next(csv.reader([line]))))
+
+        timestamp = pd.Timestamp(record["datetime_utc"])
+        if timestamp.tz is not None:
+            timestamp = timestamp.tz_convert(None)
+        return {
+            "MMSI": int(record["MMSI"]),
+            "time_ns": timestamp.value,
+            "lat": float(record["lat"]),
+            "lon": float(record["lon"]),
+            "sog": float(record["speed_over_ground_knots"]),
+            "vessel_class": str(record.get("vessel_class", "")).lower().strip(),
+            "length_m": _optional_float(record.get("length_m")),
+            "status": _optional_float(record.get("status")),
+            "computed_speed": _optional_float(record.get("comput_speed_knots")),
+        }
+
+    def process(self, record):
+        self.counts["messages"] += 1
+        if not self.passes_filters(record):
+            self.counts["filtered"] += 1
+            return []
+
+        alerts = []
+        time_ns = record["time_ns"]
+        state = self.vessels.get(record["MMSI"])
+        late = state is not None and time_ns < state.time_ns
+        if late:
+            # out of order for this vessel: only its own speed can be judged
+            self.counts["late"] += 1
+        # the point before this one in the same segment, if any
+        previous = None
+        if state is not None and not late and time_ns - state.time_ns <= SEP_TIME_NS:
+            previous = state
+
+        # measured from the kept point, which need not be the message's own
+        # predecessor in the feed (distances_km) once messages are filtered out
+        distance_km = None
+        hours = None
+        if previous is not None:
+            distance_km = float(
+                haversine_km(previous.lon, previous.lat, record["lon"], record["lat"])
+            )
+            hours = (time_ns - previous.time_ns) / 1e9 / 3600
+        segment_start_ns = time_ns if previous is None else previous.segment_start_ns
+
+        if "speed abnormality" in self.rules and hours:
+            avg_speed = distance_km / hours / KM_PER_NAUTICAL_MILE
+            if avg_speed > 2 * previous.sog:
+                alerts.append(
+                    {
+                        "anomaly": "speed abnormality",
+                        "MMSI": record["MMSI"],
+                        "datetime_utc": _isoformat(previous.time_ns),
+                        "next_datetime_utc": _isoformat(time_ns),
+                        "speed_over_ground_knots": previous.sog,
+                        "avg_speed_knots": avg_speed,
+                        "segment_start": _isoformat(segment_start_ns),
+                    }
+                )
+
+        speed = record["computed_speed"]
+        if speed is None and hours:
+            speed = distance_km / hours / KM_PER_NAUTICAL_MILE
+        if "overspeed" in self.rules and self.thresholds and speed is not None:
+            alert = self.check_overspeed(record, speed)
+            if alert is not None:
+                alert["segment_start"] = _isoformat(segment_start_ns)
+                alerts.append(alert)
+
+        if not late:
+            self.vessels[record["MMSI"]] = VesselState(
+                time_ns, record["lon"], record["lat"], record["sog"], segment_start_ns
+            )
+
+        self.newest_ns = max(self.newest_ns, time_ns)
+        if self.counts["messages"] % EVICT_EVERY == 0:
+            self.evict_idle_vessels()
+
+        for alert in alerts:
+            self.counts[alert["anomaly"]] += 1
+        return alerts
+
+    def check_overspeed(self, record, speed):
+        if record["status"] in MOORED_STATUSES and speed < 0.1:
+            return None
+        if speed > MAX_SPEED_KNOTS:
+            return None
+
+        label = self.group_label(
+            record["vessel_class"],
+            record["length_m"],
+            record["time_ns"] if self.group_by and "month" in self.group_by else None,
+        )
+        threshold = self.thresholds.get(label)
+        if threshold is None or not speed > threshold:
+            return None
+
+        return {
+            "anomaly": "overspeed",
+            "MMSI": record["MMSI"],
+            "datetime_utc": _isoformat(record["time_ns"]),
+            "lat": record["lat"],
+            "lon": record["lon"],
+            "speed_knots": speed,
+            "speed_threshold": float(threshold),
+            "group": label,
+        }
+
+    def _group_label(self, vessel_class, length_m, time_ns):
+        """The incremental state's label of the group a message falls in."""
+        if not self.group_by:
+            return "all"
+        row = pd.DataFrame(
+            {
+                "vessel_class": pd.Series([vessel_class], dtype="category"),
+                "length_m": [np.nan if length_m is None else length_m],
+                "datetime_utc": pd.to_datetime([time_ns or 0], utc=True),
+            }
+        )
+        params = {"group_by": self.group_by, "length_bins": self.params["length_bins"]}
+        return group_labels(row, params)[0]
+
+    def passes_filters(self, record):
+        params = self.params
+        if params["vessel_class"] is not None:
+            if record["vessel_class"] not in params["vessel_class"]:
+                return False
+
+        if params["length_range"] is not None:
+            min_length, max_length = params["length_range"]
+            if (
+                record["length_m"] is None
+                or not min_length <= record["length_m"] <= max_length
+            ):
+                return False
+
+        if self.hours_us is not None:
+            start_us, end_us = self.hours_us
+            time_us = (record["time_ns"] // 1_000) % US_PER_DAY
+            if start_us <= end_us:
+                if not start_us <= time_us <= end_us:
+                    return False
+            # the window wraps past midnight, e.g. 22:00-04:00
+            elif not (time_us >= start_us or time_us <= end_us):
+                return False
+
+        lon, lat = record["lon"], record["lat"]
+        if params["bbox"] is not None and not points_in_bbox(lon, lat, params["bbox"]):
+            return False
+        if (
+            self.region is not None
+            and not points_in_region([lon], [lat], self.region)[0]
+        ):
+            return False
+
+        return True
+
+    def evict_idle_vessels(self):
+        """Forgets vessels whose next message would start a new segment anyway."""
+        cutoff = self.newest_ns - SEP_TIME_NS
+        idle = [mmsi for mmsi, state in self.vessels.items() if state.time_ns < cutoff]
+        for mmsi in idle:
+            del self.vessels[mmsi]
+
+
+class StreamStats:
+    """Throughput and per-message latency (arrival to alert written) of a stream."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.dropped = 0
+        self.latencies_ns = np.zeros(LATENCY_SAMPLES, dtype=np.int64)
+        self.n_latencies = 0
+
+    def record_latency(self, latency_ns):
+        self.latencies_ns[self.n_latencies % LATENCY_SAMPLES] = latency_ns
+        self.n_latencies += 1
+
+    def report(self, counts, queue_depth):
+        elapsed = time.perf_counter() - self.started
+        latencies_ms = self.latencies_ns[: min(self.n_latencies, LATENCY_SAMPLES)] / 1e6
+        if len(latencies_ms):
+            p50, p99 = np.percentile(latencies_ms, [50, 99])
+            latency = f"latency p50 {p50:.2f} ms, p99 {p99:.2f} ms, max {latencies_ms.max():.2f} ms"
+        else:
+            latency = "no latency samples"
+        print(
+            f"INFO: Stream: {counts['messages']} messages in {elapsed:.1f} s "
+            f"({counts['messages'] / max(elapsed, 1e-9):.0f}/s), {latency}, "
+            f"{counts['overspeed']} overspeed and {counts['speed abnormality']} "
+            f"speed abnormality alerts, {counts['filtered']} filtered, "
+            f"{counts['invalid']} invalid, {counts['late']} out of order, "
+            f"{self.dropped} dropped, queue depth {queue_depth}.",
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+async def read_lines(file, queue, follow=False):
+    """
+    Puts the lines of file on queue, each stamped with the time it was read.
+    A pipe or terminal is read by the event loop line by line as the lines
+    arrive. A regular file, which the event loop cannot watch, is read in a
+    worker thread, so a slow disk never blocks the detector; reads of a
+    regular file return what is there without waiting for more. A full queue
+    blocks the reader (backpressure). With follow set, waits for lines
+    appended to the file instead of stopping at its end.
+    """
+    reader = None if follow else await _pipe_reader(file)
+    if reader is not None:
+        while line := await reader.readline():
+            await queue.put((time.perf_counter_ns(), line.decode()))
+        return
+
+    loop = asyncio.get_running_loop()
+    partial = ""
+    while True:
+        lines = await loop.run_in_executor(None, file.readlines, READ_HINT_BYTES)
+        if not lines:
+            if not follow:
+                break
+            await asyncio.sleep(TAIL_POLL_S)
+            continue
+
+        lines[0] = partial + lines[0]
+        partial = ""
+        # a line still being written is completed by the next read
+        if follow and not lines[-1].endswith("\n"):
+            partial = lines.pop()
+        for line in lines:
+            await queue.put((time.perf_counter_ns(), line))
+
+
+async def _pipe_reader(file):
+    """A StreamReader fed by the event loop from file, or None if file is not a pipe, socket or terminal."""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), file)
+    except (ValueError, OSError, NotImplementedError):
+        return None
+    return reader
+
+
+async def serve_tcp(address, queue):
+    """
+    Accepts AIS lines on a TCP socket. A full queue stops reading from the
+    connections, so TCP flow control slows the senders down (backpressure).
+    """
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                await queue.put((time.perf_counter_ns(), line.decode()))
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, *address)
+    print(
+        f"INFO: Listening for AIS lines on tcp://{address[0]}:{address[1]}",
+        file=sys.stderr,
+    )
+    async with server:
+        await server.serve_forever()
+
+
+class _DatagramLines(asyncio.DatagramProtocol):
+    def __init__(self, queue, stats):
+        self.queue = queue
+        self.stats = stats
+
+    def datagram_received(self, data, addr):
+        arrival_ns = time.perf_counter_ns()
+        for line in data.decode().splitlines():
+            # UDP senders cannot be slowed down, so the oldest lines give way
+            if self.queue.full():
+                self.queue.get_nowait()
+                self.stats.dropped += 1
+            self.queue.put_nowait((arrival_ns, line))
+
+
+async def serve_udp(address, queue, stats):
+    """Accepts datagrams of one or more AIS lines; drops the oldest lines when the queue is full."""
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        lambda: _DatagramLines(queue, stats), local_addr=address
+    )
+    print(
+        f"INFO: Listening for AIS lines on udp://{address[0]}:{address[1]}",
+        file=sys.stderr,
+    )
+    try:
+        await asyncio.Future()
+    finally:
+        transport.close()
+
+
+async def detect(queue, detector, alerts_file, stats):
+    """
+    Runs the detector over the queued lines, writing each alert as a JSON
+    line. Whatever is queued is handled in one batch (up to MAX_BATCH) and
+    the alerts flushed after it, so alerts go out as soon as the detector
+    is idle and in larger writes under load.
+    """
+    last_report = time.perf_counter()
+    while True:
+        batch = [await queue.get()]
+        while len(batch) < MAX_BATCH and not queue.empty():
+            batch.append(queue.get_nowait())
+
+        done = batch[-1] is None
+        if done:
+            batch.pop()
+        for _, line in batch:
+            for alert in detector.process_line(line):
+                alerts_file.write(json.dumps(alert) + "\n")
+        alerts_file.flush()
+
+        now_ns = time.perf_counter_ns()
+        for arrival_ns, _ in batch:
+            stats.record_latency(now_ns - arrival_ns)
+
+        if time.perf_counter() - last_report > STATS_INTERVAL_S:
+            stats.report(detector.counts, queue.qsize())
+            last_report = time.perf_counter()
+        if done:
+            break
+
+
+async def run_stream_async(source, detector, alerts_file, queue_size):
+    queue = asyncio.Queue(maxsize=queue_size)
+    stats = StreamStats()
+    kind, target = parse_endpoint(source)
+
+    if kind == "stdin":
+        reader = read_lines(sys.stdin, queue)
+    elif kind == "tail":
+        reader = read_lines(open(target), queue, follow=True)
+    elif kind == "tcp":
+        reader = serve_tcp(target, queue)
+    else:
+        reader = serve_udp(target, queue, stats)
+
+    detector_task = asyncio.create_task(detect(queue, detector, alerts_file, stats))
+    # a service manager stopping the detector still gets the final report
+    asyncio.get_running_loop().add_signal_handler(
+        signal.SIGTERM, asyncio.current_task().cancel
+    )
+    try:
+        await reader
+        # the end of a finite source: let the detector finish the queue
+        await queue.put(None)
+        await detector_task
+    finally:
+        detector_task.cancel()
+        stats.report(detector.counts, queue.qsize())
+
+
+def run_stream(params, state_dir):
+    """
+    Streaming mode: reads AIS lines (CSV in the Hawaii GT column order or
+    after a CSV header line, or JSON objects) from params["stream_source"]
+    and writes an alert per anomalous message as a JSON line to
+    params["alerts_file"] (stdout by default). Status lines go to stderr.
+    """
+    rules = ("overspeed", "speed abnormality")
+    if params["anomaly_type"] is not None:
+        rules = (params["anomaly_type"],)
+
+    thresholds = None
+    if "overspeed" in rules:
+        thresholds = load_stream_thresholds(params, state_dir)
+        if thresholds is None:
+            if params["anomaly_type"] == "overspeed":
+                raise ValueError(
+                    "No speed threshold: build one with --incremental or pass --speed_threshold."
+                )
+            print(
+                "WARNING: No speed threshold (see --incremental or --speed_threshold); "
+                "only speed abnormalities are detected.",
+                file=sys.stderr,
+            )
+        else:
+            print(f"INFO: Overspeed thresholds: {thresholds}", file=sys.stderr)
+
+    detector = StreamingDetector(params, thresholds, rules)
+    alerts_file = sys.stdout
+    if params["alerts_file"] is not None:
+        alerts_file = open(params["alerts_file"], "a")
+    try:
+        asyncio.run(
+            run_stream_async(
+                params["stream_source"], detector, alerts_file, params["queue_size"]
+            )
+        )
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
+    finally:
+        if alerts_file is not sys.stdout:
+            alerts_file.close()
+
+
+def _optional_float(value):
+    if value is None or value == "":
+        return None
+    value = float(value)
+    return None if np.isnan(value) else value
+
+
+def _isoformat(time_ns):
+    return pd.Timestamp(time_ns, tz="UTC").isoformat()
@@ -0,0 +1,225 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import copy
+import json
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from anomaly_rules.anomaly_rule_overspeeding import prepare_speeds, sorted_percentiles
+from common.ais_schema import LENGTH_LIMITS_M, VESSEL_CLASSES
+from common.output_writers import write_output
+
+DEFAULT_PERCENTILES = [0.99]
+
+
+def load_job_file(path):
+    """
+    Reads a sweep job file (JSON, or YAML if PyYAML is installed):
+
+        {
+          "Hawaii_GT": true,
+          "timeframe": {"start": "2017-01-01", "end": "2017-03-31"},
+          "hour_constraint": {"start": "00:00", "end": "23:59"},
+          "percentiles": [0.90, 0.95, 0.98, 0.99, 0.995],
+          "jobs": [
+            {"name": "cargo", "vessel_class": ["cargo"], "length_range": [1, 400]},
+            {"name": "cargo-tanker", "vessel_class": ["cargo", "tanker"]}
+          ]
+        }
+
+    Top-level keys are shared by every job; a job may override
+    "percentiles" and sets its own "vessel_class" and "length_range"
+    (left out, every vessel class and the full LENGTH_LIMITS_M range).
+    Job names become file names, so they cannot contain path separators.
+    """
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+
+            job_file = yaml.safe_load(f)
+        else:
+            job_file = json.load(f)
+
+    jobs = job_file.get("jobs")
+    if not jobs:
+        raise ValueError(f"{path} defines no jobs.")
+
+    names = [job.get("name") for job in jobs]
+    if None in names or len(set(names)) != len(names):
+        raise ValueError(f"Every job in {path} needs a unique name.")
+
+    min_length, max_length = LENGTH_LIMITS_M
+    for job in jobs:
+        name = job["name"]
+        if (
+            not isinstance(name, str)
+            or name in ["", ".", ".."]
+            or any(sep and sep in name for sep in [os.sep, os.altsep])
+        ):
+            raise ValueError(
+                f"Job {name!r}: the name is used as a file name and cannot be "
+                "empty or contain path separators."
+            )
+
+        job.setdefault("percentiles", job_file.get("percentiles", DEFAULT_PERCENTILES))
+        if job.get("vessel_class") is None:
+            job["vessel_class"] = list(VESSEL_CLASSES)
+        if job.get("length_range") is None:
+            job["length_range"] = list(LENGTH_LIMITS_M)
+
+        if not all(0 <= percentile <= 1 for percentile in job["percentiles"]):
+            raise ValueError(f"Job {name}: percentiles must be between 0 and 1.")
+        unknown = set(job["vessel_class"]) - set(VESSEL_CLASSES)
+        if unknown:
+            raise ValueError(
+                f"Job {name}: unknown vessel classes {sorted(unknown)}, "
+                f"choose from {VESSEL_CLASSES}."
+            )
+        if len(job["length_range"]) != 2 or not (
+            min_length <= job["length_range"][0] <= job["length_range"][1] <= max_length
+        ):
+            raise ValueError(
+                f"Job {name}: length_range must be [min, max] between "
+                f"{min_length} and {max_length}."
+            )
+
+    return job_file
+
+
+def union_params(params, job_file):
+    """
+    Params that load every row any job could use: the job file's shared
+    filters, the union of the jobs' vessel classes and the span of their
+    length ranges.
+    """
+    params = copy.deepcopy(params)
+    params["anomaly_type"] = "overspeed"
+
+    for key in ["Hawaii_GT", "AIS_file_name", "bbox", "region_file"]:
+        if key in job_file:
+            params[key] = job_file[key]
+
+    timeframe = job_file.get("timeframe", {})
+    for bound in ["start", "end"]:
+        if timeframe.get(bound) is not None:
+            params["timeframe"][bound] = pd.to_datetime(timeframe[bound])
+
+    hours = job_file.get("hour_constraint", {})
+    for bound in ["start", "end"]:
+        if hours.get(bound) is not None:
+            params["hour_constraint"][bound] = datetime.strptime(
+                hours[bound], "%H:%M"
+            ).time()
+
+    jobs = job_file["jobs"]
+    params["vessel_class"] = sorted(
+        {vessel for job in jobs for vessel in job["vessel_class"]}
+    )
+    params["length_range"] = [
+        min(job["length_range"][0] for job in jobs),
+        max(job["length_range"][1] for job in jobs),
+    ]
+
+    return params
+
+
+def run_sweep(params, job_path, complete_params, load_data, output_path):
+    """
+    Runs every job of the job file at job_path over one loaded dataset.
+
+    complete_params(params) prompts for the shared params the job file
+    leaves out (the data source, timeframe or hours) until they are valid,
+    before load_data(params) loads and filters the union of the jobs' data
+    once.
+    The valid speeds are sorted once; each job's subset is a mask over the
+    shared data, and its sorted speeds are that sorted array masked, so all
+    of its percentiles are read off without sorting again. Jobs run on
+    params["workers"] threads, sharing the data without copying it.
+
+    Each job's points, with one overspeed flag column per percentile, are
+    written to <output_path>/sweep_<date>/<job name> (see
+    common.output_writers), and the thresholds
+    and flag counts of every job and percentile to summary.csv there.
+    """
+    job_file = load_job_file(job_path)
+    params = complete_params(union_params(params, job_file))
+
+    data = prepare_speeds(load_data(params))
+    speeds = data["computed_speed_knots"].to_numpy()
+    valid = np.isfinite(speeds)
+    order = np.argsort(speeds[valid], kind="stable")
+    sorted_speeds = speeds[valid][order]
+
+    vessel_class = data["vessel_class"].astype(str).to_numpy()
+    length = data["length_m"].to_numpy()
+
+    sweep_dir = os.path.join(
+        output_path, f"sweep_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}"
+    )
+    os.makedirs(sweep_dir, exist_ok=True)
+
+    def run_job(job):
+        in_job = np.ones(len(data), dtype=bool)
+        if job["vessel_class"] is not None:
+            in_job &= np.isin(vessel_class, job["vessel_class"])
+        if job["length_range"] is not None:
+            min_length, max_length = job["length_range"]
+            in_job &= (length >= min_length) & (length <= max_length)
+
+        job_sorted_speeds = sorted_speeds[in_job[valid][order]]
+        job_speeds = speeds[in_job]
+        job_data = data[in_job].copy()
+
+        summary = []
+        if len(job_sorted_speeds) == 0:
+            print(f"WARNING: Sweep job {job['name']} has no valid speeds.")
+        else:
+            thresholds = sorted_percentiles(job_sorted_speeds, job["percentiles"])
+            for percentile, threshold in zip(job["percentiles"], thresholds):
+                flags = job_speeds > threshold
+                job_data[f"overspeed_flag_p{percentile * 100:g}"] = flags
+                summary.append(
+                    {
+                        "job": job["name"],
+                        "percentile": percentile,
+                        "n_points": len(job_sorted_speeds),
+                        "speed_threshold": threshold,
+                        "n_flagged": int(flags.sum()),
+                    }
+                )
+
+        write_output(
+            job_data,
+            os.path.join(sweep_dir, job["name"]),
+            params,
+            flag_columns=[
+                col for col in job_data.columns if col.startswith("overspeed_flag")
+            ],
+            index=True,
+        )
+        return summary
+
+    with ThreadPoolExecutor(max_workers=params["workers"]) as executor:
+        summaries = list(executor.map(run_job, job_file["jobs"]))
+
+    summary = pd.DataFrame(
+        [row for job_summary in summaries for row in job_summary],
+        columns=["job", "percentile", "n_points", "speed_threshold", "n_flagged"],
+    )
+    summary_path = os.path.join(sweep_dir, "summary.csv")
+    summary.to_csv(summary_path, index=False)
+
+    print(f"Sweep thresholds:\n{summary}\n")
+    print(f"Successfully saved the output of each sweep job to {sweep_dir}.")
+
+    return summary
@@ -0,0 +1,85 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import os
+import shutil
+import sys
+
+import pytest
+
+# the modules import each other as top-level packages, as when main.py runs
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "src"))
+
+import main as pipeline
+from generate_ais import VESSEL_CLASSES, write_months
+from params_builder import ArgParser, ParamsBuilder
+
+# 10,000 reports a month from 10 vessels
+SYNTHETIC_ROWS = 30_000
+SYNTHETIC_MONTHS = 3
+# Filters that keep (nearly) every report of the synthetic months
+RUN_ARGS = [
+    "--anomaly_type",
+    "overspeed",
+    "--Hawaii_GT",
+    "true",
+    "--vessel_class",
+    *VESSEL_CLASSES,
+    "--length",
+    "1-400",
+    "--date_start",
+    "2017-01-01",
+    "--date_end",
+    "2017-03-31",
+    "--hour_start",
+    "00:00",
+    "--hour_end",
+    "23:59",
+    "--percentile",
+    "0.99",
+]
+
+
+@pytest.fixture(scope="session")
+def synthetic_months(tmp_path_factory):
+    """Seeded synthetic Hawaii GT months 2017-01 to 2017-03, in a data/ folder."""
+    data_dir = tmp_path_factory.mktemp("synthetic") / "data"
+    data_dir.mkdir()
+    write_months(str(data_dir), SYNTHETIC_ROWS, "2017-01", SYNTHETIC_MONTHS)
+    return data_dir
+
+
+@pytest.fixture
+def synthetic_root(synthetic_months, tmp_path, monkeypatch):
+    """
+    A repository root for main's loaders whose data/ holds a fresh copy of
+    synthetic_months, so caches, indexes and manifests built by a test stay
+    in that test.
+    """
+    shutil.copytree(synthetic_months, tmp_path / "data")
+    monkeypatch.setattr(pipeline, "one_dir_up_from_this_file", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def make_params():
+    """
+    Builds the params of a main.py run over the synthetic months as main
+    does, from RUN_ARGS followed by the given flags (a repeated flag
+    overrides its RUN_ARGS value).
+    """
+
+    def make(*args):
+        params_builder = ParamsBuilder()
+        params_builder.update_params(
+            ArgParser().parser.parse_args(RUN_ARGS + list(args))
+        )
+        return pipeline.complete_params(params_builder.params)
+
+    return make
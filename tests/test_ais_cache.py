@@ -0,0 +1,45 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import pandas as pd
+import pytest
+
+import main as pipeline
+from common.ais_cache import convert_csv_to_parquet, is_cached
+
+pytest.importorskip("pyarrow")
+
+FILTERS = [
+    [],
+    ["--vessel_class", "cargo", "tanker", "--length", "50-250"],
+    ["--hour_start", "22:00", "--hour_end", "04:00"],
+    ["--bbox", "-158.3", "21.2", "-157.6", "21.7"],
+]
+
+
+def rows(data):
+    """data as a frame of rows in a fixed order, to compare loads."""
+    data = data.reset_index(drop=True)
+    data["vessel_class"] = data["vessel_class"].astype(str)
+    return data.sort_values(["MMSI", "datetime_utc"], ignore_index=True)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_pushdown_gives_the_rows_of_the_csv(synthetic_root, make_params, filters):
+    params = make_params(*filters)
+    data_dir = str(synthetic_root / "data")
+    month = pd.Timestamp("2017-02-01")
+
+    from_csv = pipeline.load_and_filter_month(params, month)
+    convert_csv_to_parquet(data_dir, "Hawaii_2017_02")
+    assert is_cached(data_dir, "Hawaii_2017_02")
+    from_cache = pipeline.load_and_filter_month(params, month)
+
+    assert list(from_cache.columns) == list(from_csv.columns)
+    pd.testing.assert_frame_equal(rows(from_cache), rows(from_csv))
@@ -0,0 +1,96 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import pandas as pd
+import pytest
+
+from anomaly_generation.anomaly_injection import (
+    FLAG_COLUMNS,
+    INJECTION_TYPES,
+    MIN_MOVING_KNOTS,
+    MIN_SPEEDUP,
+    inject_anomalies,
+)
+from anomaly_rules.anomaly_rule_overspeeding import overspeed_filter_mask
+from anomaly_rules.anomaly_rule_speed_abnormality import (
+    detect_speed_abnormality_batch,
+)
+from generate_ais import REPORTS_PER_VESSEL_MONTH, Fleet, generate_month
+
+ROWS = 20_000
+FRACTION = 0.2
+
+
+@pytest.fixture(scope="module", params=[0, 1, 2])
+def injection(request):
+    """A seeded synthetic month, injected with one worker, and its labels."""
+    seed = request.param
+    fleet = Fleet(ROWS // REPORTS_PER_VESSEL_MONTH, seed)
+    data = pd.concat(generate_month(fleet, ROWS, "2017-01", seed), ignore_index=True)
+    injected, labels = inject_anomalies(data, INJECTION_TYPES, FRACTION, seed)
+    assert set(labels["anomaly_type"]) == set(INJECTION_TYPES)
+    return seed, data, injected, labels
+
+
+def test_same_output_for_any_number_of_workers(injection):
+    seed, data, injected, labels = injection
+
+    pooled, pooled_labels = inject_anomalies(
+        data, INJECTION_TYPES, FRACTION, seed, workers=2
+    )
+
+    assert pooled.equals(injected)
+    assert pooled_labels.equals(labels)
+
+
+def test_reports_stay_in_time_order(injection):
+    _, _, injected, _ = injection
+
+    points = injected.sort_values(["MMSI", "datetime_utc"], kind="stable")
+
+    assert (
+        points.groupby("MMSI")["datetime_utc"].diff().dropna() > pd.Timedelta(0)
+    ).all()
+
+
+def test_speed_abnormality_rule_flags_every_injected_point(injection):
+    _, _, injected, _ = injection
+    points = injected.sort_values(["MMSI", "datetime_utc"], kind="stable")
+    points["traj_id"] = points["MMSI"]
+
+    flags, _ = detect_speed_abnormality_batch(points)
+
+    abnormal = points[FLAG_COLUMNS["speed abnormality"]].to_numpy()
+    assert abnormal.any()
+    assert flags[abnormal].all()
+
+
+def test_overspeed_segments_are_sailed_faster(injection):
+    _, data, injected, labels = injection
+    overspeed = injected[FLAG_COLUMNS["overspeed"]].to_numpy()
+    speeds = injected["comput_speed_knots"][overspeed]
+
+    speedup = speeds.to_numpy() / data["comput_speed_knots"].to_numpy()[overspeed]
+    assert (speedup >= MIN_SPEEDUP * 0.99).all()
+    # under the outlier cut of the overspeed rule
+    moving = pd.Series(0, index=speeds.index)
+    assert overspeed_filter_mask(moving, speeds).all()
+
+    # no moored segment is labeled an overspeed
+    segments = labels[labels["anomaly_type"] == "overspeed"]
+    points = injected[overspeed]
+    for segment in segments.itertuples():
+        in_segment = (
+            (points["MMSI"] == segment.MMSI)
+            & (points["datetime_utc"] >= segment.start_time)
+            & (points["datetime_utc"] <= segment.end_time)
+        )
+        assert in_segment.sum() == segment.n_points
+        mean_speed = points["comput_speed_knots"][in_segment].mean()
+        assert mean_speed >= MIN_MOVING_KNOTS * MIN_SPEEDUP * 0.99
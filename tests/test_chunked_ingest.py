@@ -0,0 +1,77 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import pandas as pd
+import pytest
+
+import main as pipeline
+from common.ais_schema import apply_ais_schema, read_ais_csv
+from common.chunked_ingest import (
+    MIN_CHUNK_ROWS,
+    derive_chunk_size,
+    read_and_filter_in_chunks,
+)
+from common.filter_trajectories import filter_ais_data
+from common.timestamps import parse_timestamps
+
+CUSTOM_FILE = "Hawaii_2017_01"
+FILTERS = [
+    ["--vessel_class", "cargo", "tanker", "--length", "50-250"],
+    ["--hour_start", "22:00", "--hour_end", "04:00"],
+]
+
+
+@pytest.fixture
+def custom_params(synthetic_root, make_params):
+    def make(*filters):
+        return make_params(
+            "--Hawaii_GT", "false", "--AIS_file_name", CUSTOM_FILE, *filters
+        )
+
+    return make
+
+
+def read_whole(params, path):
+    """The rows filter_ais_data keeps when the whole file is read at once."""
+    data = read_ais_csv(path, params["anomaly_type"])
+    parse_timestamps(data)
+    apply_ais_schema(data)
+    return filter_ais_data(params, data)
+
+
+def rows(data):
+    """data with plain vessel class labels (chunks keep only the labels they hold)."""
+    data = data.reset_index(drop=True)
+    data["vessel_class"] = data["vessel_class"].astype(str)
+    return data
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_chunks_give_the_rows_of_the_whole_file(synthetic_root, custom_params, filters):
+    params = custom_params(*filters)
+    path = str(synthetic_root / "data" / f"{CUSTOM_FILE}.csv")
+
+    chunked = read_and_filter_in_chunks(params, path, chunk_size=MIN_CHUNK_ROWS)
+
+    pd.testing.assert_frame_equal(rows(chunked), rows(read_whole(params, path)))
+
+
+def test_memory_budget_sets_the_chunk_size(synthetic_root, custom_params):
+    params = custom_params("--memory_budget", "1")
+    path = str(synthetic_root / "data" / f"{CUSTOM_FILE}.csv")
+
+    assert params["memory_budget_mb"] == 1
+    small = derive_chunk_size(path, 1, params["anomaly_type"])
+    assert MIN_CHUNK_ROWS <= small < derive_chunk_size(path, 64, params["anomaly_type"])
+
+    data = pipeline.load_and_filter_data(params)
+    assert data.index.name == "MMSI"
+    pd.testing.assert_frame_equal(
+        rows(data), rows(read_whole(params, path)).drop(columns="MMSI")
+    )
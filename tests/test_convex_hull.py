@@ -0,0 +1,130 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pytest
+
+import common.convex_hull as convex_hull
+from common.convex_hull import batch_chull_areas_km2, chull_area_km2
+from common.geodesy import project_to_km
+
+TOLERANCE_KM2 = 1e-8
+
+
+def synthetic_trajectories(n_trajectories, max_points, seed=0):
+    """Random-walk tracks around Hawaii, with degenerate tracks mixed in."""
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(1, max_points + 1, n_trajectories)
+    traj_ids = np.repeat(np.arange(n_trajectories), lengths)
+    lon = -158 + np.cumsum(rng.normal(0, 0.003, len(traj_ids)))
+    lat = 21 + np.cumsum(rng.normal(0, 0.003, len(traj_ids)))
+
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    for traj in range(0, n_trajectories, 10):
+        track = slice(starts[traj], starts[traj] + lengths[traj])
+        kind = (traj // 10) % 4
+        if kind == 0:  # vessel sitting still
+            lon[track], lat[track] = lon[track][0], lat[track][0]
+        elif kind == 1:  # straight diagonal
+            lat[track] = lat[track][0] + 0.5 * (lon[track] - lon[track][0])
+        elif kind == 2:  # due east
+            lat[track] = lat[track][0]
+        else:  # every point repeated
+            half = lengths[traj] // 2
+            lon[track][half:] = lon[track][: lengths[traj] - half]
+            lat[track][half:] = lat[track][: lengths[traj] - half]
+
+    return lon, lat, traj_ids
+
+
+def shapely_areas(lon, lat, traj_ids):
+    geometry = pytest.importorskip("shapely.geometry")
+    areas = []
+    for traj in np.unique(traj_ids):
+        track = traj_ids == traj
+        x, y = project_to_km(lon[track], lat[track], lat[track].mean())
+        areas.append(geometry.MultiPoint(np.column_stack([x, y])).convex_hull.area)
+    return np.array(areas)
+
+
+def test_batch_matches_shapely():
+    lon, lat, traj_ids = synthetic_trajectories(500, 80)
+
+    areas = batch_chull_areas_km2(lon, lat, traj_ids)
+
+    np.testing.assert_allclose(
+        areas, shapely_areas(lon, lat, traj_ids), rtol=0, atol=TOLERANCE_KM2
+    )
+
+
+def test_long_tracks_match_shapely():
+    lon, lat, traj_ids = synthetic_trajectories(6, 20_000, seed=1)
+    # a track whose every point is on its hull
+    theta = np.random.default_rng(2).uniform(0, 2 * np.pi, 5_000)
+    lon = np.concatenate([lon, -157 + 0.2 * np.cos(theta)])
+    lat = np.concatenate([lat, 20 + 0.2 * np.sin(theta)])
+    traj_ids = np.concatenate([traj_ids, np.full(len(theta), 6)])
+
+    areas = batch_chull_areas_km2(lon, lat, traj_ids)
+
+    np.testing.assert_allclose(
+        areas, shapely_areas(lon, lat, traj_ids), rtol=1e-12, atol=TOLERANCE_KM2
+    )
+
+
+def test_every_block_layout_gives_the_same_areas(monkeypatch):
+    lon, lat, traj_ids = synthetic_trajectories(300, 400, seed=3)
+    expected = batch_chull_areas_km2(lon, lat, traj_ids)
+
+    # small blocks, and most tracks hulled on their own by quickhull
+    monkeypatch.setattr(convex_hull, "MAX_BLOCK_CELLS", 1_000)
+    monkeypatch.setattr(convex_hull, "LONG_TRACK_POINTS", 20)
+    areas = batch_chull_areas_km2(lon, lat, traj_ids, chunk_trajectories=7)
+
+    np.testing.assert_allclose(areas, expected, rtol=1e-12, atol=TOLERANCE_KM2)
+
+
+def test_one_long_track_does_not_pad_every_block(monkeypatch):
+    lengths = np.r_[np.full(999, 5), 5_000]
+    traj_ids = np.repeat(np.arange(len(lengths)), lengths)
+    rng = np.random.default_rng(4)
+    lon = -158 + rng.uniform(0, 0.1, len(traj_ids))
+    lat = 21 + rng.uniform(0, 0.1, len(traj_ids))
+
+    monkeypatch.setattr(convex_hull, "LONG_TRACK_POINTS", 100)
+    counts = np.bincount(traj_ids)
+    blocks = list(
+        convex_hull._padded_blocks(
+            traj_ids,
+            lon,
+            lat,
+            counts,
+            convex_hull.CHUNK_TRAJECTORIES,
+        )
+    )
+
+    padded = [X for _, X, _, lengths in blocks if lengths is not None]
+    assert [X.shape for X in padded] == [(999, 5)]
+    assert blocks[-1][0].tolist() == [999] and blocks[-1][3] is None
+
+
+def test_known_and_degenerate_areas():
+    lon = np.array([-158, -157.99, -157.99, -158, -157.995])
+    lat = np.array([21, 21, 21.01, 21.01, 21.005])
+    # the projection is linear for one trajectory, so the square stays a rectangle
+    x, y = project_to_km(lon, lat, lat.mean())
+    rectangle = (x.max() - x.min()) * (y.max() - y.min())
+
+    assert chull_area_km2(lon, lat) == pytest.approx(rectangle, rel=1e-12)
+    assert chull_area_km2([], []) == 0
+    assert chull_area_km2([-158], [21]) == 0
+    assert chull_area_km2([-158, -158, -157.9], [21, 21, 21.1]) == 0
+    assert chull_area_km2([-158, -157.9, -157.8], [21, 21.1, 21.2]) == pytest.approx(
+        0, abs=TOLERANCE_KM2
+    )
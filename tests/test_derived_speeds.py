@@ -0,0 +1,137 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main as pipeline
+from anomaly_rules.anomaly_rule_overspeeding import prepare_speeds
+from common.ais_schema import apply_ais_schema
+from common.chunked_ingest import read_and_filter_in_chunks
+from common.derived_speeds import DERIVED_COLUMNS, SpeedDeriver, derive_speeds
+from common.quantile_sketch import QuantileSketch
+from generate_ais import (
+    REPORTS_PER_VESSEL_MONTH,
+    VESSEL_CLASSES,
+    Fleet,
+    format_timestamps,
+    generate_month,
+)
+from params_builder import ParamsBuilder
+
+START_MONTH = "2017-01"
+ROWS = 20_000
+CHUNK_ROWS = 1_000
+# generate_ais.py rounds distances to 6 decimals and speeds to 4, and the
+# derived columns are float32
+MAX_DISTANCE_ERROR_KM = 1e-3
+MAX_SPEED_ERROR = 1e-3
+
+
+@pytest.fixture(scope="module")
+def generated():
+    """A synthetic month in time order (as a feed writes it), with the schema applied."""
+    fleet = Fleet(ROWS // REPORTS_PER_VESSEL_MONTH, seed=0)
+    data = pd.concat(generate_month(fleet, ROWS, START_MONTH), ignore_index=True)
+    data = data.sort_values("datetime_utc", kind="stable", ignore_index=True)
+    return apply_ais_schema(data)
+
+
+def loader_params():
+    """Parameters that keep (nearly) every report of the month."""
+    params = ParamsBuilder().params
+    start = pd.Timestamp(START_MONTH)
+    params.update(
+        {
+            "anomaly_type": None,
+            "Hawaii_GT": True,
+            "vessel_class": list(VESSEL_CLASSES),
+            "length_range": [1, 400],
+            "timeframe": {"start": start, "end": start + pd.offsets.MonthEnd(1)},
+            "hour_constraint": {
+                "start": pd.Timestamp("00:00").time(),
+                "end": pd.Timestamp("23:59").time(),
+            },
+        }
+    )
+    return params
+
+
+def write_month(root, data):
+    (root / "data").mkdir(exist_ok=True)
+    path = root / "data" / "Hawaii_2017_01.csv"
+    format_timestamps(data.drop(columns=DERIVED_COLUMNS)).to_csv(path, index=False)
+    return str(path)
+
+
+def assert_derived_like(frame, whole):
+    """The rows of frame carry the columns derived for them from the whole data."""
+    expected = whole.set_index(["MMSI", "datetime_utc"])[DERIVED_COLUMNS]
+    derived = frame.set_index(["MMSI", "datetime_utc"])[DERIVED_COLUMNS]
+    # the filters drop only the reports after 23:59 of each day
+    assert not derived.empty
+    assert derived.equals(expected.loc[derived.index])
+
+
+def test_chunks_match_the_whole_month(generated):
+    data = generated.drop(columns=DERIVED_COLUMNS)
+    whole = derive_speeds(data.copy())
+
+    deriver = SpeedDeriver()
+    chunked = pd.concat(
+        deriver.derive(data.iloc[start : start + CHUNK_ROWS].copy())
+        for start in range(0, len(data), CHUNK_ROWS)
+    )
+
+    assert deriver.late == 0
+    assert chunked[DERIVED_COLUMNS].equals(whole[DERIVED_COLUMNS])
+
+
+def test_derived_columns_match_generate_ais(generated):
+    whole = derive_speeds(generated.drop(columns=DERIVED_COLUMNS))
+
+    assert whole["distances_km"].isna().equals(generated["distances_km"].isna())
+    distance_error = np.abs(whole["distances_km"] - generated["distances_km"])
+    assert distance_error.max() <= MAX_DISTANCE_ERROR_KM
+
+    computed = whole["comput_speed_knots"].notna() & generated["distances_km"].notna()
+    expected = generated["comput_speed_knots"][computed]
+    speed_error = np.abs(whole["comput_speed_knots"][computed] - expected)
+    assert (speed_error / np.maximum(expected, 1)).max() <= MAX_SPEED_ERROR
+
+
+def test_loaders_derive_the_missing_columns(generated, tmp_path, monkeypatch):
+    path = write_month(tmp_path, generated)
+    monkeypatch.setattr(pipeline, "one_dir_up_from_this_file", str(tmp_path))
+    params = loader_params()
+    whole = derive_speeds(generated.drop(columns=DERIVED_COLUMNS))
+
+    assert_derived_like(
+        read_and_filter_in_chunks(params, path, chunk_size=CHUNK_ROWS), whole
+    )
+    assert_derived_like(
+        pipeline.load_and_filter_month(params, pd.Timestamp(START_MONTH)), whole
+    )
+
+
+def test_shuffled_file_is_derived_as_a_whole(generated, tmp_path, capsys):
+    shuffled = generated.sample(frac=1, random_state=0, ignore_index=True)
+    path = write_month(tmp_path, shuffled)
+    whole = derive_speeds(shuffled.drop(columns=DERIVED_COLUMNS))
+    sketch = QuantileSketch()
+
+    data = read_and_filter_in_chunks(
+        loader_params(), path, chunk_size=CHUNK_ROWS, speed_sketch=sketch
+    )
+
+    assert "from the whole file at once" in capsys.readouterr().out
+    assert_derived_like(data, whole)
+    expected = QuantileSketch.from_values(prepare_speeds(data)["computed_speed_knots"])
+    assert sketch.count == expected.count
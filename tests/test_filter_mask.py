@@ -0,0 +1,71 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pytest
+
+from common.ais_schema import apply_ais_schema, read_ais_csv
+from common.filter_trajectories import ensure_utc, filter_ais_data
+from common.timestamps import parse_timestamps
+
+FILTERS = [
+    [],
+    ["--vessel_class", "cargo", "tanker", "--length", "50-250"],
+    ["--date_start", "2017-01-10", "--date_end", "2017-01-20"],
+    ["--hour_start", "08:15", "--hour_end", "17:45"],
+    ["--hour_start", "22:00", "--hour_end", "04:00"],
+    ["--hour_start", "23:30", "--hour_end", "00:30", "--vessel_class", "fishing"],
+]
+
+
+@pytest.fixture(scope="module")
+def month(synthetic_months):
+    """A synthetic month with some vessel class labels in other cases and padded."""
+    data = read_ais_csv(synthetic_months / "Hawaii_2017_01.csv")
+    parse_timestamps(data)
+    labels = data["vessel_class"].astype(str)
+    labels[::7] = " " + labels[::7].str.upper() + " "
+    data["vessel_class"] = labels
+    return apply_ais_schema(data)
+
+
+def reference_filter(params, data):
+    """
+    The original filter_ais_data: row by row comparisons of datetime.time
+    values, with an hour window that ends before it starts wrapping past
+    midnight.
+    """
+    data = data.copy()
+    data["vessel_class"] = data["vessel_class"].astype(str).str.lower().str.strip()
+    data = data[data["vessel_class"].isin(params["vessel_class"])]
+
+    min_length, max_length = params["length_range"]
+    data = data[(data["length_m"] >= min_length) & (data["length_m"] <= max_length)]
+
+    start = ensure_utc(params["timeframe"]["start"])
+    end = ensure_utc(params["timeframe"]["end"])
+    data = data[(data["datetime_utc"] >= start) & (data["datetime_utc"] <= end)]
+
+    time = data["datetime_utc"].dt.time
+    start, end = params["hour_constraint"]["start"], params["hour_constraint"]["end"]
+    if start <= end:
+        return data[(time >= start) & (time <= end)]
+    return data[(time >= start) | (time <= end)]
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_mask_keeps_the_rows_of_the_original_filter(month, make_params, filters):
+    params = make_params(*filters)
+
+    filtered = filter_ais_data(params, month.copy())
+    expected = reference_filter(params, month)
+
+    assert len(expected) > 0
+    np.testing.assert_array_equal(filtered.index, expected.index)
+    assert (filtered["vessel_class"].astype(str) == expected["vessel_class"]).all()
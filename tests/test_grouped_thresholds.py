@@ -0,0 +1,57 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main as pipeline
+from anomaly_rules.anomaly_rule_overspeeding import (
+    overspeeding_by_group,
+    prepare_speeds,
+)
+
+
+@pytest.mark.parametrize(
+    "group_by", [["vessel_class"], ["length", "month"], ["vessel_class", "length"]]
+)
+def test_group_thresholds_are_the_percentiles_of_each_group(
+    synthetic_root, make_params, group_by
+):
+    params = make_params("--percentile", "0.95", "--group_by", *group_by)
+    data = pipeline.load_and_filter_data(params)
+
+    flagged, table = overspeeding_by_group(params, data)
+
+    speeds = prepare_speeds(data)
+    groups = pd.DataFrame(
+        {
+            "vessel_class": speeds["vessel_class"].astype(str),
+            "length": np.searchsorted(
+                params["length_bins"], speeds["length_m"], side="right"
+            ),
+            "month": speeds["datetime_utc"].dt.month,
+        }
+    )[group_by]
+    by_group = speeds["computed_speed_knots"].groupby(
+        [groups[col].to_numpy() for col in group_by]
+    )
+    # the grouped quantile interpolates the float32 speeds in float64
+    thresholds = np.array(
+        [np.percentile(group.astype(np.float64), 95) for _, group in by_group]
+    )
+    expected = thresholds[by_group.ngroup().to_numpy()]
+
+    assert len(table) == by_group.ngroups > 1
+    np.testing.assert_array_equal(flagged["speed_threshold"], expected)
+    assert table["n_points"].sum() == len(flagged) == len(speeds)
+    assert (
+        flagged["overspeed_flag"]
+        == (flagged["computed_speed_knots"] > flagged["speed_threshold"])
+    ).all()
@@ -0,0 +1,70 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import main as pipeline
+from anomaly_rules.anomaly_rule_overspeeding import prepare_speeds
+from common.timestamps import epoch_ns
+from incremental import run_incremental_update
+
+MONTHS = ["Hawaii_2017_01", "Hawaii_2017_02", "Hawaii_2017_03"]
+
+
+def custom_params(make_params, file_name, *flags):
+    """The params main.py builds for --incremental (or a custom file) over all time."""
+    params = make_params("--Hawaii_GT", "false", "--AIS_file_name", file_name, *flags)
+    params["timeframe"] = {"start": pd.Timestamp.min, "end": pd.Timestamp.max}
+    return params
+
+
+def point_keys(mmsi, datetime_utc):
+    """(MMSI, epoch ns) of each point; an empty flipped frame has object columns."""
+    times_ns = epoch_ns(pd.to_datetime(pd.Series(datetime_utc), utc=True))
+    return list(zip(np.asarray(mmsi).tolist(), times_ns.tolist()))
+
+
+@pytest.mark.parametrize("group_by", [[], ["--group_by", "vessel_class"]])
+def test_monthly_updates_equal_a_single_run(synthetic_root, make_params, group_by):
+    data_dir = synthetic_root / "data"
+    flags = {}
+    for month in MONTHS:
+        data, flipped, thresholds = run_incremental_update(
+            custom_params(make_params, month, *group_by),
+            str(data_dir / f"{month}.csv"),
+            str(synthetic_root / "state"),
+            str(synthetic_root / "output"),
+        )
+        flags.update(
+            zip(point_keys(data["MMSI"], data["datetime_utc"]), data["overspeed_flag"])
+        )
+        flipped_keys = point_keys(flipped["MMSI"], flipped["datetime_utc"])
+        assert all(key in flags for key in flipped_keys)
+        flags.update(zip(flipped_keys, flipped["overspeed_flag"]))
+
+    # the three months as one custom file, run in one go
+    pd.concat([pd.read_csv(data_dir / f"{month}.csv") for month in MONTHS]).to_csv(
+        data_dir / "all_months.csv", index=False
+    )
+    params = custom_params(make_params, "all_months", *group_by)
+    speeds = prepare_speeds(pipeline.load_and_filter_data(params).reset_index())
+    labels = speeds["vessel_class"].astype(str) if group_by else "all"
+    labels = pd.Series(labels, index=speeds.index)
+    expected = speeds.groupby(labels)["computed_speed_knots"].agg(
+        lambda group: np.percentile(group, 99)
+    )
+
+    assert dict(zip(thresholds["group"], thresholds["new_threshold"])) == dict(expected)
+    threshold = labels.map(expected)
+    expected_flags = speeds["computed_speed_knots"] > threshold
+    keys = point_keys(speeds["MMSI"], speeds["datetime_utc"])
+    assert len(set(keys)) == len(keys) == len(flags)
+    assert [flags[key] for key in keys] == list(expected_flags)
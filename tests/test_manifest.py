@@ -0,0 +1,80 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import functools
+
+import pandas as pd
+import pytest
+
+import common.manifest as manifest
+import main as pipeline
+from common.manifest import load_manifest, manifest_entry, matching_zone_runs
+
+FILTERS = [
+    ["--date_start", "2017-02-01", "--date_end", "2017-02-20"],
+    ["--vessel_class", "cargo", "tug tow", "--length", "1-200"],
+    ["--bbox", "-159.0", "19.5", "-157.0", "21.0"],
+    ["--hour_start", "22:00", "--hour_end", "04:00", "--vessel_class", "tanker"],
+]
+# The synthetic months are small, so they are split into many zones
+ZONE_ROWS = 1_000
+
+
+@pytest.fixture(autouse=True)
+def small_zones(monkeypatch):
+    monkeypatch.setattr(
+        manifest,
+        "build_manifest_entry",
+        functools.partial(manifest.build_manifest_entry, zone_rows=ZONE_ROWS),
+    )
+
+
+def rows(data):
+    data = data.reset_index()
+    data["vessel_class"] = data["vessel_class"].astype(str)
+    return data.sort_values(["MMSI", "datetime_utc"], ignore_index=True)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_pruned_months_give_the_rows_of_a_full_read(
+    synthetic_root, make_params, filters
+):
+    full = pipeline.load_and_filter_data(make_params(*filters))
+    assert load_manifest(str(synthetic_root / "data")) == {}
+
+    pruned = pipeline.load_and_filter_data(make_params("--build_manifest", *filters))
+
+    pd.testing.assert_frame_equal(rows(pruned), rows(full))
+
+
+@pytest.mark.parametrize("filters", FILTERS[1:])
+def test_pruned_custom_file_gives_the_rows_of_a_full_read(
+    synthetic_root, make_params, filters
+):
+    custom = ["--Hawaii_GT", "false", "--AIS_file_name", "Hawaii_2017_01", *filters]
+    full = pipeline.load_and_filter_data(make_params(*custom))
+
+    params = make_params("--build_manifest", *custom)
+    pruned = pipeline.load_and_filter_data(params)
+
+    entry = manifest_entry(str(synthetic_root / "data"), "Hawaii_2017_01.csv")
+    read_rows = sum(rows for _, rows in matching_zone_runs(entry, params))
+    assert read_rows < entry["rows"]
+    pd.testing.assert_frame_equal(rows(pruned), rows(full))
+
+
+def test_manifest_skips_months_outside_the_timeframe(synthetic_root, make_params):
+    params = make_params(
+        "--build_manifest", "--date_start", "2017-02-03", "--date_end", "2017-02-20"
+    )
+    months = pd.date_range("2017-01-01", "2017-03-01", freq="MS")
+
+    kept = pipeline.prune_months_with_manifest(params, months)
+
+    assert list(kept) == [pd.Timestamp("2017-02-01")]
@@ -0,0 +1,110 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import common.output_writers as output_writers
+from common.output_writers import write_output
+
+ROWS = 5_000
+CASES = [
+    ("csv", None, None, False),
+    ("csv", None, "gzip", False),
+    ("csv", "vessel_class", None, False),
+    ("parquet", None, None, False),
+    ("parquet", "month", "zstd", False),
+    ("feather", None, None, False),
+    ("csv", None, None, True),
+    ("parquet", None, None, True),
+]
+
+
+def synthetic_results(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp("2017-01-01", tz="UTC").value
+    times = np.sort(rng.integers(start, start + 365 * 86_400 * 10**9, n_rows))
+    speeds = rng.gamma(4, 3, n_rows).astype(np.float32)
+    return pd.DataFrame(
+        {
+            "datetime_utc": pd.to_datetime(times, utc=True),
+            "lat": rng.uniform(18, 23, n_rows),
+            "lon": rng.uniform(-161, -154, n_rows),
+            "vessel_class": pd.Categorical(
+                rng.choice(["cargo", "tanker", "pleasure craft/sailing"], n_rows)
+            ),
+            "length_m": rng.uniform(10, 300, n_rows).astype(np.float32),
+            "status": rng.integers(0, 9, n_rows).astype(np.int8),
+            "computed_speed_knots": speeds,
+            "overspeed_flag": speeds > np.percentile(speeds, 99),
+        },
+        index=pd.Index(rng.integers(367_000_000, 367_100_000, n_rows), name="MMSI"),
+    )
+
+
+def read_back(path, output_format):
+    files = (
+        sorted(glob.glob(os.path.join(path, "*", "*")))
+        if os.path.isdir(path)
+        else [path]
+    )
+    readers = {
+        "csv": pd.read_csv,
+        "parquet": pd.read_parquet,
+        "feather": pd.read_feather,
+    }
+    written = pd.concat([readers[output_format](f) for f in files], ignore_index=True)
+    written["datetime_utc"] = pd.to_datetime(written["datetime_utc"], utc=True)
+    return written.sort_values(["datetime_utc", "MMSI"], ignore_index=True)
+
+
+@pytest.mark.parametrize("output_format, partition, compression, flags_only", CASES)
+def test_written_rows_read_back(
+    tmp_path, monkeypatch, output_format, partition, compression, flags_only
+):
+    if output_format != "csv":
+        pytest.importorskip("pyarrow")
+    # several batches per file
+    monkeypatch.setattr(output_writers, "OUTPUT_BATCH_ROWS", 1_000)
+    data = synthetic_results(ROWS)
+    params = {
+        "output_format": output_format,
+        "output_partition": partition,
+        "output_compression": compression,
+        "flags_only": flags_only,
+    }
+
+    path = write_output(
+        data,
+        str(tmp_path / "results"),
+        params,
+        flag_columns=["overspeed_flag"],
+        index=True,
+    )
+
+    written = read_back(path, output_format)
+    expected = data.reset_index()
+    if flags_only:
+        expected = expected[expected["overspeed_flag"]]
+        assert "length_m" not in written.columns
+    else:
+        assert "datetime_hst" in written.columns
+    expected = expected.sort_values(["datetime_utc", "MMSI"], ignore_index=True)
+
+    assert len(written) == len(expected) > 0
+    for col in ["MMSI", "datetime_utc", "overspeed_flag"]:
+        assert (written[col] == expected[col]).all()
+    assert (written["vessel_class"].astype(str) == expected["vessel_class"]).all()
+    np.testing.assert_allclose(
+        written["computed_speed_knots"], expected["computed_speed_knots"], rtol=1e-6
+    )
@@ -0,0 +1,64 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import pytest
+
+from main import validate_params
+from params_builder import ArgParser, ParamsBuilder
+
+RUN_ARGS = [
+    "--anomaly_type",
+    "overspeed",
+    "--Hawaii_GT",
+    "true",
+    "--vessel_class",
+    "cargo",
+    "--length",
+    "1-400",
+    "--date_start",
+    "2017-01-01",
+    "--date_end",
+    "2017-01-31",
+    "--hour_start",
+    "00:00",
+    "--hour_end",
+    "23:59",
+    "--percentile",
+    "0.99",
+]
+
+
+def params_from(argv):
+    params_builder = ParamsBuilder()
+    params_builder.update_params(ArgParser().parser.parse_args(argv))
+    return params_builder.params
+
+
+def test_bbox_takes_four_numbers():
+    params = params_from(RUN_ARGS + ["--bbox", "-158.3", "21.2", "-157.6", "21.7"])
+
+    assert params["bbox"] == [-158.3, 21.2, -157.6, 21.7]
+    assert validate_params(params)
+
+
+@pytest.mark.parametrize(
+    "bbox",
+    [
+        ["-157.6", "21.2", "-158.3", "21.7"],
+        ["-158.3", "21.7", "-157.6", "21.2"],
+        ["-158.3", "21.2", "-158.3", "21.7"],
+        ["-158.3", "21.2", "-157.6", "91"],
+    ],
+)
+def test_bbox_minimums_must_be_below_maximums(bbox, capsys):
+    params = params_from(RUN_ARGS + ["--bbox", *bbox])
+
+    assert not validate_params(params)
+    assert "PARAM ERROR: Bounding box" in capsys.readouterr().out
+    assert params["bbox"] is None
@@ -0,0 +1,91 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from anomaly_rules.anomaly_rule_overspeeding import add_valid_speeds, prepare_speeds
+from common.quantile_sketch import QuantileSketch
+
+PERCENTILES = [0.5, 0.9, 0.95, 0.98, 0.99, 0.995, 0.999]
+ROWS = 200_000
+
+
+def synthetic_speeds(name, rows=ROWS, seed=0):
+    """Speed-like distributions in knots, clipped to the 0-65 knot overspeed range."""
+    rng = np.random.default_rng(seed)
+    if name == "gamma":
+        speeds = rng.gamma(2.0, 5.0, rows)
+    elif name == "bimodal":
+        speeds = np.where(
+            rng.random(rows) < 0.3,
+            rng.normal(0.3, 0.2, rows),
+            rng.normal(12.0, 3.0, rows),
+        )
+    else:
+        speeds = rng.pareto(3.0, rows) * 5.0
+    return np.clip(speeds, 0, 65)
+
+
+@pytest.mark.parametrize("name", ["gamma", "bimodal", "heavy_tail"])
+@pytest.mark.parametrize("relative_accuracy", [0.01, 0.001])
+def test_merged_sketch_within_relative_error(name, relative_accuracy):
+    speeds = synthetic_speeds(name)
+    sketch = QuantileSketch(relative_accuracy)
+    for part in np.array_split(speeds, 12):
+        sketch.merge(QuantileSketch.from_values(part, relative_accuracy))
+
+    exact = np.percentile(speeds, [100 * q for q in PERCENTILES])
+    estimates = np.array([sketch.quantile(q) for q in PERCENTILES])
+
+    # a little slack for floating point at bucket boundaries
+    assert sketch.count == len(speeds)
+    assert np.all(
+        np.abs(estimates - exact) <= relative_accuracy * (1 + 1e-6) * np.abs(exact)
+    )
+
+
+def test_merge_equals_sketching_all_values():
+    speeds = synthetic_speeds("gamma")
+    whole = QuantileSketch.from_values(speeds)
+    merged = QuantileSketch()
+    for part in np.array_split(speeds, 7):
+        merged.merge(QuantileSketch.from_values(part))
+
+    assert merged.count == whole.count
+    assert [merged.quantile(q) for q in PERCENTILES] == [
+        whole.quantile(q) for q in PERCENTILES
+    ]
+
+
+def test_non_finite_values_are_ignored():
+    sketch = QuantileSketch.from_values([np.nan, np.inf, -np.inf, 0.0, 1.0, 2.0])
+    assert sketch.count == 3
+
+
+def test_invalid_accuracy_is_rejected():
+    with pytest.raises(ValueError):
+        QuantileSketch(1.5)
+
+
+def test_loader_sketch_holds_the_prepared_speeds():
+    data = pd.DataFrame(
+        {
+            "comput_speed_knots": [12.0, np.nan, 0.05, 0.05, 70.0, 65.0, 3.0],
+            "status": [0, 0, 1, 0, 0, 5, 5],
+        }
+    )
+    sketch = QuantileSketch()
+    for start in range(0, len(data), 3):
+        add_valid_speeds(sketch, data.iloc[start : start + 3])
+
+    expected = QuantileSketch.from_values(prepare_speeds(data)["computed_speed_knots"])
+    assert sketch.count == expected.count == 4
+    assert sketch.quantile(0.5) == expected.quantile(0.5)
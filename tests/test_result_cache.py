@@ -0,0 +1,66 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import os
+import time
+
+import pandas as pd
+
+import main as pipeline
+from common.result_cache import filter_key, load_cached_result, store_result
+
+
+def test_key_follows_the_filters_and_the_source_files(synthetic_root, make_params):
+    params = make_params()
+    files = pipeline.source_files(params)
+    key = filter_key(params, files)
+
+    assert filter_key(make_params("--percentile", "0.95"), files) == key
+    assert filter_key(make_params("--vessel_class", "cargo"), files) != key
+    assert filter_key(make_params("--hour_end", "22:00"), files) != key
+
+    month = synthetic_root / "data" / "Hawaii_2017_02.csv"
+    stat = month.stat()
+    os.utime(month, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert filter_key(params, files) != key
+
+
+def test_cache_is_used_only_when_asked(synthetic_root, make_params, capsys):
+    cache_dir = synthetic_root / "cache"
+
+    data = pipeline.load_and_filter_data_with_cache(make_params())
+    assert not cache_dir.exists()
+
+    params = make_params("--cache")
+    pipeline.load_and_filter_data_with_cache(params)
+    assert "Stored" in capsys.readouterr().out
+    cached = pipeline.load_and_filter_data_with_cache(params)
+    assert "Loaded the filtered data from the result cache" in capsys.readouterr().out
+    pd.testing.assert_frame_equal(cached, data)
+
+    with open(synthetic_root / "data" / "Hawaii_2017_03.csv", "a") as f:
+        f.write("\n")
+    pipeline.load_and_filter_data_with_cache(params)
+    assert "Stored" in capsys.readouterr().out
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    data = pd.DataFrame({"speed": range(100_000)})
+    for key in ["a", "b", "c"]:
+        store_result(str(tmp_path), key, data)
+    # "a" is used again, so "b" is now the least recently used
+    later = time.time_ns() + 60 * 10**9
+    os.utime(tmp_path / "a.pkl", ns=(later, later))
+    size_mb = (tmp_path / "a.pkl").stat().st_size / 1024**2
+
+    store_result(str(tmp_path), "d", data, max_cache_mb=2.5 * size_mb)
+
+    assert load_cached_result(str(tmp_path), "b") is None
+    assert load_cached_result(str(tmp_path), "c") is None
+    pd.testing.assert_frame_equal(load_cached_result(str(tmp_path), "a"), data)
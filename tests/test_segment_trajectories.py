@@ -0,0 +1,34 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import numpy as np
+import pandas as pd
+
+from common.obtain_and_process_traj import segment_trajectories
+
+
+def test_caller_frame_is_not_modified():
+    # one vessel sailing a 1 km square, then back after a 2 hour gap
+    minutes = [0, 5, 10, 15, 20, 140, 145, 150, 155, 160]
+    data = pd.DataFrame(
+        {
+            "datetime_utc": pd.Timestamp("2017-01-01", tz="UTC")
+            + pd.to_timedelta(minutes, "m"),
+            "lat": np.tile([21.0, 21.0, 21.01, 21.01, 21.0], 2),
+            "lon": np.tile([-158.0, -157.99, -157.99, -158.0, -158.0], 2),
+        },
+        index=pd.Index([367000001] * 10, name="MMSI"),
+    )
+    before = data.copy()
+
+    points, summary = segment_trajectories(data)
+
+    pd.testing.assert_frame_equal(data, before)
+    assert "datetime_hst" in points.columns
+    assert list(summary["n_points"]) == [5, 5]
@@ -0,0 +1,144 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from anomaly_rules.anomaly_rule_speed_abnormality import (
+    detect_speed_abnormality,
+    detect_speed_abnormality_batch,
+    distances_from_previous_km,
+    speed_abnormality,
+)
+from common.geodesy import KM_PER_NAUTICAL_MILE, haversine_km
+
+
+def synthetic_trajectories(n_trajectories, n_points, seed=0):
+    """Trajectories with occasional repeated timestamps and implausible jumps."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for traj_id in range(n_trajectories):
+        seconds = np.cumsum(rng.choice([0, 10, 30, 60, 120], n_points))
+        sog = np.abs(rng.normal(10, 3, n_points))
+        # distance consistent with the reported speed, with some large jumps
+        hours = np.diff(seconds, prepend=seconds[0]) / 3600
+        distances = sog * 1.852 * hours * rng.choice([1, 1, 1, 3], n_points)
+        distances[0] = np.nan
+        frames.append(
+            pd.DataFrame(
+                {
+                    "traj_id": traj_id,
+                    "datetime_hst": pd.Timestamp("2017-01-01", tz="UTC")
+                    + pd.to_timedelta(seconds, unit="s"),
+                    "distances_km": distances,
+                    "speed_over_ground_knots": sog,
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_batch_matches_per_trajectory_loop():
+    data = synthetic_trajectories(30, 200)
+
+    loop_flags = np.zeros(len(data), dtype=bool)
+    loop_labels = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _, traj_points in data.groupby("traj_id", sort=True):
+            result = detect_speed_abnormality(traj_points)
+            loop_labels.append(0 if result == 0 else result[0])
+            if result != 0:
+                loop_flags[traj_points.index[result[1]]] = True
+
+    batch_flags, trajectory_labels = detect_speed_abnormality_batch(
+        data, time_col="datetime_hst"
+    )
+
+    assert loop_flags.any()
+    assert np.array_equal(batch_flags, loop_flags)
+    assert trajectory_labels["anomalous"].tolist() == loop_labels
+
+
+def test_batch_does_not_need_contiguous_trajectories():
+    data = synthetic_trajectories(5, 50)
+    # interleaves the trajectories, keeping each one's points in order
+    shuffled = data.sort_values("datetime_hst", kind="stable")
+
+    flags, labels = detect_speed_abnormality_batch(data, time_col="datetime_hst")
+    shuffled_flags, shuffled_labels = detect_speed_abnormality_batch(
+        shuffled, time_col="datetime_hst"
+    )
+
+    assert np.array_equal(shuffled_flags, flags[shuffled.index])
+    assert shuffled_labels.equals(labels)
+
+
+def test_distances_are_measured_within_trajectories():
+    points = pd.DataFrame(
+        {
+            "traj_id": [0, 0, 0, 1, 1],
+            "lon": [-158.0, -157.99, -157.98, -157.0, -157.01],
+            "lat": [21.0, 21.0, 21.01, 20.0, 20.0],
+        }
+    )
+
+    distances = distances_from_previous_km(points)
+
+    assert np.isnan(distances[[0, 3]]).all()
+    expected = haversine_km(
+        points["lon"].to_numpy()[[0, 1, 3]],
+        points["lat"].to_numpy()[[0, 1, 3]],
+        points["lon"].to_numpy()[[1, 2, 4]],
+        points["lat"].to_numpy()[[1, 2, 4]],
+    )
+    np.testing.assert_allclose(distances[[1, 2, 4]], expected, rtol=1e-6)
+
+
+def zigzag_vessel(mmsi, start, n_points=8, minutes=5):
+    """A vessel zigzagging east, reporting the SOG it actually sails at."""
+    lon = -158 + 0.01 * np.arange(n_points)
+    lat = 21 + 0.01 * (np.arange(n_points) % 2)
+    times = pd.Timestamp(start, tz="UTC") + pd.to_timedelta(
+        minutes * np.arange(n_points), unit="m"
+    )
+    hours = minutes / 60
+    step_km = haversine_km(lon[:-1], lat[:-1], lon[1:], lat[1:])
+    sog = np.append(step_km / hours / KM_PER_NAUTICAL_MILE, 10.0)
+    return pd.DataFrame(
+        {
+            "datetime_utc": times,
+            "lat": lat,
+            "lon": lon,
+            "speed_over_ground_knots": sog,
+            # far from the positions, as if measured from a filtered-out point
+            "distances_km": 100.0,
+        },
+        index=pd.Index([mmsi] * n_points, name="MMSI"),
+    )
+
+
+def test_rule_uses_segments_and_recomputed_distances():
+    first = zigzag_vessel(1, "2017-01-01 00:00")
+    # over 30 minutes later, so a separate trajectory
+    second = zigzag_vessel(1, "2017-01-01 03:00")
+    second.iloc[2, second.columns.get_loc("speed_over_ground_knots")] /= 3
+    # a point removed by the filters, which the next distance must skip
+    data = pd.concat([first.iloc[[0, 1, 2, 3, 5, 6, 7]], second])
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        flagged, labels = speed_abnormality({"workers": 1}, data)
+
+    assert len(labels) == 2
+    assert labels["MMSI"].tolist() == [1, 1]
+    assert labels["n_abnormal"].tolist() == [0, 1]
+    abnormal = flagged[flagged["speed_abnormality_flag"]]
+    assert abnormal["datetime_utc"].tolist() == [second["datetime_utc"].iloc[2]]
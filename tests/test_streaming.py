@@ -0,0 +1,74 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import json
+
+import numpy as np
+import pytest
+
+from common.geodesy import KM_PER_NAUTICAL_MILE, haversine_km
+from params_builder import ParamsBuilder
+from replay import load_replay_lines
+from streaming import StreamingDetector
+
+
+def message(time, lon, lat, sog, length_m=200, distances_km=None):
+    return json.dumps(
+        {
+            "MMSI": 367000001,
+            "datetime_utc": f"2017-01-01T{time}",
+            "lat": lat,
+            "lon": lon,
+            "speed_over_ground_knots": sog,
+            "vessel_class": "cargo",
+            "length_m": length_m,
+            "status": 0,
+            "distances_km": distances_km,
+        }
+    )
+
+
+def test_speed_abnormality_is_measured_from_the_kept_point():
+    params = ParamsBuilder().params
+    params["length_range"] = [1, 400]
+    detector = StreamingDetector(params, rules=("speed abnormality",))
+
+    assert detector.process_line(message("00:00:00", -158.0, 21.0, 5.0)) == []
+    # filtered out by its length, so the vessel's kept point stays the first
+    assert detector.process_line(message("00:05:00", -157.95, 21.0, 5.0, None)) == []
+    # distances_km is measured from the filtered message, 0.1 km away
+    alerts = detector.process_line(
+        message("00:10:00", -157.9, 21.0, 5.0, distances_km=0.1)
+    )
+
+    expected = haversine_km(-158.0, 21.0, -157.9, 21.0) * 6 / KM_PER_NAUTICAL_MILE
+    assert [alert["anomaly"] for alert in alerts] == ["speed abnormality"]
+    assert alerts[0]["avg_speed_knots"] == pytest.approx(expected)
+    assert detector.counts["filtered"] == 1
+
+
+def test_replay_keeps_each_line_with_its_timestamp(tmp_path):
+    path = tmp_path / "feed.csv"
+    path.write_text(
+        "MMSI,datetime_utc,vessel_class\n"
+        '1,2017-01-01 00:00:02,"cargo\nship"\n'
+        "\n"
+        "2,2017-01-01 00:00:01,tanker\n"
+        "3,2017-01-01 00:00:00,fishing"
+    )
+
+    header, lines, times_ns = load_replay_lines(str(path))
+
+    assert header == "MMSI,datetime_utc,vessel_class\n"
+    assert lines == [
+        "3,2017-01-01 00:00:00,fishing\n",
+        "2,2017-01-01 00:00:01,tanker\n",
+        '1,2017-01-01 00:00:02,"cargo\nship"\n',
+    ]
+    assert list(np.diff(times_ns)) == [10**9, 10**9]
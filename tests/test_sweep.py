@@ -0,0 +1,68 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import json
+
+import numpy as np
+
+import main as pipeline
+from anomaly_rules.anomaly_rule_overspeeding import overspeeding
+from generate_ais import VESSEL_CLASSES
+from sweep import run_sweep
+
+PERCENTILES = [0.9, 0.99, 0.995]
+JOBS = [
+    {"name": "cargo-tug", "vessel_class": ["cargo", "tug tow"]},
+    {"name": "short", "length_range": [1, 100], "percentiles": [0.5, 0.99]},
+    {"name": "all"},
+]
+
+
+def test_sweep_thresholds_equal_separate_runs(synthetic_root, make_params):
+    job_path = synthetic_root / "jobs.json"
+    job_path.write_text(
+        json.dumps(
+            {
+                "Hawaii_GT": True,
+                "timeframe": {"start": "2017-01-01", "end": "2017-03-31"},
+                "hour_constraint": {"start": "00:00", "end": "23:59"},
+                "percentiles": PERCENTILES,
+                "jobs": JOBS,
+            }
+        )
+    )
+
+    summary = run_sweep(
+        make_params(),
+        str(job_path),
+        pipeline.complete_params,
+        pipeline.load_and_filter_data,
+        str(synthetic_root / "output"),
+    )
+
+    assert len(summary) == 8
+    for row in summary.itertuples():
+        job = next(job for job in JOBS if job["name"] == row.job)
+        min_length, max_length = job.get("length_range", [1, 400])
+        params = make_params(
+            "--vessel_class",
+            *job.get("vessel_class", VESSEL_CLASSES),
+            "--length",
+            f"{min_length}-{max_length}",
+            "--percentile",
+            str(row.percentile),
+        )
+        flagged = overspeeding(params, pipeline.load_and_filter_data(params))
+
+        assert row.n_points == len(flagged)
+        assert row.n_flagged == flagged["overspeed_flag"].sum()
+        # bit for bit the threshold compute_speed_threshold gives
+        assert row.speed_threshold == np.percentile(
+            flagged["computed_speed_knots"], row.percentile * 100
+        )
@@ -0,0 +1,58 @@
+#  ___________________________________________________________________________
+#  Copyright (c) 2025
+#  National Technology and Engineering Solutions of Sandia, LLC
+#  Under the terms of Contract DE-NA0003525 with National Technology and
+#  Engineering Solutions of Sandia, LLC, the U.S. Government retains certain
+#  rights in this software.
+#  This software is distributed under the 3-clause BSD License.
+#  ___________________________________________________________________________
+
+import pandas as pd
+import pytest
+
+from common.ais_schema import apply_ais_schema, read_ais_csv
+from common.timestamps import parse_timestamps
+from common.vessel_index import get_vessel_points
+
+START = pd.Timestamp("2017-01-20 06:30", tz="UTC")
+END = pd.Timestamp("2017-02-10 18:00", tz="UTC")
+UNKNOWN_MMSI = 1
+
+
+def read_months(data_dir, months):
+    frames = []
+    for month in months:
+        data = read_ais_csv(data_dir / f"Hawaii_2017_{month}.csv")
+        parse_timestamps(data)
+        frames.append(apply_ais_schema(data))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_lookup_gives_the_points_of_the_csv(synthetic_root):
+    data_dir = synthetic_root / "data"
+    months = read_months(data_dir, ["01", "02"])
+    mmsis = list(months["MMSI"].unique()[:3]) + [UNKNOWN_MMSI]
+
+    points = get_vessel_points(str(data_dir), mmsis, START, END, build=True)
+
+    in_window = (
+        months["MMSI"].isin(mmsis)
+        & (months["datetime_utc"] >= START)
+        & (months["datetime_utc"] <= END)
+    )
+    expected = (
+        months[in_window]
+        .sort_values(["MMSI", "datetime_utc"], kind="stable")
+        .set_index("MMSI")[points.columns]
+    )
+    assert points.index.nunique() == 3
+    pd.testing.assert_frame_equal(
+        points.astype({"vessel_class": str}),
+        expected.astype({"vessel_class": str}),
+        check_index_type=False,
+    )
+
+
+def test_lookup_without_an_index_needs_build(synthetic_root):
+    with pytest.raises(FileNotFoundError):
+        get_vessel_points(str(synthetic_root / "data"), [UNKNOWN_MMSI], START, END)